@@ -0,0 +1,74 @@
+# benchmarks/bench_effect_surfaces.py
+
+# Замер стоимости одного "выстрела" (создания эффекта или снаряда) до и после
+# введения реестра поверхностей EFFECT_IMAGES.
+# "До" - прямой вызов load_image (чтение с диска + декодирование + масштабирование),
+# "после" - получение готовой поверхности через get_effect_image.
+#
+# Запуск из корня проекта:
+#     python benchmarks/bench_effect_surfaces.py [количество_выстрелов]
+
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+os.chdir(PROJECT_ROOT)  # resource_path ищет ассеты относительно текущей папки
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+from data.settings import *
+from data.assets import load_image, get_effect_image
+
+# (название, путь, цвет, размер, прозрачность) - те же варианты, что создаются в бою
+SHOT_SPECS = [
+    ('paint_splat', 'projectiles/paint_splat.png', DEFAULT_COLORS['paint_splat'], (30, 30), None),
+    ('sound_wave', 'projectiles/sound_wave.png', DEFAULT_COLORS['sound_wave'], (40, CELL_SIZE_H - 10), None),
+    ('coffee_bean', 'resources/coffee_bean.png', DEFAULT_COLORS['coffee_bean'], (40, 40), None),
+    ('book_attack', 'projectiles/book_attack.png', DEFAULT_COLORS['book_attack'], (4 * CELL_SIZE_W, 4 * CELL_SIZE_W),
+     BOOK_ATTACK_ALPHA),
+    ('explosion', 'projectiles/explosion.png', DEFAULT_COLORS['explosion'], (4 * CELL_SIZE_W, 4 * CELL_SIZE_W), None),
+]
+
+
+def per_shot_uncached(path, color, size, alpha):
+    """Старый путь: каждый выстрел заново загружает изображение."""
+    image = load_image(path, color, size)
+    if alpha is not None:
+        image.set_alpha(alpha)
+    return image
+
+
+def per_shot_cached(path, color, size, alpha):
+    """Новый путь: каждый выстрел берет готовую поверхность из реестра."""
+    return get_effect_image(path, color, size, alpha=alpha)
+
+
+def measure(func, spec, shots):
+    """Возвращает среднее время одного вызова в микросекундах."""
+    _, path, color, size, alpha = spec
+    func(path, color, size, alpha)  # Прогрев (для кэша - первичное заполнение)
+    start = time.perf_counter()
+    for _ in range(shots):
+        func(path, color, size, alpha)
+    return (time.perf_counter() - start) / shots * 1_000_000
+
+
+def main():
+    shots = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+
+    print(f"{'эффект':<14}{'до, мкс':>12}{'после, мкс':>14}{'ускорение':>12}")
+    for spec in SHOT_SPECS:
+        before = measure(per_shot_uncached, spec, shots)
+        after = measure(per_shot_cached, spec, shots)
+        speedup = before / after if after > 0 else float('inf')
+        print(f"{spec[0]:<14}{before:>12.1f}{after:>14.2f}{speedup:>11.0f}x")
+
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
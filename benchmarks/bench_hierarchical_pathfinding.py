@@ -0,0 +1,95 @@
+# benchmarks/bench_hierarchical_pathfinding.py
+
+# Сравнение плоского A* (core.pathfinding.find_path) и иерархического поиска
+# (core.hierarchical_pathfinding.HierarchicalPathfinder) на большом поле.
+# Поле заполняется случайными препятствиями-"защитниками"; для одинаковых пар
+# старт/финиш замеряется время поиска и удлинение пути, а также стоимость
+# полного построения графа и его обновления после установки одного защитника.
+#
+# Запуск из корня проекта:
+#     python benchmarks/bench_hierarchical_pathfinding.py [ряды] [колонки] [запросы] [плотность]
+
+import os
+import sys
+import time
+import random
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+from core.pathfinding import find_path
+from core.hierarchical_pathfinding import HierarchicalPathfinder
+
+SEED = 12345
+
+
+def make_grid(rows, cols, density, rng):
+    """Создает сетку со случайными занятыми клетками (1 - защитник)."""
+    return [[1 if rng.random() < density else 0 for _ in range(cols)] for _ in range(rows)]
+
+
+def make_queries(grid, count, rng):
+    """Выбирает пары старт/финиш между свободными клетками в разных концах поля."""
+    rows, cols = len(grid), len(grid[0])
+    free = [(row, col) for row in range(rows) for col in range(cols) if grid[row][col] == 0]
+    left = [cell for cell in free if cell[1] < cols // 4]
+    right = [cell for cell in free if cell[1] >= cols - cols // 4]
+    return [(rng.choice(right), rng.choice(left)) for _ in range(count)]
+
+
+def measure(func, repeats=1):
+    """Возвращает (результат, среднее время одного вызова в миллисекундах)."""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = func()
+    return result, (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    cols = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    query_count = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+    density = float(sys.argv[4]) if len(sys.argv) > 4 else 0.2
+
+    rng = random.Random(SEED)
+    grid = make_grid(rows, cols, density, rng)
+    queries = make_queries(grid, query_count, rng)
+
+    pathfinder, build_ms = measure(lambda: HierarchicalPathfinder(grid))
+    print(f"поле {rows}x{cols}, плотность {density:.0%}, запросов {query_count}")
+    print(f"построение графа: {build_ms:.1f} мс")
+
+    flat_ms = hpa_ms = 0.0
+    flat_length = hpa_length = found = mismatches = 0
+    for start, end in queries:
+        flat_path, elapsed = measure(lambda: find_path(grid, start, end))
+        flat_ms += elapsed
+        hpa_path, elapsed = measure(lambda: pathfinder.find_path(start, end))
+        hpa_ms += elapsed
+        if (flat_path is None) != (hpa_path is None):
+            mismatches += 1
+        elif flat_path is not None:
+            found += 1
+            flat_length += len(flat_path)
+            hpa_length += len(hpa_path)
+
+    print(f"{'поиск':<22}{'мс/запрос':>12}")
+    print(f"{'плоский A*':<22}{flat_ms / query_count:>12.2f}")
+    print(f"{'иерархический':<22}{hpa_ms / query_count:>12.2f}")
+    if hpa_ms > 0:
+        print(f"ускорение: {flat_ms / hpa_ms:.1f}x")
+    if found:
+        print(f"удлинение пути: {(hpa_length / flat_length - 1) * 100:.1f}% (найдено путей: {found})")
+    print(f"расхождений в достижимости: {mismatches}")
+
+    # Установка одного защитника: локальное обновление против полного перестроения
+    free = [(row, col) for row in range(rows) for col in range(cols) if grid[row][col] == 0]
+    row, col = rng.choice(free)
+    grid[row][col] = 1
+    _, update_ms = measure(lambda: pathfinder.update_cells([(row, col)]), repeats=20)
+    _, rebuild_ms = measure(pathfinder.rebuild, repeats=3)
+    print(f"обновление после установки защитника: {update_ms:.2f} мс (полное перестроение: {rebuild_ms:.1f} мс)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+# benchmarks/bench_render_queue.py
+
+# Замер отрисовки кадра с сотнями спрайтов до и после введения очереди
+# отрисовки RenderQueue: отдельно смена слоев с упорядочиванием и кадр целиком.
+# "До" - спрайт, сменивший слой, передобавляется в группы (как делали ауры),
+# затем полная сортировка всех спрайтов по `_layer` и отдельный blit на каждый;
+# "после" - слой просто присваивается (спрайт сам отмечается в очереди),
+# очередь переставляет только отмеченные спрайты, и кадр уходит одним вызовом
+# Surface.blits. Для сравнения очередь замеряется и в режиме полной сортировки
+# при любом изменении. В каждом кадре небольшая доля спрайтов меняет слой
+# (как враги, прыгающие между рядами, и ауры, следующие за ними).
+#
+# Запуск из корня проекта:
+#     python benchmarks/bench_render_queue.py [кадров] [доля_сменивших_слой]
+
+import os
+import sys
+import time
+import random
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+from data.settings import *
+from entities.base_sprite import BaseSprite
+from core.render_queue import RenderQueue
+
+SPRITE_COUNTS = (200, 500, 1000)
+SEED = 12345
+
+
+class BenchSprite(BaseSprite):
+    """Спрайт с картинкой размером с врага и слоем по нижнему краю."""
+
+    def __init__(self, image, rng):
+        self.image = image
+        self.rect = image.get_rect(center=(rng.randrange(SCREEN_WIDTH), rng.randrange(SCREEN_HEIGHT)))
+        super().__init__()
+
+
+def make_sprites(count, rng):
+    """Создает группу LayeredUpdates с count спрайтами."""
+    image = pygame.Surface(ENEMY_SPRITE_SIZE, pygame.SRCALPHA).convert_alpha()
+    image.fill((200, 80, 80, 180))
+    group = pygame.sprite.LayeredUpdates()
+    for _ in range(count):
+        group.add(BenchSprite(image, rng))
+    return group
+
+
+def set_layer_readd(sprite, layer):
+    """Старая смена слоя: передобавление во все группы, чтобы LayeredUpdates увидела слой."""
+    groups = sprite.groups()
+    sprite.remove(groups)
+    sprite._layer = layer
+    sprite.add(groups)
+
+
+def set_layer_plain(sprite, layer):
+    """Новая смена слоя: только атрибут, спрайт сам отмечается в очереди."""
+    sprite._layer = layer
+
+
+def order_sorted(surface, group, queue):
+    """Только упорядочивание старым путем: полная сортировка."""
+    return sorted(group, key=lambda s: s._layer)
+
+
+def order_queue(surface, group, queue):
+    """Только упорядочивание новым путем: синхронизация очереди."""
+    queue.sync(group)
+    return queue.sprites
+
+
+def draw_sorted(surface, group, queue):
+    """Старый путь: сортировка всех спрайтов и blit по одному."""
+    for sprite in sorted(group, key=lambda s: s._layer):
+        surface.blit(sprite.image, sprite.rect)
+
+
+def draw_queue(surface, group, queue):
+    """Новый путь: очередь отрисовки и один вызов blits."""
+    queue.sync(group)
+    surface.blits([(sprite.image, sprite.rect) for sprite in queue.sprites], doreturn=False)
+
+
+# Варианты: (название, смена слоя, упорядочивание/отрисовка, доля для полной сортировки очереди)
+ORDER_VARIANTS = (
+    ("sorted", set_layer_readd, order_sorted, RENDER_QUEUE_FULL_SORT_RATIO),
+    ("очередь, сорт.", set_layer_plain, order_queue, 0.0),
+    ("очередь, инкр.", set_layer_plain, order_queue, RENDER_QUEUE_FULL_SORT_RATIO),
+)
+FRAME_VARIANTS = (
+    ("до", set_layer_readd, draw_sorted, RENDER_QUEUE_FULL_SORT_RATIO),
+    ("после", set_layer_plain, draw_queue, RENDER_QUEUE_FULL_SORT_RATIO),
+)
+
+
+def measure(set_layer, draw, full_sort_ratio, count, frames, change_ratio):
+    """Возвращает среднее время кадра в миллисекундах (одинаковые сцены для всех путей)."""
+    rng = random.Random(SEED)
+    group = make_sprites(count, rng)
+    pygame.sprite.Group(group.sprites())  # Вторая группа, как all_sprites + группа юнитов в бою
+    sprites = group.sprites()
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    queue = RenderQueue(full_sort_ratio)
+    draw(surface, group, queue)  # Прогрев (для очереди - первичное заполнение)
+
+    elapsed = 0.0
+    for _ in range(frames):
+        changes = [(sprite, rng.randrange(SCREEN_HEIGHT)) for sprite in rng.sample(sprites, int(count * change_ratio))]
+        start = time.perf_counter()
+        for sprite, centery in changes:
+            sprite.rect.centery = centery
+            set_layer(sprite, sprite.rect.bottom)
+        draw(surface, group, queue)
+        elapsed += time.perf_counter() - start
+    return elapsed / frames * 1000
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    change_ratio = float(sys.argv[2]) if len(sys.argv) > 2 else 0.03
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+
+    print(f"кадров: {frames}, меняют слой за кадр: {change_ratio:.0%}")
+    for title, variants in (("смена слоев и порядок отрисовки, мс", ORDER_VARIANTS),
+                            ("кадр целиком, мс", FRAME_VARIANTS)):
+        print(title)
+        print(f"{'спрайтов':<10}" + ''.join(f"{name:>16}" for name, *_ in variants) + f"{'ускорение':>12}")
+        for count in SPRITE_COUNTS:
+            times = [measure(set_layer, draw, ratio, count, frames, change_ratio)
+                     for _, set_layer, draw, ratio in variants]
+            print(f"{count:<10}" + ''.join(f"{elapsed:>16.3f}" for elapsed in times)
+                  + f"{times[0] / times[-1]:>11.2f}x")
+
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
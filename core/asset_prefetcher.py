@@ -0,0 +1,151 @@
+# core/asset_prefetcher.py
+
+import os
+import threading
+from data.settings import *
+from data.levels import LEVELS
+from data.assets import PROJECTILE_IMAGES, get_effect_image, load_animation_frames, release_animation_frames, \
+    get_unit_animation_keys, get_radius_variants, load_music_buffer, release_music_buffer
+
+
+class LevelAssetPrefetcher:
+    """
+    Заранее загружает ассеты уровня в фоновом потоке, пока игрок находится
+    на экране подготовки, чтобы первая волна врагов не обращалась к диску.
+
+    При уходе с уровня освобождает ассеты, которые не нужны другим уровням.
+    Тестовый уровень (ID 0) содержит всех врагов и не учитывается как "другой уровень",
+    иначе ни один ассет никогда не считался бы исключительным.
+    """
+
+    def __init__(self):
+        """Инициализирует предзагрузчик без активного уровня."""
+        self.level_id = None
+        self.level_assets = None
+        self._thread = None
+        self._cancelled = threading.Event()
+
+    def start(self, level_id, enemy_types, calamity_types):
+        """
+        Запускает фоновую предзагрузку ассетов уровня.
+        Если до этого был подготовлен другой уровень, его ассеты сначала освобождаются.
+
+        Args:
+            level_id (int): ID уровня.
+            enemy_types (list): Типы врагов уровня (PrepManager.enemy_types).
+            calamity_types (list): Типы напастей уровня (PrepManager.calamity_types).
+        """
+        if self.level_id is not None and self.level_id != level_id:
+            self.release()
+        elif self._thread is not None and self._thread.is_alive():
+            return  # Этот уровень уже загружается
+
+        self.level_id = level_id
+        self.level_assets = _collect_level_assets(level_id, enemy_types, calamity_types)
+        self._cancelled.clear()
+        self._thread = threading.Thread(target=self._prefetch, args=(self.level_assets,), name='level-prefetch',
+                                        daemon=True)
+        self._thread.start()
+
+    def is_ready(self):
+        """Возвращает True, если предзагрузка завершена (или не запускалась)."""
+        return self._thread is None or not self._thread.is_alive()
+
+    def wait(self):
+        """Блокирует вызывающий поток до завершения предзагрузки."""
+        if self._thread is not None:
+            self._thread.join()
+
+    def release(self):
+        """
+        Останавливает предзагрузку и освобождает ассеты текущего уровня,
+        которые не используются ни одним другим уровнем.
+        """
+        if self.level_id is None:
+            return
+        self._cancelled.set()
+        self.wait()
+
+        shared_assets = {'animations': set(), 'music': set()}
+        for other_level_id, level_data in LEVELS.items():
+            if other_level_id in (0, self.level_id):
+                continue
+            other_assets = _collect_level_assets(other_level_id, _get_level_enemy_types(level_data),
+                                                 level_data.get('calamities', []))
+            shared_assets['animations'] |= set(other_assets['animations'])
+            shared_assets['music'] |= set(other_assets['music'])
+
+        for key in set(self.level_assets['animations']) - shared_assets['animations']:
+            release_animation_frames(key)
+        for name in set(self.level_assets['music']) - shared_assets['music']:
+            release_music_buffer(name)
+
+        self.level_id = None
+        self.level_assets = None
+        self._thread = None
+
+    def _prefetch(self, level_assets):
+        """Загружает ассеты уровня по одному, проверяя флаг отмены между ними."""
+        for key in level_assets['animations']:
+            if self._cancelled.is_set():
+                return
+            load_animation_frames(*key)
+
+        for path, color, size in level_assets['images']:
+            if self._cancelled.is_set():
+                return
+            get_effect_image(path, color, size)
+
+        for p_type in level_assets['projectiles']:
+            if self._cancelled.is_set():
+                return
+            PROJECTILE_IMAGES.get(p_type)  # Дожидаемся фонового загрузчика ресурсов
+
+        for name in level_assets['music']:
+            if self._cancelled.is_set():
+                return
+            load_music_buffer(name)
+
+
+def _get_level_enemy_types(level_data):
+    """Возвращает отсортированный список уникальных типов врагов (как LevelManager.get_enemy_types_for_level)."""
+    return sorted(set(enemy[0] for enemy in level_data['enemies']))
+
+
+def _collect_level_assets(level_id, enemy_types, calamity_types):
+    """
+    Собирает описание всех ассетов, которые понадобятся уровню в бою.
+
+    Returns:
+        dict: Словарь со списками:
+              'animations' - ключи библиотеки анимаций (враги уровня первыми, затем все защитники,
+                             так как команда еще не выбрана);
+              'images' - (путь, цвет, размер) для фона боя и аур напастей;
+              'projectiles' - ключи PROJECTILE_IMAGES;
+              'music' - имена музыкальных треков.
+    """
+    animations = []
+    for enemy_type in enemy_types:
+        animations += get_unit_animation_keys(enemy_type, ENEMIES_DATA[enemy_type], 'enemies', ENEMY_SPRITE_SIZE)
+    for defender_type, data in DEFENDERS_DATA.items():
+        animations += get_unit_animation_keys(defender_type, data, 'defenders', DEFENDER_SPRITE_SIZE)
+    for radius in get_radius_variants('activist'):
+        diameter = radius * CELL_SIZE_W * 2
+        animations.append(('effects', 'activist_aura', 'aura', (diameter, diameter)))
+
+    images = [('battle_background.png', DEFAULT_COLORS['background'], (SCREEN_WIDTH, SCREEN_HEIGHT))]
+    for calamity_type in calamity_types:
+        if calamity_type != 'big_party':
+            images.append((os.path.join('effects', f'{calamity_type}_aura.png'), (0, 0, 0, 0),
+                           (CELL_SIZE_W + 10, CELL_SIZE_H + 20)))
+
+    projectiles = list(PROGRAMMER_PROJECTILE_TYPES)
+    if 'calculus' in enemy_types:
+        projectiles += CALCULUS_PROJECTILE_TYPES
+
+    return {
+        'animations': animations,
+        'images': images,
+        'projectiles': projectiles,
+        'music': [f'level_{level_id}'],
+    }
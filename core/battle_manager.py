@@ -3,12 +3,20 @@
 import pygame
 import random
 from data.settings import *
-from data.assets import load_image
+from data.assets import get_effect_image
 from entities.defenders import Defender, ProgrammerBoy, BotanistGirl, CoffeeMachine, Activist, Guitarist, Medic, Artist, \
     Fashionista
 from entities.enemies import Enemy
 from entities.projectiles import Integral, PaintSplat, SoundWave
 from entities.other_sprites import NeuroMower, CoffeeBean
+from core.clock import get_ticks
+from core.lane_index import LaneIndex, get_lane
+from core.spatial_hash import SpatialHash
+from core.broadphase import find_collisions
+from core.occupancy_grid import OccupancyGrid
+from core.enemy_index import EnemyIndex
+from core.events import ENEMY_SPAWNED, DEFENDER_DIED, DEFENDER_MOVED
+from core.render_queue import RenderQueue
 
 
 class BattleManager:
@@ -47,14 +55,46 @@ class BattleManager:
         self.level_manager = level_manager
         self.sound_manager = sound_manager
         self.is_game_over = False
+        self.breach_row = None  # Ряд, на котором враг прорвался к краю поля (при поражении)
         self.team_data = team
         self.upgrades = upgrades
         self.placed_mowers_data = placed_mowers
         self.coffee = level_manager.level_data.get('start_coffee', 150)
         self.selected_defender = None
-
-        self.background_image = load_image('battle_background.png', DEFAULT_COLORS['background'],
-                                           (SCREEN_WIDTH, SCREEN_HEIGHT))
+        # Спрайты по линиям для запросов "в моем ряду" (синхронизируется каждый шаг)
+        self.lane_index = LaneIndex()
+        # Занятость клеток защитниками: для размещения и поиска пути Наркоманом
+        self.occupancy_grid = OccupancyGrid()
+        # Врагов и защитников по ячейкам для поиска по радиусу (AOE, ауры, лечение)
+        self.spatial_hash = SpatialHash()
+        # Враги по здоровью и по оси X для запросов "самый сильный" и "самые левые"
+        self.enemy_index = EnemyIndex()
+        # Шина событий уровня: счетчик убийств в LevelManager, напасти для новых врагов
+        self.event_bus = level_manager.event_bus
+        self.event_bus.subscribe(ENEMY_SPAWNED, self._on_enemy_spawned)
+
+        # --- Реестры спрайтов по типам ---
+        # Спрайт попадает в реестр при создании и покидает его сам при kill(),
+        # поэтому подсистемы перебирают только нужные им объекты, а не все группы.
+        self.activists = pygame.sprite.Group()
+        self.coffee_machines = pygame.sprite.Group()
+        self.heroes = pygame.sprite.Group()            # Защитники, кроме кофемашин
+        self.sound_waves = pygame.sprite.Group()
+        self.calamity_affected = pygame.sprite.Group()  # Спрайты под действием текущей напасти
+
+        # Кэш аур: защитники, чей бафф нужно пересчитать, и флаг полного пересчета.
+        # Заполняются по событиям (размещение, гибель, перемещение), а не сравнением каждый шаг.
+        self.aura_dirty = set()
+        self.aura_full_recompute = False
+        self.event_bus.subscribe(DEFENDER_MOVED, self._mark_aura_dirty)
+        self.event_bus.subscribe(DEFENDER_DIED, self._on_defender_died)
+
+        # Спрайты в порядке отрисовки по глубине (переставляются только сменившие слой)
+        self.render_queue = RenderQueue()
+
+        # Фон общий для всех боев и заранее загружается LevelAssetPrefetcher
+        self.background_image = get_effect_image('battle_background.png', DEFAULT_COLORS['background'],
+                                                 (SCREEN_WIDTH, SCREEN_HEIGHT))
 
         self.ui_manager.create_battle_shop(self.team_data)
         self.place_neuro_mowers()
@@ -71,18 +111,6 @@ class BattleManager:
         self.calamity_end_time = 0
         self.calamity_duration = CALAMITY_DURATION
 
-    def _get_walkable_grid(self):
-        """Создает 2D-сетку проходимости, где 0 - свободно, 1 - препятствие."""
-        grid = [[0 for _ in range(GRID_COLS)] for _ in range(GRID_ROWS)]
-        for defender in self.defenders:
-            if defender.alive():
-                # Конвертируем пиксельные координаты в координаты сетки
-                col = int((defender.rect.centerx - GRID_START_X) / CELL_SIZE_W)
-                row = int((defender.rect.centery - GRID_START_Y) / CELL_SIZE_H)
-                if 0 <= row < GRID_ROWS and 0 <= col < GRID_COLS:
-                    grid[row][col] = 1  # 1 означает препятствие
-        return grid
-
     def start(self):
         """Запускает начало боя, активируя LevelManager."""
         self.level_manager.start()
@@ -139,9 +167,7 @@ class BattleManager:
             cost = DEFENDERS_DATA[self.selected_defender]['cost']
             if self.coffee >= cost:
                 grid_pos = self._get_grid_cell(pos)
-                if grid_pos and not self._is_cell_occupied(grid_pos):
-                    self.coffee -= cost
-                    self._place_defender(grid_pos)
+                if grid_pos and self.place_defender(self.selected_defender, grid_pos):
                     self.selected_defender = None
             else:
                 self.sound_manager.play_sfx('no_money')
@@ -166,6 +192,9 @@ class BattleManager:
         """
         Проверяет, занята ли указанная ячейка сетки другим защитником.
 
+        Занятой считается ячейка, которую задевает прямоугольник любого защитника,
+        в том числе сдвинутого Модником или утащенного Наркоманом.
+
         Args:
             grid_pos (tuple): Кортеж (колонка, ряд) ячейки.
 
@@ -173,22 +202,33 @@ class BattleManager:
             bool: True, если ячейка занята, иначе False.
         """
         col, row = grid_pos
-        new_defender_rect = pygame.Rect(
-            GRID_START_X + col * CELL_SIZE_W,
-            GRID_START_Y + row * CELL_SIZE_H,
-            CELL_SIZE_W,
-            CELL_SIZE_H
-        )
-        for defender in self.defenders:
-            if defender.alive() and defender.rect.colliderect(new_defender_rect):
-                return True
-        return False
+        return self.occupancy_grid.is_covered(row, col)
+
+    def place_defender(self, defender_type, grid_pos):
+        """
+        Покупает и размещает защитника, если хватает кофе и ячейка свободна.
+        Используется кликом игрока и сценариями безголовой симуляции.
 
-    def _place_defender(self, grid_pos):
+        Args:
+            defender_type (str): Тип защитника (ключ из DEFENDERS_DATA).
+            grid_pos (tuple): Кортеж (колонка, ряд) для размещения.
+
+        Returns:
+            bool: True, если защитник размещен.
+        """
+        cost = DEFENDERS_DATA[defender_type]['cost']
+        if self.coffee < cost or self._is_cell_occupied(grid_pos):
+            return False
+        self.coffee -= cost
+        self._place_defender(defender_type, grid_pos)
+        return True
+
+    def _place_defender(self, defender_type, grid_pos):
         """
         Создает и размещает экземпляр защитника на поле.
 
         Args:
+            defender_type (str): Тип защитника (ключ из DEFENDERS_DATA).
             grid_pos (tuple): Кортеж (колонка, ряд) для размещения.
         """
         self.sound_manager.play_sfx('purchase')
@@ -196,7 +236,9 @@ class BattleManager:
         x = GRID_START_X + col * CELL_SIZE_W + CELL_SIZE_W / 2
         y = GRID_START_Y + row * CELL_SIZE_H + CELL_SIZE_H / 2
         groups = (self.all_sprites, self.defenders)
-        defender_type = self.selected_defender
+        groups += (self.coffee_machines,) if defender_type == 'coffee_machine' else (self.heroes,)
+        if defender_type == 'activist':
+            groups += (self.activists,)
         data = DEFENDERS_DATA[defender_type].copy()
         data['type'] = defender_type
 
@@ -221,7 +263,8 @@ class BattleManager:
             'botanist': {'all_sprites': self.all_sprites, 'enemies_group': self.enemies},
             'coffee_machine': {'all_sprites': self.all_sprites, 'coffee_bean_group': self.coffee_beans},
             'activist': {'all_sprites': self.all_sprites},
-            'guitarist': {'all_sprites': self.all_sprites, 'enemies_group': self.enemies},
+            'guitarist': {'all_sprites': self.all_sprites, 'enemies_group': self.enemies,
+                          'sound_wave_group': self.sound_waves},
             'medic': {'defenders_group': self.defenders},
             'artist': {'all_sprites': self.all_sprites, 'projectile_group': self.projectiles,
                        'enemies_group': self.enemies},
@@ -231,14 +274,19 @@ class BattleManager:
 
         defender = constructor(**all_args)
         if defender_type in self.upgrades: defender.is_upgraded = True
+        defender.event_bus = self.event_bus
+        self.occupancy_grid.add(defender)
+        self._mark_aura_dirty(defender)
 
     def update(self):
-        """Обновляет состояние всего боя за один кадр."""
-        now = pygame.time.get_ticks()
+        """Обновляет состояние всего боя за один шаг симуляции (SIMULATION_STEP_MS)."""
+        now = get_ticks()
 
-        # Словарь с группами спрайтов, который передается в метод update каждого спрайта
-        grid_state = self._get_walkable_grid()
+        # Запоминаем положения до шага, чтобы отрисовка могла интерполировать между шагами
+        for sprite in self.all_sprites:
+            sprite.prev_center = sprite.rect.center
 
+        # Словарь с группами спрайтов, который передается в метод update каждого спрайта
         update_args = {
             'defenders_group': self.defenders,
             'enemies_group': self.enemies,
@@ -246,56 +294,58 @@ class BattleManager:
             'projectiles': self.projectiles,
             'coffee_beans': self.coffee_beans,
             'neuro_mowers': self.neuro_mowers,
-            'grid_state': grid_state
+            'coffee_machines': self.coffee_machines,
+            'heroes': self.heroes,
+            'occupancy_grid': self.occupancy_grid,
+            'lane_index': self.lane_index,
+            'spatial_hash': self.spatial_hash,
+            'enemy_index': self.enemy_index
         }
 
-        # Отслеживаем появление новых врагов для применения эффектов напастей
-        enemies_before_spawn = set(self.enemies.sprites())
         self.level_manager.update()
-        newly_spawned = set(self.enemies.sprites()) - enemies_before_spawn
+        self.lane_index.sync(self.enemies, self.defenders, self.neuro_mowers)
+        self.spatial_hash.sync('enemies', self.enemies)
+        self.spatial_hash.sync('defenders', self.defenders)
+        self.enemy_index.sync(self.enemies)
 
-        # Отслеживаем убийство врагов для прогресса уровня
-        enemies_before_update = len(self.enemies)
+        # Убийства учитывает сам LevelManager по событию ENEMY_DIED
         self.all_sprites.update(**update_args)
-        enemies_after_update = len(self.enemies)
-
-        killed_this_frame = enemies_before_update - enemies_after_update
-        for _ in range(killed_this_frame):
-            self.level_manager.enemy_killed()
 
         self.apply_auras()
         self.check_collisions()
         self._check_calamity_triggers(now)
-
-        # Применяем эффект напасти к только что появившимся врагам
-        if self.active_calamity:
-            for enemy in newly_spawned:
-                enemy.apply_calamity_effect(self.active_calamity)
+        # Учитываем погибших и сместившихся за шаг защитников (для кликов и следующего шага)
+        self.occupancy_grid.sync(self.defenders)
 
         # Проверяем прорыв врагов (Game Over)
         for enemy in list(self.enemies):
             if enemy.alive() and enemy.rect.right < GRID_START_X:
-                mower_activated = False
-                for mower in self.neuro_mowers:
-                    # Поиск нейросети на той же линии
-                    if mower.rect.centery == enemy.rect.centery and not mower.is_active:
-                        enemies_before_activation = set(self.enemies.sprites())
-                        mower.activate(self.enemies, enemy)
-                        enemies_after_activation = set(self.enemies.sprites())
-                        killed_by_mower = len(enemies_before_activation - enemies_after_activation)
-                        for _ in range(killed_by_mower):
-                            self.level_manager.enemy_killed()
-                        mower_activated = True
-                        break
+                # Поиск нейросети на той же линии
+                row = get_lane(enemy)
+                mower = self.lane_index.get_ready_mower(row) if row is not None else None
+                if mower:
+                    mower.activate(self.enemy_index, enemy)
                 # Если нейросети не было, игра проиграна
-                if not mower_activated:
+                else:
                     self.is_game_over = True
+                    self.breach_row = int((enemy.rect.centery - GRID_START_Y) // CELL_SIZE_H)
                     return
 
         # Обновление таймеров
         if self.calamity_notification and now > self.calamity_notification_timer: self.calamity_notification = None
         if self.active_calamity and now > self.calamity_end_time: self._end_calamity()
 
+    def _on_enemy_spawned(self, enemy):
+        """
+        Применяет эффект действующей напасти к только что появившемуся врагу (событие ENEMY_SPAWNED).
+
+        Эффект действует уже с первого шага врага и накладывается ровно один раз,
+        в том числе на врага, чье появление запустило напасть.
+        """
+        if self.active_calamity:
+            enemy.apply_calamity_effect(self.active_calamity)
+            self.calamity_affected.add(enemy)
+
     def _check_calamity_triggers(self, now):
         """Проверяет, не достигнут ли прогресс спавна порога для запуска напасти."""
         if self.active_calamity: return
@@ -322,7 +372,7 @@ class BattleManager:
 
         # Некоторые напасти имеют мгновенный эффект
         if self.active_calamity == 'big_party':
-            heroes_to_consider = [d for d in self.defenders if d.alive() and not isinstance(d, CoffeeMachine)]
+            heroes_to_consider = self.heroes.sprites()
             if heroes_to_consider:
                 num_to_remove = int(len(heroes_to_consider) * CALAMITY_BIG_PARTY_REMOVAL_RATIO)
                 heroes_to_remove = random.sample(heroes_to_consider, k=min(num_to_remove, len(heroes_to_consider)))
@@ -330,45 +380,57 @@ class BattleManager:
                     hero.kill()
             self.active_calamity = None # Эффект мгновенный
         else:
-            # Применяем эффекты к существующим спрайтам
-            for sprite in self.all_sprites:
-                if hasattr(sprite, 'apply_calamity_effect'): sprite.apply_calamity_effect(self.active_calamity)
+            # Применяем эффекты к существующим защитникам и врагам
+            for group in (self.defenders, self.enemies):
+                for sprite in group:
+                    sprite.apply_calamity_effect(self.active_calamity)
+                    self.calamity_affected.add(sprite)
 
     def _end_calamity(self):
         """Завершает действие напасти и возвращает параметры спрайтов в норму."""
         if not self.active_calamity: return
-        for sprite in self.all_sprites:
-            if hasattr(sprite, 'revert_calamity_effect'): sprite.revert_calamity_effect(self.active_calamity)
+        # Отменяем эффект только у тех, к кому он применялся (не у поставленных во время напасти)
+        for sprite in self.calamity_affected:
+            sprite.revert_calamity_effect(self.active_calamity)
+        self.calamity_affected.empty()
         self.active_calamity = None
 
     def check_collisions(self):
         """Проверяет и обрабатывает все столкновения между игровыми объектами."""
         # --- Снаряды vs Цели ---
+        # Все пересечения ищутся одним проходом sweep-and-prune по каждому ряду
+        waves = self.sound_waves.sprites()
+        enemy_shots = [p for p in self.projectiles if getattr(p, 'target_type', None) == 'enemy']
+        defender_shots = [p for p in self.projectiles if getattr(p, 'target_type', None) == 'defender']
+        enemy_hits = find_collisions(enemy_shots + waves, self.enemies)
+        defender_hits = find_collisions(defender_shots, self.defenders)
+        # Порядок спрайтов в группах: при нескольких пересечениях снаряд попадает в первую цель группы
+        enemy_order = {enemy: i for i, enemy in enumerate(self.enemies)}
+        defender_order = {defender: i for i, defender in enumerate(self.defenders)}
+
         for proj in list(self.projectiles):
             if not proj.alive():
                 continue
 
-            target_group = None
+            hits, target_order = None, None
             if hasattr(proj, 'target_type'):
                 if proj.target_type == 'enemy':
-                    target_group = self.enemies
+                    hits, target_order = enemy_hits.get(proj), enemy_order
                 elif proj.target_type == 'defender':
-                    target_group = self.defenders
-
-            if target_group:
-                hits = pygame.sprite.spritecollide(proj, target_group, False)
-                if hits:
-                    target = hits[0]
-                    if target.alive():
-                        if isinstance(proj, PaintSplat): # Особый эффект для кляксы
-                            target.slow_down(proj.artist.data['slow_factor'], proj.artist.data['slow_duration'])
-                        target.get_hit(proj.damage)
-                        proj.kill()
+                    hits, target_order = defender_hits.get(proj), defender_order
+
+            if hits:
+                target = min(hits, key=target_order.__getitem__)
+                if target.alive():
+                    if isinstance(proj, PaintSplat): # Особый эффект для кляксы
+                        target.slow_down(proj.artist.data['slow_factor'], proj.artist.data['slow_duration'])
+                    target.get_hit(proj.damage)
+                    proj.kill()
 
         # --- Звуковая волна vs Враги ---
-        for wave in [s for s in self.all_sprites if isinstance(s, SoundWave)]:
-            for enemy in self.enemies:
-                if wave.rect.colliderect(enemy.rect) and enemy not in wave.hit_enemies:
+        for wave in waves:
+            for enemy in sorted(enemy_hits.get(wave, ()), key=enemy_order.__getitem__):
+                if enemy not in wave.hit_enemies:
                     enemy.get_hit(wave.damage)
                     wave.hit_enemies.add(enemy) # Помечаем, чтобы не ударить дважды
 
@@ -377,39 +439,89 @@ class BattleManager:
             if not mower.is_active:
                 colliding_enemies = pygame.sprite.spritecollide(mower, self.enemies, False)
                 if colliding_enemies:
-                    enemies_before_activation = set(self.enemies.sprites())
-                    mower.activate(self.enemies, colliding_enemies[0])
-                    enemies_after_activation = set(self.enemies.sprites())
-                    killed_by_mower = len(enemies_before_activation - enemies_after_activation)
-                    for _ in range(killed_by_mower):
-                        self.level_manager.enemy_killed()
+                    mower.activate(self.enemy_index, colliding_enemies[0])
 
     def apply_auras(self):
-        """Применяет эффекты от аур (например, от Активиста) к защитникам."""
-        # Сначала сбрасываем баффы для всех
-        for d in self.defenders:
-            d.buff_multiplier = 1.0
-
-        # Затем находим всех активистов и применяем их ауры
-        for activist in [s for s in self.defenders if isinstance(s, Activist) and s.alive()]:
-            for defender in self.defenders:
-                if pygame.math.Vector2(activist.rect.center).distance_to(defender.rect.center) < activist.data[
-                    'radius'] * CELL_SIZE_W:
+        """
+        Применяет эффекты от аур (например, от Активиста) к защитникам.
+
+        Бафф хранится в buff_multiplier каждого защитника и пересчитывается только для
+        отмеченных событиями: размещенного или сместившегося защитника (Модник, жертва
+        Наркомана). Если появился, погиб или сместился Активист, баффы пересчитываются целиком.
+        """
+        if self.aura_full_recompute:
+            # Сначала сбрасываем баффы для всех
+            for d in self.defenders:
+                d.buff_multiplier = 1.0
+            # Затем применяем ауры всех активистов
+            for activist in self.activists:
+                pixel_radius = activist.data['radius'] * CELL_SIZE_W
+                for defender in self.spatial_hash.query_radius('defenders', activist.rect.center, pixel_radius,
+                                                               inclusive=False):
                     defender.buff_multiplier *= activist.data['buff']
+            self.aura_full_recompute = False
+        else:
+            for defender in self.aura_dirty:
+                if defender.alive():
+                    defender.buff_multiplier = self._get_aura_multiplier(defender)
+        self.aura_dirty.clear()
+
+    def _mark_aura_dirty(self, defender):
+        """Отмечает защитника для пересчета баффа (при размещении и по событию DEFENDER_MOVED)."""
+        if isinstance(defender, Activist):
+            self.aura_full_recompute = True
+        else:
+            self.aura_dirty.add(defender)
+
+    def _on_defender_died(self, defender):
+        """Гибель Активиста снимает его ауру со всех соседей, остальные погибшие просто выбывают из кэша."""
+        if isinstance(defender, Activist):
+            self.aura_full_recompute = True
+        self.aura_dirty.discard(defender)
+
+    def _get_aura_multiplier(self, defender):
+        """Вычисляет бафф одного защитника от всех Активистов, в радиусе которых он стоит."""
+        multiplier = 1.0
+        x, y = defender.rect.center
+        for activist in self.activists:
+            pixel_radius = activist.data['radius'] * CELL_SIZE_W
+            ax, ay = activist.rect.center
+            if (ax - x) ** 2 + (ay - y) ** 2 < pixel_radius * pixel_radius:
+                multiplier *= activist.data['buff']
+        return multiplier
+
+    def draw(self, surface, alpha=1.0):
+        """
+        Полная отрисовка боевого экрана.
 
-    def draw(self, surface):
-        """Полная отрисовка боевого экрана."""
-        self.draw_world(surface)
+        Args:
+            surface (pygame.Surface): Поверхность для отрисовки.
+            alpha (float): Доля шага симуляции, прошедшая после последнего обновления (0..1).
+        """
+        self.draw_world(surface, alpha)
         self.draw_hud(surface)
 
-    def draw_world(self, surface):
-        """Отрисовка только игрового мира (фон, сетка, спрайты)."""
+    def draw_world(self, surface, alpha=1.0):
+        """
+        Отрисовка только игрового мира (фон, сетка, спрайты).
+        Движущиеся спрайты рисуются между положениями до и после последнего шага
+        в пропорции alpha, поэтому движение остается плавным при любом FPS.
+        """
         surface.blit(self.background_image, (0, 0))
         self.ui_manager.draw_grid(surface)
 
-        # Сортировка по `_layer` для правильного порядка отрисовки
-        for sprite in sorted(self.all_sprites, key=lambda s: s._layer):
-            surface.blit(sprite.image, sprite.rect)
+        # Порядок по `_layer` поддерживает очередь отрисовки, кадр уходит одним вызовом blits
+        self.render_queue.sync(self.all_sprites)
+        blit_sequence = []
+        for sprite in self.render_queue.sprites:
+            prev_center = getattr(sprite, 'prev_center', None)
+            if alpha >= 1.0 or prev_center is None or prev_center == sprite.rect.center:
+                blit_sequence.append((sprite.image, sprite.rect))
+                continue
+            x = prev_center[0] + (sprite.rect.centerx - prev_center[0]) * alpha
+            y = prev_center[1] + (sprite.rect.centery - prev_center[1]) * alpha
+            blit_sequence.append((sprite.image, sprite.image.get_rect(center=(round(x), round(y)))))
+        surface.blits(blit_sequence, doreturn=False)
 
     def draw_hud(self, surface):
         """Отрисовка только интерфейса (магазин, прогресс-бары, уведомления)."""
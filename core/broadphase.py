@@ -0,0 +1,67 @@
+# core/broadphase.py
+
+from data.settings import *
+
+
+def _get_band_rows(rect):
+    """
+    Возвращает ряды сетки, которые перекрывает rect по вертикали.
+    Спрайты выше или ниже сетки относятся к крайним рядам, поэтому любые два
+    пересекающихся прямоугольника всегда окажутся хотя бы в одном общем ряду.
+    """
+    first = (rect.top - GRID_START_Y) // CELL_SIZE_H
+    last = (rect.bottom - 1 - GRID_START_Y) // CELL_SIZE_H
+    first = max(0, min(GRID_ROWS - 1, first))
+    last = max(0, min(GRID_ROWS - 1, last))
+    return range(first, last + 1)
+
+
+def find_collisions(movers, targets):
+    """
+    Находит все пересечения rect между "снарядами" и целями методом sweep-and-prune.
+
+    Спрайты раскладываются по рядам сетки, в каждом ряду сортируются по левому краю
+    и проходятся одним проходом слева направо. Проверяются только пары, которые
+    одновременно "открыты" по оси X, поэтому стоимость близка к O(n log n)
+    вместо перебора всех пар снаряд x цель.
+
+    Args:
+        movers (iterable): Снаряды (все, что ищет цели).
+        targets (iterable): Цели (враги или защитники).
+
+    Returns:
+        dict: {снаряд: set(цели, с которыми пересекается его rect)}; снаряды без попаданий не включаются.
+    """
+    if not movers or not targets:
+        return {}
+    bands = [([], []) for _ in range(GRID_ROWS)]
+    for is_target, sprites in ((False, movers), (True, targets)):
+        for sprite in sprites:
+            for row in _get_band_rows(sprite.rect):
+                bands[row][is_target].append(sprite)
+
+    hits = {}
+    for band_movers, band_targets in bands:
+        if not band_movers or not band_targets:
+            continue
+        entries = [(sprite, False) for sprite in band_movers] + [(sprite, True) for sprite in band_targets]
+        entries.sort(key=lambda entry: entry[0].rect.left)
+
+        active_movers = []
+        active_targets = []
+        for sprite, is_target in entries:
+            left = sprite.rect.left
+            # Все, что закончилось левее текущего спрайта, уже ни с кем дальше не пересечется
+            active_movers = [m for m in active_movers if m.rect.right > left]
+            active_targets = [t for t in active_targets if t.rect.right > left]
+            if is_target:
+                for mover in active_movers:
+                    if mover.rect.colliderect(sprite.rect):
+                        hits.setdefault(mover, set()).add(sprite)
+                active_targets.append(sprite)
+            else:
+                for target in active_targets:
+                    if sprite.rect.colliderect(target.rect):
+                        hits.setdefault(sprite, set()).add(target)
+                active_movers.append(sprite)
+    return hits
@@ -0,0 +1,51 @@
+# core/clock.py
+
+import pygame
+
+# Источник игрового времени (функция без аргументов, возвращающая миллисекунды).
+# None означает реальное время pygame.time.get_ticks(). Безголовая симуляция
+# подменяет его на SimulationClock, чтобы бой шел с любой скоростью и воспроизводимо.
+TIME_SOURCE = None
+
+
+def get_ticks():
+    """
+    Возвращает текущее игровое время в миллисекундах.
+    Вся логика боя (таймеры атак, спавна, анимаций, эффектов) читает время только отсюда.
+    """
+    if TIME_SOURCE is None:
+        return pygame.time.get_ticks()
+    return TIME_SOURCE()
+
+
+def set_time_source(source):
+    """
+    Подменяет источник игрового времени.
+
+    Args:
+        source (callable | None): Функция, возвращающая время в миллисекундах,
+                                  или None для возврата к pygame.time.get_ticks().
+    """
+    global TIME_SOURCE
+    TIME_SOURCE = source
+
+
+class SimulationClock:
+    """
+    Управляемые вручную часы для симуляции: время идет только при вызове advance().
+    Экземпляр можно передать в set_time_source() напрямую.
+    """
+
+    def __init__(self, start_ms=0):
+        """
+        Args:
+            start_ms (int): Начальное время в миллисекундах.
+        """
+        self.now = start_ms
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, ms):
+        """Сдвигает время вперед на ms миллисекунд."""
+        self.now += ms
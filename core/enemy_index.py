@@ -0,0 +1,158 @@
+# core/enemy_index.py
+
+import heapq
+from bisect import insort
+from data.settings import *
+
+
+class EnemyIndex:
+    """
+    Индекс врагов для запросов "самый сильный", "k самых сильных" и "k самых левых".
+
+    По здоровью враги хранятся в куче с ленивым удалением: при каждом изменении
+    здоровья (Enemy.health сообщает об этом сам) в кучу кладется новая запись,
+    а устаревшие записи пропускаются при чтении. По оси X враги разложены по
+    корзинам шириной bucket_width с отсортированным списком непустых корзин;
+    враг переходит в другую корзину при синхронизации (раз за шаг), а запрос
+    учитывает сдвиг внутри шага запасом query_margin.
+
+    При равенстве результаты упорядочены так же, как при переборе группы
+    (по порядку добавления), поэтому поведение совпадает с max/sorted по группе.
+    """
+
+    def __init__(self, bucket_width=ENEMY_INDEX_BUCKET_WIDTH, query_margin=ENEMY_INDEX_QUERY_MARGIN):
+        """
+        Args:
+            bucket_width (int): Ширина корзины по оси X в пикселях.
+            query_margin (int): Запас в пикселях на перемещение врагов после синхронизации.
+        """
+        self.bucket_width = bucket_width
+        self.query_margin = query_margin
+        self.order = {}          # {враг: порядковый номер добавления}
+        self.next_order = 0
+        self.health_heap = []    # Записи (-здоровье, порядок, отметка, враг)
+        self.health_stamp = {}   # {враг: отметка последней записи в куче}
+        self.buckets = {}        # {номер корзины: set(враги)}
+        self.bucket_keys = []    # Отсортированные номера непустых корзин
+        self.bucket_of = {}      # {враг: номер корзины}
+
+    def sync(self, enemies):
+        """
+        Добавляет новых врагов, убирает исчезнувших и переносит сместившихся между корзинами.
+
+        Args:
+            enemies (pygame.sprite.Group): Группа врагов.
+        """
+        members = set(enemies)
+        for enemy in [e for e in self.order if e not in members]:
+            self._remove(enemy)
+
+        for enemy in enemies:
+            if enemy not in self.order:
+                self.order[enemy] = self.next_order
+                self.next_order += 1
+                enemy.enemy_index = self
+                self.update_health(enemy)
+            bucket = self._get_bucket(enemy.rect.left)
+            if self.bucket_of.get(enemy) != bucket:
+                self._move_to_bucket(enemy, bucket)
+
+        # Уплотняем кучу, когда устаревших записей становится заметно больше живых
+        if len(self.health_heap) > 2 * len(self.order) + ENEMY_INDEX_HEAP_SLACK:
+            self.health_heap = [entry for entry in self.health_heap
+                                if entry[3] in self.order and self.health_stamp[entry[3]] == entry[2]]
+            heapq.heapify(self.health_heap)
+
+    def update_health(self, enemy):
+        """Учитывает новое здоровье врага (вызывается из Enemy.health)."""
+        if enemy not in self.order:
+            return
+        stamp = self.health_stamp.get(enemy, 0) + 1
+        self.health_stamp[enemy] = stamp
+        heapq.heappush(self.health_heap, (-enemy.health, self.order[enemy], stamp, enemy))
+
+    def _remove(self, enemy):
+        """Убирает врага из индекса (записи в куче удаляются лениво)."""
+        del self.order[enemy]
+        del self.health_stamp[enemy]
+        self._move_to_bucket(enemy, None)
+        del self.bucket_of[enemy]
+        if enemy.enemy_index is self:
+            enemy.enemy_index = None
+
+    def _get_bucket(self, x):
+        """Возвращает номер корзины для координаты x."""
+        return int(x // self.bucket_width)
+
+    def _move_to_bucket(self, enemy, bucket):
+        """Переносит врага в корзину bucket (None - убрать из корзин)."""
+        old_bucket = self.bucket_of.get(enemy)
+        if old_bucket is not None:
+            members = self.buckets[old_bucket]
+            members.discard(enemy)
+            if not members:
+                del self.buckets[old_bucket]
+                self.bucket_keys.remove(old_bucket)
+        if bucket is not None:
+            if bucket not in self.buckets:
+                self.buckets[bucket] = set()
+                insort(self.bucket_keys, bucket)
+            self.buckets[bucket].add(enemy)
+        self.bucket_of[enemy] = bucket
+
+    def _is_current(self, entry):
+        """Проверяет, что запись кучи не устарела и враг еще жив."""
+        enemy = entry[3]
+        return enemy.alive() and enemy in self.order and self.health_stamp[enemy] == entry[2]
+
+    def get_strongest(self):
+        """Возвращает живого врага с наибольшим текущим здоровьем или None."""
+        heap = self.health_heap
+        while heap and not self._is_current(heap[0]):
+            heapq.heappop(heap)
+        return heap[0][3] if heap else None
+
+    def get_strongest_k(self, k):
+        """
+        Возвращает до k живых врагов с наибольшим здоровьем (от большего к меньшему).
+
+        Args:
+            k (int): Сколько врагов вернуть.
+
+        Returns:
+            list: Враги; при равном здоровье - в порядке добавления.
+        """
+        heap = self.health_heap
+        taken = []
+        while heap and len(taken) < k:
+            entry = heapq.heappop(heap)
+            if self._is_current(entry):
+                taken.append(entry)
+        for entry in taken:
+            heapq.heappush(heap, entry)
+        return [entry[3] for entry in taken]
+
+    def get_leftmost_k(self, k):
+        """
+        Возвращает до k живых врагов с наименьшим rect.left (ближайших к базе).
+
+        Корзины просматриваются слева направо, пока следующая корзина, даже с учетом
+        сдвига врагов внутри шага, не окажется правее k-го найденного врага.
+
+        Args:
+            k (int): Сколько врагов вернуть.
+
+        Returns:
+            list: Враги слева направо; при равном rect.left - в порядке добавления.
+        """
+        if k <= 0:
+            return []
+        candidates = []
+        for bucket in self.bucket_keys:
+            if len(candidates) >= k:
+                kth_left = sorted(enemy.rect.left for enemy in candidates)[k - 1]
+                if bucket * self.bucket_width - self.query_margin > kth_left:
+                    break
+            candidates.extend(enemy for enemy in self.buckets[bucket] if enemy.alive())
+        candidates.sort(key=lambda enemy: (enemy.rect.left, self.order[enemy]))
+        return candidates[:k]
@@ -0,0 +1,51 @@
+# core/events.py
+
+# --- Типы событий жизненного цикла юнитов ---
+ENEMY_SPAWNED = 'enemy_spawned'          # Враг появился на поле (LevelManager.spawn_enemy)
+ENEMY_DAMAGED = 'enemy_damaged'          # Враг получил урон (Enemy.get_hit), payload: damage
+ENEMY_DIED = 'enemy_died'                # Враг уничтожен или ушел с поля (Enemy.kill)
+DEFENDER_DAMAGED = 'defender_damaged'    # Защитник получил урон (Defender.get_hit), payload: damage
+DEFENDER_DIED = 'defender_died'          # Защитник уничтожен (Defender.kill)
+DEFENDER_MOVED = 'defender_moved'        # Защитник сместился (Модник идет к врагу, Наркоман уносит жертву)
+
+
+class EventBus:
+    """
+    Шина событий боя: появление, урон и гибель юнитов.
+
+    Источники событий (враги, защитники, менеджер уровня) вызывают emit в момент,
+    когда событие произошло, а подписчики (счетчик убийств, напасти, статистика
+    симуляции) получают сам спрайт. Так учет не требует снимков групп до и после
+    каждого этапа шага. Обработчики вызываются синхронно в порядке подписки.
+    """
+
+    def __init__(self):
+        self.handlers = {}  # {тип события: [обработчики]}
+
+    def subscribe(self, event_type, handler):
+        """
+        Подписывает обработчик на событие.
+
+        Args:
+            event_type (str): Тип события (ENEMY_SPAWNED, ENEMY_DIED, ...).
+            handler (callable): Функция handler(sprite, **payload).
+        """
+        self.handlers.setdefault(event_type, []).append(handler)
+
+    def unsubscribe(self, event_type, handler):
+        """Отписывает обработчик от события (если он был подписан)."""
+        handlers = self.handlers.get(event_type)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+
+    def emit(self, event_type, sprite, **payload):
+        """
+        Сообщает подписчикам о событии.
+
+        Args:
+            event_type (str): Тип события.
+            sprite (pygame.sprite.Sprite): Юнит, с которым произошло событие.
+            **payload: Дополнительные данные события (например, damage).
+        """
+        for handler in tuple(self.handlers.get(event_type, ())):
+            handler(sprite, **payload)
@@ -2,14 +2,17 @@
 
 import pygame
 import sys
+from contextlib import nullcontext
 from data.settings import *
 from ui.ui_manager import UIManager
 from core.level_manager import LevelManager
-from data.assets import load_all_resources, load_image
+from data.assets import load_startup_resources, start_background_loading, load_image, get_loading_progress
 from data.levels import LEVELS
 from core.prep_manager import PrepManager
 from core.battle_manager import BattleManager
 from core.sound_manager import SoundManager
+from core.asset_prefetcher import LevelAssetPrefetcher
+from core.clock import SimulationClock, set_time_source
 from data.assets import resource_path
 
 class Game:
@@ -21,23 +24,43 @@ class Game:
     - Хранение общих данных, передаваемых между состояниями.
     """
 
-    def __init__(self):
-        # 1. Инициализация Pygame и его подсистем
-        pygame.mixer.pre_init(AUDIO_FREQUENCY, AUDIO_SIZE, AUDIO_CHANNELS, AUDIO_BUFFER)
-        pygame.init()
-        pygame.mixer.init()
-        pygame.mixer.set_num_channels(AUDIO_NUM_CHANNELS)
+    def __init__(self, profiler=None):
+        """
+        Args:
+            profiler (StartupProfiler, optional): Профилировщик запуска. Если передан,
+                                                  фазы запуска замеряются, а игра
+                                                  завершается после первого кадра.
+        """
+        self.profiler = profiler
 
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption(TITLE)
+        # 1. Инициализация Pygame и его подсистем
+        with self._profile_phase('pygame.init + mixer'):
+            pygame.mixer.pre_init(AUDIO_FREQUENCY, AUDIO_SIZE, AUDIO_CHANNELS, AUDIO_BUFFER)
+            pygame.init()
+            pygame.mixer.init()
+            pygame.mixer.set_num_channels(AUDIO_NUM_CHANNELS)
+
+        with self._profile_phase('display.set_mode'):
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption(TITLE)
         self.clock = pygame.time.Clock()
+        self.frame_ms = 0  # Длительность последнего кадра в мс
         self.running = True
 
-        # 2. Загрузка ресурсов и инициализация менеджеров
-        load_all_resources()
-        self.ui_manager = UIManager(self.screen)
-        self.sound_manager = SoundManager()
-        self.background = load_image('menu_background.png', DEFAULT_COLORS['background'], (SCREEN_WIDTH, SCREEN_HEIGHT))
+        # 2. Загрузка ресурсов и инициализация менеджеров.
+        # Синхронно грузится только то, что нужно стартовому экрану, остальное - в фоне.
+        with self._profile_phase('load_startup_resources'):
+            load_startup_resources()
+        with self._profile_phase('start_background_loading'):
+            start_background_loading()
+        with self._profile_phase('UIManager (renderers, fonts)'):
+            self.ui_manager = UIManager(self.screen)
+        with self._profile_phase('managers'):
+            self.sound_manager = SoundManager()
+            self.asset_prefetcher = LevelAssetPrefetcher()
+        with self._profile_phase('menu background'):
+            self.background = load_image('menu_background.png', DEFAULT_COLORS['background'],
+                                         (SCREEN_WIDTH, SCREEN_HEIGHT))
 
         # 3. Управление состояниями игры
         self.state = 'START_SCREEN'
@@ -51,9 +74,15 @@ class Game:
             'placed_neuro_mowers': {},
             'dragged_mower': None,
             'prep_manager': None,
-            'battle_manager': None
+            'battle_manager': None,
+            'battle_clock': None,      # Часы боя (SimulationClock), идут только во время шагов симуляции
+            'sim_accumulator': 0.0     # Время кадров, еще не израсходованное на шаги симуляции (мс)
         }
 
+    def _profile_phase(self, name):
+        """Возвращает контекст замера фазы запуска (пустой, если профилирование выключено)."""
+        return self.profiler.phase(name) if self.profiler else nullcontext()
+
     def _create_state_handlers(self):
         """
         Создает словарь-диспетчер. Ключ - имя состояния, значение - метод-обработчик.
@@ -76,7 +105,8 @@ class Game:
     def run(self):
         """Главный игровой цикл. Делегирует выполнение текущему состоянию."""
         while self.running:
-            self.dt = self.clock.tick(FPS) / 1000.0
+            self.frame_ms = self.clock.tick(FPS)
+            self.dt = self.frame_ms / 1000.0
 
             # Вызов метода-обработчика для текущего состояния
             handler = self.state_handlers.get(self.state)
@@ -89,6 +119,12 @@ class Game:
 
             pygame.display.flip()
 
+            if self.profiler:
+                # Режим профилирования запуска: завершаемся сразу после первого кадра
+                self.profiler.mark_first_frame()
+                self.profiler.extra['background loading at first frame'] = f"{get_loading_progress() * 100:.0f}%"
+                self.running = False
+
     # --- Методы подготовки к состояниям ---
 
     def _prepare_level(self, level_id):
@@ -99,9 +135,13 @@ class Game:
         Args:
             level_id (int): ID уровня, который нужно подготовить.
         """
+        set_time_source(None)  # Часы прошлого боя больше не нужны
         self.game_data['current_level_id'] = level_id
         self.game_data['prep_manager'] = PrepManager(self.ui_manager, self.game_data['stipend'], level_id,
                                                      self.sound_manager)
+        # Пока игрок собирает команду, ассеты боя загружаются в фоне
+        prep_manager = self.game_data['prep_manager']
+        self.asset_prefetcher.start(level_id, prep_manager.enemy_types, prep_manager.calamity_types)
         self.game_data['placed_neuro_mowers'].clear()
         self.game_data['dragged_mower'] = None
         self.sound_manager.play_music('prep_screen')
@@ -120,6 +160,10 @@ class Game:
         coffee_beans = pygame.sprite.Group()
         neuro_mowers = pygame.sprite.Group()
 
+        # Время боя идет только во время шагов симуляции (и стоит на паузе)
+        self.game_data['battle_clock'] = SimulationClock(pygame.time.get_ticks())
+        set_time_source(self.game_data['battle_clock'])
+
         level_manager = LevelManager(self.game_data['current_level_id'], enemies, all_sprites, self.sound_manager)
 
         final_mower_placement = {row: info['type'] for row, info in self.game_data['placed_neuro_mowers'].items()}
@@ -142,6 +186,7 @@ class Game:
         )
 
         self.game_data['battle_manager'].start()
+        self.game_data['sim_accumulator'] = 0.0
         self.sound_manager.play_music(f"level_{self.game_data['current_level_id']}")
         self.state = 'PLAYING'
 
@@ -231,6 +276,7 @@ class Game:
                     self.state = 'NEURO_PLACEMENT'
                 elif 'back' in prep_buttons and prep_buttons['back'].collidepoint(pos):
                     self.sound_manager.play_sfx('button')
+                    self.asset_prefetcher.release()
                     self.sound_manager.play_music('main_team')
                     self.state = 'MAIN_MENU'
 
@@ -309,8 +355,8 @@ class Game:
                 pygame.mixer.music.pause()
                 self.state = 'PAUSED'
 
-        battle_manager.update()
-        battle_manager.draw(self.screen)
+        alpha = self._step_battle(battle_manager)
+        battle_manager.draw(self.screen, alpha)
 
         # Проверка условий завершения уровня
         if battle_manager.level_manager.is_complete():
@@ -318,6 +364,35 @@ class Game:
         elif battle_manager.is_game_over:
             self._handle_level_loss()
 
+    def _step_battle(self, battle_manager):
+        """
+        Продвигает бой на время, прошедшее с прошлого кадра, фиксированными шагами.
+
+        Время кадра копится в аккумуляторе и расходуется шагами по SIMULATION_STEP_MS,
+        поэтому при просадке FPS за кадр выполняется несколько шагов и скорость боя
+        не меняется. Число шагов за кадр ограничено MAX_SIMULATION_STEPS_PER_FRAME:
+        если и этого не хватает, остаток отбрасывается (бой замедляется, но не
+        "захлебывается" все более долгими кадрами).
+
+        Returns:
+            float: Доля следующего шага, уже накопленная в аккумуляторе (0..1), для интерполяции.
+        """
+        accumulator = self.game_data['sim_accumulator'] + self.frame_ms
+        steps = 0
+        while accumulator >= SIMULATION_STEP_MS and steps < MAX_SIMULATION_STEPS_PER_FRAME:
+            self.game_data['battle_clock'].advance(SIMULATION_STEP_MS)
+            battle_manager.update()
+            accumulator -= SIMULATION_STEP_MS
+            steps += 1
+            if battle_manager.level_manager.is_complete() or battle_manager.is_game_over:
+                accumulator = 0.0
+                break
+
+        if accumulator >= SIMULATION_STEP_MS:
+            accumulator %= SIMULATION_STEP_MS
+        self.game_data['sim_accumulator'] = accumulator
+        return accumulator / SIMULATION_STEP_MS
+
     def _handle_level_win(self):
         """Обрабатывает логику победы в уровне."""
         # Начисляем бонусную стипендию
@@ -449,5 +524,7 @@ class Game:
     def _go_to_main_menu(self):
         """Переходит в главное меню и включает соответствующую музыку."""
         self.sound_manager.stop_music()
+        set_time_source(None)
+        self.asset_prefetcher.release()
         self.sound_manager.play_music('main_team')
         self.state = "MAIN_MENU"
\ No newline at end of file
@@ -0,0 +1,382 @@
+# core/hierarchical_pathfinding.py
+
+import heapq
+from data.configs.game import UP, DOWN, LEFT, RIGHT, HPA_CLUSTER_SIZE, HPA_LONG_ENTRANCE
+
+
+class HierarchicalPathfinder:
+    """
+    Иерархический поиск пути (HPA*) для больших полей.
+
+    Сетка делится на квадратные кластеры cluster_size x cluster_size. На каждой
+    границе соседних кластеров проходимые пары клеток образуют входы; для каждого
+    входа в граф добавляются переходные клетки по обе стороны границы. Внутри
+    кластера переходы соединены ребрами с длиной кратчайшего пути по клеткам
+    этого кластера. Поиск сначала идет по этому абстрактному графу, а потом
+    каждый его шаг уточняется по деревьям поиска, сохраненным при построении кластера.
+
+    Семантика сетки та же, что у core.pathfinding.find_path: ненулевые клетки
+    непроходимы, кроме конечной. Путь получается почти оптимальным (обычно на
+    несколько процентов длиннее), зато поиск на больших полях не перебирает
+    все клетки. При изменении клеток перестраиваются только затронутые кластеры.
+    """
+
+    def __init__(self, grid, cluster_size=HPA_CLUSTER_SIZE, version=None):
+        """
+        Args:
+            grid (list): Двумерная сетка grid[row][col]; объект используется по ссылке.
+            cluster_size (int): Сторона кластера в клетках.
+            version (int, optional): Версия сетки (OccupancyGrid.version), по которой построен граф.
+        """
+        self.grid = grid
+        self.cluster_size = cluster_size
+        self.rows = len(grid)
+        self.cols = len(grid[0]) if self.rows else 0
+        self.cluster_rows = -(-self.rows // cluster_size)
+        self.cluster_cols = -(-self.cols // cluster_size)
+        self.version = version
+        self.transitions = {}  # {граница: [(клетка, клетка по другую сторону)]}
+        self.inter_links = {}  # {клетка-переход: {клетки-переходы соседнего кластера}}
+        self.intra_edges = {}  # {кластер: {клетка-переход: {клетка-переход: длина}}}
+        self.intra_parents = {}  # {кластер: {клетка-переход: {клетка: предыдущая клетка}}} для уточнения
+        self.adjacency = {}  # {клетка-переход: [(сосед, длина ребра)]} - готовые списки для поиска
+        self.rebuild()
+
+    # --- Построение графа ---
+
+    def rebuild(self):
+        """Полностью перестраивает абстрактный граф."""
+        self.transitions = {}
+        self.inter_links = {}
+        self.intra_edges = {}
+        self.intra_parents = {}
+        self.adjacency = {}
+        for border in self._get_all_borders():
+            self._build_border(border)
+        for cluster_row in range(self.cluster_rows):
+            for cluster_col in range(self.cluster_cols):
+                self._build_cluster((cluster_row, cluster_col))
+
+    def update_cells(self, changed_cells):
+        """
+        Перестраивает граф только вокруг изменившихся клеток.
+
+        Пересчитываются входы на границах кластеров с изменениями и ребра внутри
+        этих кластеров и их соседей по пересчитанным границам.
+
+        Args:
+            changed_cells (iterable): Клетки (row, col), сменившие проходимость.
+        """
+        clusters = {self._get_cluster(cell) for cell in changed_cells
+                    if 0 <= cell[0] < self.rows and 0 <= cell[1] < self.cols}
+        borders = set()
+        for cluster in clusters:
+            borders.update(self._get_cluster_borders(cluster))
+        for border in borders:
+            self._build_border(border)
+        for border in borders:
+            clusters.update(self._get_border_clusters(border))
+        for cluster in clusters:
+            self._build_cluster(cluster)
+
+    def sync(self, occupancy_grid):
+        """
+        Приводит граф к текущему состоянию сетки занятости.
+
+        Использует журнал изменений OccupancyGrid; если он не покрывает версию
+        графа, граф перестраивается целиком.
+        """
+        if self.version == occupancy_grid.version:
+            return
+        changed_cells = None
+        if self.version is not None:
+            changed_cells = occupancy_grid.get_changes_since(self.version)
+        if changed_cells is None:
+            self.rebuild()
+        else:
+            self.update_cells(changed_cells)
+        self.version = occupancy_grid.version
+
+    def _get_cluster(self, cell):
+        """Возвращает кластер (cluster_row, cluster_col), содержащий клетку."""
+        return cell[0] // self.cluster_size, cell[1] // self.cluster_size
+
+    def _get_cluster_bounds(self, cluster):
+        """Возвращает границы кластера в клетках: (первый ряд, ряд за последним, первая колонка, колонка за последней)."""
+        size = self.cluster_size
+        top, left = cluster[0] * size, cluster[1] * size
+        return top, min(top + size, self.rows), left, min(left + size, self.cols)
+
+    def _get_all_borders(self):
+        """
+        Перечисляет все границы между кластерами.
+        ('h', r, c) - между кластерами (r, c) и (r + 1, c); ('v', r, c) - между (r, c) и (r, c + 1).
+        """
+        borders = []
+        for cluster_row in range(self.cluster_rows):
+            for cluster_col in range(self.cluster_cols):
+                if cluster_row + 1 < self.cluster_rows:
+                    borders.append(('h', cluster_row, cluster_col))
+                if cluster_col + 1 < self.cluster_cols:
+                    borders.append(('v', cluster_row, cluster_col))
+        return borders
+
+    def _get_cluster_borders(self, cluster):
+        """Возвращает границы, которых касается кластер."""
+        cluster_row, cluster_col = cluster
+        borders = []
+        if cluster_row + 1 < self.cluster_rows:
+            borders.append(('h', cluster_row, cluster_col))
+        if cluster_row > 0:
+            borders.append(('h', cluster_row - 1, cluster_col))
+        if cluster_col + 1 < self.cluster_cols:
+            borders.append(('v', cluster_row, cluster_col))
+        if cluster_col > 0:
+            borders.append(('v', cluster_row, cluster_col - 1))
+        return borders
+
+    @staticmethod
+    def _get_border_clusters(border):
+        """Возвращает два кластера по сторонам границы."""
+        kind, cluster_row, cluster_col = border
+        if kind == 'h':
+            return (cluster_row, cluster_col), (cluster_row + 1, cluster_col)
+        return (cluster_row, cluster_col), (cluster_row, cluster_col + 1)
+
+    def _get_border_pairs(self, border):
+        """Возвращает пары соседних клеток (своя сторона, другая сторона) вдоль границы."""
+        kind, cluster_row, cluster_col = border
+        first, _ = self._get_border_clusters(border)
+        top, bottom, left, right = self._get_cluster_bounds(first)
+        if kind == 'h':
+            return [((bottom - 1, col), (bottom, col)) for col in range(left, right)]
+        return [((row, right - 1), (row, right)) for row in range(top, bottom)]
+
+    def _build_border(self, border):
+        """Пересчитывает входы на границе и межкластерные ребра."""
+        for cell, other in self.transitions.get(border, ()):
+            self._unlink(cell, other)
+
+        grid = self.grid
+        transitions = []
+        run = []
+        for cell, other in self._get_border_pairs(border) + [(None, None)]:
+            if cell is not None and grid[cell[0]][cell[1]] == 0 and grid[other[0]][other[1]] == 0:
+                run.append((cell, other))
+                continue
+            if run:
+                # Длинный вход получает переходы на обоих концах, короткий - один посередине
+                if len(run) >= HPA_LONG_ENTRANCE:
+                    transitions.extend((run[0], run[-1]))
+                else:
+                    transitions.append(run[len(run) // 2])
+                run = []
+
+        self.transitions[border] = transitions
+        for cell, other in transitions:
+            self.inter_links.setdefault(cell, set()).add(other)
+            self.inter_links.setdefault(other, set()).add(cell)
+
+    def _unlink(self, cell, other):
+        """Удаляет межкластерное ребро между двумя переходами."""
+        for a, b in ((cell, other), (other, cell)):
+            links = self.inter_links.get(a)
+            if links is not None:
+                links.discard(b)
+                if not links:
+                    del self.inter_links[a]
+
+    def _build_cluster(self, cluster):
+        """Пересчитывает ребра между переходами внутри кластера."""
+        nodes = set()
+        for border in self._get_cluster_borders(cluster):
+            for cell, other in self.transitions.get(border, ()):
+                nodes.add(cell if self._get_cluster(cell) == cluster else other)
+
+        for node in self.intra_edges.get(cluster, ()):
+            self.adjacency.pop(node, None)
+
+        edges = {}
+        parents = {}
+        for node in sorted(nodes):
+            distance, parents[node] = self._search_in_cluster(node, cluster)
+            edges[node] = {other: distance[other] for other in sorted(nodes)
+                           if other != node and other in distance}
+            self.adjacency[node] = (list(edges[node].items())
+                                    + [(other, 1) for other in sorted(self.inter_links.get(node, ()))])
+        self.intra_edges[cluster] = edges
+        self.intra_parents[cluster] = parents
+
+    def _search_in_cluster(self, start, cluster, end=None):
+        """
+        Обход в ширину от клетки start, не выходящий за пределы кластера.
+
+        Args:
+            start (tuple): Клетка начала (сама может быть занята).
+            cluster (tuple): Кластер, которым ограничен обход.
+            end (tuple, optional): Конечная клетка пути, проходимая даже если занята.
+
+        Returns:
+            tuple: ({клетка: расстояние}, {клетка: предыдущая клетка}).
+        """
+        top, bottom, left, right = self._get_cluster_bounds(cluster)
+        grid = self.grid
+        distance = {start: 0}
+        came_from = {}
+        frontier = [start]
+        while frontier:
+            next_frontier = []
+            for row, col in frontier:
+                for d_row, d_col in (UP, DOWN, LEFT, RIGHT):
+                    child = (row + d_row, col + d_col)
+                    if not (top <= child[0] < bottom and left <= child[1] < right) or child in distance:
+                        continue
+                    if grid[child[0]][child[1]] != 0 and child != end:
+                        continue
+                    distance[child] = distance[(row, col)] + 1
+                    came_from[child] = (row, col)
+                    next_frontier.append(child)
+            frontier = next_frontier
+        return distance, came_from
+
+    # --- Поиск ---
+
+    def find_path(self, start, end):
+        """
+        Ищет путь между клетками через абстрактный граф кластеров.
+
+        Args:
+            start (tuple): Начальная клетка (row, col).
+            end (tuple): Конечная клетка (row, col).
+
+        Returns:
+            list | None: Список клеток (row, col) от start до end или None.
+        """
+        if not (0 <= start[0] < self.rows and 0 <= start[1] < self.cols
+                and 0 <= end[0] < self.rows and 0 <= end[1] < self.cols):
+            return None
+        if start == end:
+            return [start]
+
+        # Временно подключаем старт и финиш к переходам ближайших кластеров
+        extra_edges = {}
+        extra_paths = {}  # {(узел, узел): клетки пути после первого узла до второго включительно}
+        for target, path in self._get_local_routes(start, end, end).items():
+            self._add_extra_edge(extra_edges, extra_paths, start, target, path)
+        for target, path in self._get_local_routes(end, start, start).items():
+            # Путь найден от финиша, разворачиваем его к финишу
+            full = [end] + path
+            self._add_extra_edge(extra_edges, extra_paths, target, end, full[::-1][1:])
+
+        abstract_path = self._search_abstract(start, end, extra_edges)
+        if abstract_path is None:
+            return None
+
+        # Уточняем каждый шаг абстрактного пути по сохраненному дереву поиска его кластера
+        path = [start]
+        for node, next_node in zip(abstract_path, abstract_path[1:]):
+            if (node, next_node) in extra_paths:
+                path.extend(extra_paths[(node, next_node)])
+            elif self._get_cluster(node) != self._get_cluster(next_node):
+                path.append(next_node)  # Межкластерное ребро - соседние клетки
+            else:
+                came_from = self.intra_parents[self._get_cluster(node)][node]
+                segment = []
+                cell = next_node
+                while cell != node:
+                    segment.append(cell)
+                    cell = came_from[cell]
+                path.extend(reversed(segment))
+        return path
+
+    def _get_local_routes(self, cell, other, passable):
+        """
+        Находит пути от клетки до переходов ее кластера и соседних с ней кластеров.
+
+        Сама клетка может быть занята (Наркоман на защитнике, защитник-цель),
+        поэтому из нее можно шагнуть и в соседний кластер: такие соседи тоже
+        служат началом поиска.
+
+        Args:
+            cell (tuple): Клетка старта или финиша.
+            other (tuple): Вторая конечная клетка пути; тоже считается целью.
+            passable (tuple): Занятая клетка, через которую можно пройти (финиш пути).
+
+        Returns:
+            dict: {клетка-цель: список клеток после cell до цели включительно}.
+        """
+        sources = [(cell, [])]
+        for d_row, d_col in (UP, DOWN, LEFT, RIGHT):
+            neighbor = (cell[0] + d_row, cell[1] + d_col)
+            if not (0 <= neighbor[0] < self.rows and 0 <= neighbor[1] < self.cols):
+                continue
+            if self._get_cluster(neighbor) == self._get_cluster(cell):
+                continue
+            if self.grid[neighbor[0]][neighbor[1]] == 0 or neighbor == passable:
+                sources.append((neighbor, [neighbor]))
+
+        routes = {}
+        for source, prefix in sources:
+            cluster = self._get_cluster(source)
+            distance, came_from = self._search_in_cluster(source, cluster, end=passable)
+            targets = [(node, node) for node in self.intra_edges[cluster] if node != cell]
+            if other != cell:
+                # Вторая конечная клетка может лежать и сразу за границей кластера
+                targets.append((other, other))
+                for d_row, d_col in (UP, DOWN, LEFT, RIGHT):
+                    targets.append((other, (other[0] + d_row, other[1] + d_col)))
+            for target, last in targets:
+                if last not in distance:
+                    continue
+                length = len(prefix) + distance[last] + (last != target)
+                if target in routes and len(routes[target]) <= length:
+                    continue
+                segment = [target] if last != target else []
+                step = last
+                while step != source:
+                    segment.append(step)
+                    step = came_from[step]
+                routes[target] = prefix + segment[::-1]
+        return routes
+
+    @staticmethod
+    def _add_extra_edge(extra_edges, extra_paths, node, next_node, path):
+        """Добавляет временное ребро, если оно короче уже известного."""
+        edges = extra_edges.setdefault(node, {})
+        if next_node in edges and edges[next_node] <= len(path):
+            return
+        edges[next_node] = len(path)
+        extra_paths[(node, next_node)] = path
+
+    def _search_abstract(self, start, end, extra_edges):
+        """A* по графу переходов; возвращает список узлов от start до end или None."""
+        end_row, end_col = end
+        best_g = {start: 0}
+        came_from = {}
+        closed = set()
+        counter = 0
+        open_heap = [(abs(start[0] - end_row) + abs(start[1] - end_col), 0, counter, start)]
+        while open_heap:
+            _, neg_g, _, node = heapq.heappop(open_heap)
+            if node in closed:
+                continue
+            if node == end:
+                path = [node]
+                while node != start:
+                    node = came_from[node]
+                    path.append(node)
+                return path[::-1]
+            closed.add(node)
+            g = -neg_g
+            for neighbor, cost in self.adjacency.get(node, []) + list(extra_edges.get(node, {}).items()):
+                if neighbor in closed:
+                    continue
+                child_g = g + cost
+                if child_g >= best_g.get(neighbor, child_g + 1):
+                    continue
+                best_g[neighbor] = child_g
+                came_from[neighbor] = node
+                counter += 1
+                f = child_g + abs(neighbor[0] - end_row) + abs(neighbor[1] - end_col)
+                heapq.heappush(open_heap, (f, -child_g, counter, neighbor))
+        return None
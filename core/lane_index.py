@@ -0,0 +1,167 @@
+# core/lane_index.py
+
+from bisect import bisect_left
+import pygame
+from data.settings import *
+
+
+def _get_row_center_y(row):
+    """Возвращает Y центра ряда в целых пикселях - так же, как его округляет rect спрайта, поставленного в ряд."""
+    probe = pygame.Rect(0, 0, 0, 0)
+    probe.centery = GRID_START_Y + row * CELL_SIZE_H + CELL_SIZE_H / 2
+    return probe.centery
+
+
+# Соответствие "Y центра ряда -> номер ряда". Спрайт стоит на линии, только если
+# его центр точно на центре ряда (как в исходных проверках rect.centery == rect.centery).
+ROW_BY_CENTER_Y = {_get_row_center_y(row): row for row in range(GRID_ROWS)}
+
+
+def get_lane(sprite):
+    """
+    Возвращает номер ряда, на линии которого стоит спрайт.
+
+    Returns:
+        int | None: Номер ряда или None, если спрайт между рядами (например, Наркоман в пути).
+    """
+    return ROW_BY_CENTER_Y.get(sprite.rect.centery)
+
+
+class LaneIndex:
+    """
+    Индекс спрайтов боя по линиям (рядам) сетки.
+
+    Для каждого ряда хранит списки врагов, защитников и нейросетей, отсортированные
+    по левому краю rect. Благодаря этому поиск "ближайший враг справа на моей линии"
+    выполняется бинарным поиском за O(log n), а не перебором всей группы.
+
+    Индекс синхронизируется с группами спрайтов в начале каждого шага боя (sync):
+    новые спрайты добавляются, уничтоженные удаляются, сменившие ряд переносятся.
+    Внутри шага спрайты двигаются, поэтому запросы сверяют найденных кандидатов
+    с их текущими rect и пропускают уже уничтоженных.
+    """
+    KINDS = ('enemies', 'defenders', 'mowers')
+
+    def __init__(self):
+        self.lanes = {kind: [[] for _ in range(GRID_ROWS)] for kind in self.KINDS}
+        self.keys = {kind: [[] for _ in range(GRID_ROWS)] for kind in self.KINDS}  # rect.left для bisect
+        self.rows = {kind: {} for kind in self.KINDS}     # {спрайт: ряд или None}
+        self.max_width = {kind: 0 for kind in self.KINDS}  # Для ограничения поиска пересечений
+
+    def sync(self, enemies, defenders, neuro_mowers):
+        """
+        Приводит индекс в соответствие с группами спрайтов (вызывается раз за шаг).
+
+        Args:
+            enemies (pygame.sprite.Group): Группа врагов.
+            defenders (pygame.sprite.Group): Группа защитников.
+            neuro_mowers (pygame.sprite.Group): Группа нейросетей.
+        """
+        self._sync_kind('enemies', enemies)
+        self._sync_kind('defenders', defenders)
+        self._sync_kind('mowers', neuro_mowers)
+
+    def _sync_kind(self, kind, group):
+        """Обновляет ряды одного вида спрайтов и пересортировывает их линии по X."""
+        rows = self.rows[kind]
+        lanes = self.lanes[kind]
+        members = set(group)
+
+        # Уничтоженные спрайты уже не входят в группу
+        for sprite in [s for s in rows if s not in members]:
+            row = rows.pop(sprite)
+            if row is not None:
+                lanes[row].remove(sprite)
+
+        # Появившиеся и сменившие ряд
+        for sprite in group:
+            row = get_lane(sprite)
+            if sprite in rows:
+                old_row = rows[sprite]
+                if old_row == row:
+                    continue
+                if old_row is not None:
+                    lanes[old_row].remove(sprite)
+            if row is not None:
+                lanes[row].append(sprite)
+            rows[sprite] = row
+        self.max_width[kind] = max((sprite.rect.width for sprite in members), default=0)
+
+        # Между шагами порядок почти не меняется, поэтому сортировка почти линейна
+        keys = self.keys[kind]
+        for row, lane in enumerate(lanes):
+            if lane:
+                lane.sort(key=lambda s: s.rect.left)
+            keys[row] = [s.rect.left for s in lane]
+
+    def get_sprites(self, kind, row):
+        """Возвращает список спрайтов вида kind на линии row, отсортированный по X."""
+        return self.lanes[kind][row]
+
+    def get_nearest_enemy_right(self, row, x):
+        """
+        Находит ближайшего живого врага на линии, чей левый край не левее x.
+
+        Args:
+            row (int): Номер ряда.
+            x (int): Координата X, от которой ведется поиск вправо.
+
+        Returns:
+            Enemy | None: Найденный враг или None.
+        """
+        lane = self.lanes['enemies'][row]
+        start = bisect_left(self.keys['enemies'][row], x)
+        for i in range(start, len(lane)):
+            enemy = lane[i]
+            if enemy.alive() and enemy.rect.left >= x and get_lane(enemy) == row:
+                return enemy
+        return None
+
+    def get_nearest_defender_left(self, row, x):
+        """
+        Находит ближайшего живого защитника на линии, чей правый край левее x.
+
+        Args:
+            row (int): Номер ряда.
+            x (int): Координата X, от которой ведется поиск влево.
+
+        Returns:
+            Defender | None: Найденный защитник или None.
+        """
+        lane = self.lanes['defenders'][row]
+        end = bisect_left(self.keys['defenders'][row], x)
+        for i in range(end - 1, -1, -1):
+            defender = lane[i]
+            if defender.alive() and defender.rect.right < x and get_lane(defender) == row:
+                return defender
+        return None
+
+    def get_colliding_defender(self, row, rect):
+        """
+        Находит живого защитника на линии, пересекающегося с rect.
+        Кандидаты перебираются слева направо, поэтому при нескольких пересечениях
+        возвращается самый левый - тот, к которому враг подошел вплотную.
+
+        Args:
+            row (int): Номер ряда.
+            rect (pygame.Rect): Прямоугольник, с которым проверяется пересечение.
+
+        Returns:
+            Defender | None: Найденный защитник или None.
+        """
+        lane = self.lanes['defenders'][row]
+        keys = self.keys['defenders'][row]
+        start = bisect_left(keys, rect.left - self.max_width['defenders'])
+        end = bisect_left(keys, rect.right)
+        for i in range(start, end):
+            defender = lane[i]
+            if defender.alive() and rect.colliderect(defender.rect) and get_lane(defender) == row:
+                return defender
+        return None
+
+    def get_ready_mower(self, row):
+        """Возвращает неактивированную нейросеть на линии row или None."""
+        for mower in self.lanes['mowers'][row]:
+            if mower.alive() and not mower.is_active:
+                return mower
+        return None
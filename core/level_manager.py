@@ -5,6 +5,8 @@ import random
 from data.levels import LEVELS
 from entities.enemies import Enemy, Calculus, MathTeacher, Addict, Thief
 from data.settings import *
+from core.clock import get_ticks
+from core.events import EventBus, ENEMY_SPAWNED, ENEMY_DIED
 
 
 class LevelManager:
@@ -34,6 +36,10 @@ class LevelManager:
 
         self.is_running = False # Флаг, запущен ли уровень
 
+        # Шина событий боя: враги сообщают в нее о появлении, уроне и гибели
+        self.event_bus = EventBus()
+        self.event_bus.subscribe(ENEMY_DIED, self.enemy_killed)
+
         # --- Счетчики прогресса ---
         self.total_enemies_in_level = len(self.enemy_spawn_list)
         self.enemies_killed = 0
@@ -48,10 +54,15 @@ class LevelManager:
     def start(self):
         """Запускает уровень и таймер спавна."""
         self.is_running = True
-        self.last_spawn_time = pygame.time.get_ticks()
+        self.last_spawn_time = get_ticks()
+
+    def enemy_killed(self, enemy=None):
+        """
+        Увеличивает счетчик убитых врагов (подписан на событие ENEMY_DIED).
 
-    def enemy_killed(self):
-        """Увеличивает счетчик убитых врагов."""
+        Args:
+            enemy (Enemy, optional): Уничтоженный враг.
+        """
         self.enemies_killed += 1
 
     def get_spawn_progress(self):
@@ -92,7 +103,7 @@ class LevelManager:
         if not self.is_running or not self.enemy_spawn_list or self.enemy_group is None:
             return
 
-        now = pygame.time.get_ticks()
+        now = get_ticks()
 
         # Проверяем, не достигнут ли порог для начала "финальной волны"
         if not self.in_final_wave and self.total_enemies_in_level > 0 and \
@@ -127,7 +138,9 @@ class LevelManager:
 
         # Выбираем нужный класс или базовый Enemy, если тип не найден в карте
         enemy_class = enemy_map.get(enemy_type, Enemy)
-        enemy_class(row, groups, enemy_type, self.sound_manager)
+        enemy = enemy_class(row, groups, enemy_type, self.sound_manager)
+        enemy.event_bus = self.event_bus
+        self.event_bus.emit(ENEMY_SPAWNED, enemy)
 
     def is_complete(self):
         """
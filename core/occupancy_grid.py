@@ -0,0 +1,155 @@
+# core/occupancy_grid.py
+
+import itertools
+from collections import deque
+from data.settings import *
+
+# Общий счетчик версий: версии разных сеток не повторяются в пределах процесса,
+# поэтому их можно использовать как ключ кэшей путей и полей направлений (core.pathfinding)
+_VERSIONS = itertools.count(1)
+
+
+def get_defender_cell(sprite):
+    """
+    Возвращает ячейку (ряд, колонка), в которой находится центр спрайта.
+
+    Returns:
+        tuple | None: (row, col) или None, если центр вне сетки.
+    """
+    col = int((sprite.rect.centerx - GRID_START_X) / CELL_SIZE_W)
+    row = int((sprite.rect.centery - GRID_START_Y) / CELL_SIZE_H)
+    if 0 <= row < GRID_ROWS and 0 <= col < GRID_COLS:
+        return row, col
+    return None
+
+
+def get_defender_footprint(sprite):
+    """
+    Возвращает ячейки, с которыми пересекается прямоугольник спрайта.
+
+    Пересечение понимается как в pygame.Rect.colliderect: касание краями не считается.
+
+    Returns:
+        tuple: Кортеж ячеек (row, col) в пределах сетки (пустой, если спрайт вне сетки).
+    """
+    rect = sprite.rect
+    if rect.width <= 0 or rect.height <= 0:
+        return ()
+    first_col = max((rect.left - GRID_START_X) // CELL_SIZE_W, 0)
+    last_col = min((rect.right - GRID_START_X - 1) // CELL_SIZE_W, GRID_COLS - 1)
+    first_row = max((rect.top - GRID_START_Y) // CELL_SIZE_H, 0)
+    last_row = min((rect.bottom - GRID_START_Y - 1) // CELL_SIZE_H, GRID_ROWS - 1)
+    return tuple((row, col) for row in range(first_row, last_row + 1) for col in range(first_col, last_col + 1))
+
+
+class OccupancyGrid:
+    """
+    Сетка занятости поля защитниками, общая для поиска пути и размещения юнитов.
+
+    cells[row][col] - число защитников, чей центр в ячейке (0 - ячейка проходима).
+    covered[row][col] - число защитников, чей прямоугольник задевает ячейку: по нему
+    проверяется размещение, ведь сдвинутый защитник мешает поставить юнита и в
+    соседнюю клетку, хотя проходимость для поиска пути определяет только центр.
+    Сетка обновляется при размещении (add) и раз за шаг сверяется с группой
+    защитников (sync), чтобы учесть гибель и перемещения (Модник, жертва Наркомана).
+    Версия version меняется при каждом изменении проходимости, поэтому
+    потребители (например, поле направлений Наркомана) могут понять, что их данные устарели.
+    """
+
+    def __init__(self):
+        self.cells = [[0 for _ in range(GRID_COLS)] for _ in range(GRID_ROWS)]
+        self.cell_of = {}  # {защитник: (row, col) или None}
+        self.covered = [[0 for _ in range(GRID_COLS)] for _ in range(GRID_ROWS)]
+        self.footprint_of = {}  # {защитник: кортеж задетых ячеек}
+        self.version = next(_VERSIONS)
+        self.base_version = self.version
+        # Журнал изменений проходимости [(новая версия, (row, col))] для инкрементального ремонта путей
+        self.changes = deque(maxlen=OCCUPANCY_CHANGE_LOG_SIZE)
+        self.dropped_version = 0  # Версия последней записи, вытесненной из журнала
+
+    def is_occupied(self, row, col):
+        """Проверяет за O(1), стоит ли в ячейке хотя бы один защитник."""
+        return self.cells[row][col] > 0
+
+    def is_covered(self, row, col):
+        """Проверяет за O(1), задевает ли ячейку прямоугольник хотя бы одного защитника."""
+        return self.covered[row][col] > 0
+
+    def get_changes_since(self, version):
+        """
+        Возвращает клетки, чья проходимость менялась после версии version.
+
+        Args:
+            version (int): Версия этой сетки, от которой нужны изменения.
+
+        Returns:
+            set | None: Множество клеток (row, col) или None, если версия не принадлежит
+                        этой сетке или журнал уже не хранит изменения с того момента.
+        """
+        if version == self.version:
+            return set()
+        if version < self.dropped_version:
+            return None
+        if version not in (self.base_version, self.dropped_version) and all(v != version for v, _ in self.changes):
+            return None
+        return {cell for v, cell in self.changes if v > version}
+
+    def add(self, defender):
+        """Учитывает только что размещенного защитника."""
+        self._set_cell(defender, get_defender_cell(defender))
+        self._set_footprint(defender, get_defender_footprint(defender))
+
+    def sync(self, defenders):
+        """
+        Сверяет сетку с группой защитников: убирает погибших и переносит сместившихся.
+
+        Args:
+            defenders (pygame.sprite.Group): Группа защитников.
+        """
+        members = set(defenders)
+        for defender in [d for d in self.cell_of if d not in members]:
+            self._set_cell(defender, None)
+            del self.cell_of[defender]
+        for defender in [d for d in self.footprint_of if d not in members]:
+            self._set_footprint(defender, ())
+            del self.footprint_of[defender]
+        for defender in defenders:
+            cell = get_defender_cell(defender)
+            if self.cell_of.get(defender) != cell:
+                self._set_cell(defender, cell)
+            footprint = get_defender_footprint(defender)
+            if self.footprint_of.get(defender) != footprint:
+                self._set_footprint(defender, footprint)
+
+    def _set_cell(self, defender, cell):
+        """Переносит защитника в ячейку cell (None - вне сетки) и обновляет счетчики."""
+        old_cell = self.cell_of.get(defender)
+        if old_cell == cell:
+            self.cell_of[defender] = cell
+            return
+        if old_cell is not None:
+            row, col = old_cell
+            self.cells[row][col] -= 1
+            if self.cells[row][col] == 0:
+                self._bump_version(old_cell)
+        if cell is not None:
+            row, col = cell
+            self.cells[row][col] += 1
+            if self.cells[row][col] == 1:
+                self._bump_version(cell)
+        self.cell_of[defender] = cell
+
+    def _set_footprint(self, defender, footprint):
+        """Переносит след защитника на ячейки footprint (на проходимость и версию не влияет)."""
+        for row, col in self.footprint_of.get(defender, ()):
+            self.covered[row][col] -= 1
+        for row, col in footprint:
+            self.covered[row][col] += 1
+        self.footprint_of[defender] = footprint
+
+    def _bump_version(self, cell):
+        """Выдает новую версию и записывает клетку, сменившую проходимость, в журнал."""
+        if len(self.changes) == self.changes.maxlen:
+            self.dropped_version = self.changes[0][0]
+        self.version = next(_VERSIONS)
+        self.changes.append((self.version, cell))
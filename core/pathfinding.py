@@ -1,81 +1,317 @@
 # core/pathfinding.py
 
 import heapq
-from data.configs.game import UP, DOWN, LEFT, RIGHT
+from collections import OrderedDict
+from functools import partial
+from data.configs.game import UP, DOWN, LEFT, RIGHT, PATH_CACHE_SIZE, FLOW_FIELD_CACHE_SIZE
 
-class Node:
-    """Узел для алгоритма A*. Представляет собой одну клетку сетки."""
+# Кэш найденных путей {(версия сетки, старт, финиш, иерархический режим): кортеж клеток или None}.
+# Ключ включает версию сетки, поэтому после любого изменения проходимости
+# старые записи просто перестают запрашиваться и вытесняются как самые давние.
+PATH_CACHE = OrderedDict()
+_NOT_CACHED = object()
 
-    def __init__(self, parent=None, position=None):
-        self.parent = parent
-        self.position = position  # (row, col)
+# Кэш полей направлений {(версия сетки, клетка цели): FlowField} с тем же вытеснением
+FLOW_FIELD_CACHE = OrderedDict()
 
-        self.g = 0  # Расстояние от начального узла
-        self.h = 0  # Эвристическое расстояние до конечного узла
-        self.f = 0  # Общая стоимость (g + h)
 
-    def __eq__(self, other):
-        return self.position == other.position
+def find_path(grid, start, end, version=None, hierarchy=None):
+    """
+    Алгоритм поиска пути A*.
+    Клетки сетки с ненулевым значением непроходимы, кроме конечной клетки end.
+    Возвращает список кортежей (row, col), представляющих путь, или None.
+
+    Args:
+        grid (list): Двумерная сетка grid[row][col].
+        start (tuple): Начальная клетка (row, col).
+        end (tuple): Конечная клетка (row, col).
+        version (int, optional): Версия сетки (например, OccupancyGrid.version). Если задана,
+                                 результат кэшируется по (version, start, end); версия должна
+                                 меняться при каждом изменении проходимости сетки.
+        hierarchy (HierarchicalPathfinder, optional): Иерархический режим для больших полей:
+                                 поиск идет по графу кластеров (core/hierarchical_pathfinding.py),
+                                 построенному по этой же сетке. Путь почти оптимален.
+    """
+    search = hierarchy.find_path if hierarchy is not None else partial(_search, grid)
+    if version is None:
+        return search(start, end)
+
+    key = (version, start, end, hierarchy is not None)
+    cached = PATH_CACHE.get(key, _NOT_CACHED)
+    if cached is not _NOT_CACHED:
+        PATH_CACHE.move_to_end(key)
+        return list(cached) if cached is not None else None
 
-    # Для использования в приоритетной очереди (heapq)
-    def __lt__(self, other):
-        return self.f < other.f
+    path = search(start, end)
+    PATH_CACHE[key] = tuple(path) if path is not None else None
+    if len(PATH_CACHE) > PATH_CACHE_SIZE:
+        PATH_CACHE.popitem(last=False)
+    return path
 
 
-def find_path(grid, start, end):
+def _search(grid, start, end):
     """
-    Алгоритм поиска пути A*.
-    Возвращает список кортежей (row, col), представляющих путь.
+    Сам поиск A* на плоских номерах клеток (row * cols + col).
+
+    Лучшие известные g хранятся в таблице, а устаревшие записи кучи пропускаются
+    при извлечении (ленивое удаление) вместо поиска по открытому списку.
+    При равном f первой раскрывается клетка с большим g (ближе к цели),
+    затем - добавленная раньше, поэтому результат детерминирован.
+
+    Длина пути и достижимость те же, что у исходной реализации на узлах Node, но среди
+    нескольких кратчайших путей выбор может отличаться: там порядок при равном f задавало
+    устройство кучи, а повторные записи клетки с тем же g раскрывались снова. Точное
+    воспроизведение этого порядка требует тех же повторных записей, а их число на больших
+    полях с обходными путями растет лавинообразно (на поле 50x200 - миллионы записей на запрос).
     """
-    start_node = Node(None, start)
-    end_node = Node(None, end)
+    rows = len(grid)
+    cols = len(grid[0]) if rows else 0
+    start_row, start_col = start
+    end_row, end_col = end
+    if not (0 <= start_row < rows and 0 <= start_col < cols and 0 <= end_row < rows and 0 <= end_col < cols):
+        return None
 
-    open_list = []
-    closed_list = set()
+    start_id = start_row * cols + start_col
+    end_id = end_row * cols + end_col
+    neighbors = (UP, DOWN, LEFT, RIGHT)  # Соседи по горизонтали и вертикали
 
-    # heapq - это приоритетная очередь, которая позволит быстро получать узел с наименьшим f
-    heapq.heappush(open_list, start_node)
+    best_g = {start_id: 0}
+    came_from = {}
+    closed = set()
+    counter = 0
+    # Эвристика: Манхэттенское расстояние
+    open_heap = [(abs(start_row - end_row) + abs(start_col - end_col), 0, counter, start_id)]
 
-    while len(open_list) > 0:
-        current_node = heapq.heappop(open_list)
-        closed_list.add(current_node.position)
+    while open_heap:
+        _, neg_g, _, cell_id = heapq.heappop(open_heap)
+        if cell_id in closed:
+            continue  # Устаревшая запись: клетка уже раскрыта с меньшим g
 
         # Путь найден
-        if current_node == end_node:
+        if cell_id == end_id:
             path = []
-            current = current_node
-            while current is not None:
-                path.append(current.position)
-                current = current.parent
-            return path[::-1]  # Возвращаем перевернутый путь
-
-        # Генерируем дочерние узлы (соседей)
-        for new_position in [UP, DOWN, LEFT, RIGHT]:  # Соседи по горизонтали и вертикали
-            node_position = (current_node.position[0] + new_position[0], current_node.position[1] + new_position[1])
-
-            # Проверяем, что узел в пределах сетки
-            if not (0 <= node_position[0] < len(grid) and 0 <= node_position[1] < len(grid[0])):
+            while cell_id != start_id:
+                path.append(divmod(cell_id, cols))
+                cell_id = came_from[cell_id]
+            path.append(start)
+            return path[::-1]
+
+        closed.add(cell_id)
+        row, col = divmod(cell_id, cols)
+        child_g = 1 - neg_g
+        for d_row, d_col in neighbors:
+            child_row, child_col = row + d_row, col + d_col
+            if not (0 <= child_row < rows and 0 <= child_col < cols):
                 continue
+            child_id = child_row * cols + child_col
+            if child_id in closed:
+                continue
+            if grid[child_row][child_col] != 0 and child_id != end_id:
+                continue
+            if child_g >= best_g.get(child_id, child_g + 1):
+                continue
+            best_g[child_id] = child_g
+            came_from[child_id] = cell_id
+            counter += 1
+            f = child_g + abs(child_row - end_row) + abs(child_col - end_col)
+            heapq.heappush(open_heap, (f, -child_g, counter, child_id))
+
+    return None  # Путь не найден
+
+
+class FlowField:
+    """
+    Поле направлений (карта Дейкстры) к одной клетке цели.
+
+    Поле строится одним обходом в ширину от цели по проходимым клеткам и хранит
+    для каждой клетки расстояние до цели и соседа, через которого к ней ведет
+    кратчайший путь. Любое число преследователей одной цели читает следующий шаг
+    за O(1), поэтому стоимость не растет с числом преследователей.
+    """
 
-            # Проверяем, что узел "проходим" (не препятствие)
-            if grid[node_position[0]][node_position[1]] != 0:
+    def __init__(self, grid, goal, version=None):
+        """
+        Args:
+            grid (list): Двумерная сетка grid[row][col]; ненулевые клетки непроходимы, кроме goal.
+            goal (tuple): Клетка цели (row, col).
+            version (int, optional): Версия сетки, по которой построено поле.
+        """
+        self.goal = goal
+        self.version = version
+        self.rows = len(grid)
+        self.cols = len(grid[0]) if self.rows else 0
+        self.distance = {}   # {номер клетки: шагов до цели}
+        self.next_id = {}    # {номер клетки: номер соседа на шаг ближе к цели}
+
+        goal_row, goal_col = goal
+        if not (0 <= goal_row < self.rows and 0 <= goal_col < self.cols):
+            return
+        goal_id = goal_row * self.cols + goal_col
+        self.distance[goal_id] = 0
+        self.next_id[goal_id] = goal_id
+        frontier = [goal_id]
+        while frontier:
+            next_frontier = []
+            for cell_id in frontier:
+                row, col = divmod(cell_id, self.cols)
+                child_distance = self.distance[cell_id] + 1
+                for d_row, d_col in (UP, DOWN, LEFT, RIGHT):
+                    child_row, child_col = row + d_row, col + d_col
+                    if not (0 <= child_row < self.rows and 0 <= child_col < self.cols):
+                        continue
+                    child_id = child_row * self.cols + child_col
+                    if child_id in self.distance or grid[child_row][child_col] != 0:
+                        continue
+                    self.distance[child_id] = child_distance
+                    self.next_id[child_id] = cell_id
+                    next_frontier.append(child_id)
+            frontier = next_frontier
+
+    def repair(self, grid, changed_cells, version):
+        """
+        Инкрементально чинит поле после изменения проходимости клеток (в духе D* Lite).
+
+        Вместо нового обхода всей сетки поле удаляет только клетки, чей путь к цели
+        шел через ставшие непроходимыми клетки, и заново распространяет расстояния
+        от границы этой области и от освободившихся клеток. Клетки, чьи пути
+        не затронуты, не пересчитываются.
+
+        Args:
+            grid (list): Сетка grid[row][col] в новом состоянии.
+            changed_cells (iterable): Клетки (row, col), сменившие проходимость после self.version.
+            version (int): Версия сетки, которой поле будет соответствовать после ремонта.
+        """
+        cols = self.cols
+        goal_id = self.goal[0] * cols + self.goal[1]
+        changed_ids = sorted(row * cols + col for row, col in changed_cells
+                             if 0 <= row < self.rows and 0 <= col < cols)
+
+        # 1. Удаляем поддеревья, которые опирались на ставшие непроходимыми клетки
+        invalid = []
+        for cell_id in changed_ids:
+            row, col = divmod(cell_id, cols)
+            if cell_id == goal_id or grid[row][col] == 0 or cell_id not in self.distance:
                 continue
+            stack = [cell_id]
+            while stack:
+                current = stack.pop()
+                if current not in self.distance:
+                    continue
+                del self.distance[current]
+                del self.next_id[current]
+                invalid.append(current)
+                for child_id in self._get_neighbor_ids(current):
+                    if self.next_id.get(child_id) == current:
+                        stack.append(child_id)
 
-            # Проверяем, не находится ли узел уже в рассмотренных
-            if node_position in closed_list:
+        # 2. Затравки: проходимые клетки без расстояния, у которых есть соседи с расстоянием
+        heap = []
+        for cell_id in invalid + changed_ids:
+            row, col = divmod(cell_id, cols)
+            if grid[row][col] != 0 or cell_id in self.distance:
                 continue
+            for neighbor_id in self._get_neighbor_ids(cell_id):
+                neighbor_distance = self.distance.get(neighbor_id)
+                if neighbor_distance is not None:
+                    heapq.heappush(heap, (neighbor_distance + 1, cell_id, neighbor_id))
+
+        # 3. Дейкстра от затравок: опускаем расстояния, пока они уменьшаются
+        while heap:
+            cell_distance, cell_id, parent_id = heapq.heappop(heap)
+            if cell_distance >= self.distance.get(cell_id, cell_distance + 1):
+                continue
+            self.distance[cell_id] = cell_distance
+            self.next_id[cell_id] = parent_id
+            for child_id in self._get_neighbor_ids(cell_id):
+                child_row, child_col = divmod(child_id, cols)
+                if grid[child_row][child_col] != 0:
+                    continue
+                if cell_distance + 1 < self.distance.get(child_id, cell_distance + 2):
+                    heapq.heappush(heap, (cell_distance + 1, child_id, cell_id))
+
+        self.version = version
+
+    def _get_neighbor_ids(self, cell_id):
+        """Возвращает номера соседних клеток в пределах сетки (порядок UP, DOWN, LEFT, RIGHT)."""
+        row, col = divmod(cell_id, self.cols)
+        ids = []
+        for d_row, d_col in (UP, DOWN, LEFT, RIGHT):
+            child_row, child_col = row + d_row, col + d_col
+            if 0 <= child_row < self.rows and 0 <= child_col < self.cols:
+                ids.append(child_row * self.cols + child_col)
+        return ids
 
-            child = Node(current_node, node_position)
+    def get_distance(self, cell):
+        """Возвращает число шагов от клетки до цели или None, если цель недостижима."""
+        row, col = cell
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return None
+        return self.distance.get(row * self.cols + col)
 
-            child.g = current_node.g + 1
-            # Эвристика: Манхэттенское расстояние
-            child.h = abs(child.position[0] - end_node.position[0]) + abs(child.position[1] - end_node.position[1])
-            child.f = child.g + child.h
+    def get_next_step(self, cell):
+        """
+        Возвращает следующую клетку на кратчайшем пути к цели.
 
-            # Если сосед уже в списке на рассмотрение, проверяем, не короче ли новый путь
-            if any(open_node for open_node in open_list if child == open_node and child.g > open_node.g):
+        Для самой цели возвращается она же. Если клетка занята (преследователь
+        стоит на защитнике), берется достижимый сосед, ближайший к цели.
+
+        Returns:
+            tuple | None: (row, col) или None, если от клетки цель недостижима.
+        """
+        row, col = cell
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return None
+        next_id = self.next_id.get(row * self.cols + col)
+        if next_id is not None:
+            return divmod(next_id, self.cols)
+
+        best_id = None
+        for d_row, d_col in (UP, DOWN, LEFT, RIGHT):
+            child_row, child_col = row + d_row, col + d_col
+            if not (0 <= child_row < self.rows and 0 <= child_col < self.cols):
                 continue
+            child_id = child_row * self.cols + child_col
+            child_distance = self.distance.get(child_id)
+            if child_distance is not None and (best_id is None or child_distance < self.distance[best_id]):
+                best_id = child_id
+        return divmod(best_id, self.cols) if best_id is not None else None
+
+
+def get_flow_field(grid, goal, version, previous=None, changed_cells=None):
+    """
+    Возвращает общее поле направлений к клетке goal для данной версии сетки.
+
+    Поле строится один раз на пару (version, goal) и переиспользуется всеми
+    преследователями. После изменения проходимости сетка получает новую версию,
+    поэтому устаревшие поля больше не выдаются и вытесняются из кэша.
+    Если передано прежнее поле к той же цели и список изменившихся с его версии
+    клеток, поле не строится заново, а чинится на месте (FlowField.repair).
 
-            heapq.heappush(open_list, child)
+    Args:
+        grid (list): Двумерная сетка grid[row][col].
+        goal (tuple): Клетка цели (row, col).
+        version (int): Версия сетки (например, OccupancyGrid.version).
+        previous (FlowField, optional): Устаревшее поле преследователя к той же цели.
+        changed_cells (set, optional): Клетки, сменившие проходимость после previous.version
+                                       (OccupancyGrid.get_changes_since); None - неизвестно.
+
+    Returns:
+        FlowField: Поле направлений к цели.
+    """
+    key = (version, goal)
+    field = FLOW_FIELD_CACHE.get(key)
+    if field is not None:
+        FLOW_FIELD_CACHE.move_to_end(key)
+        return field
 
-    return None  # Путь не найден
\ No newline at end of file
+    if previous is not None and previous.goal == goal and changed_cells is not None:
+        # Устаревшее поле больше никому не выдается, поэтому его можно чинить на месте
+        FLOW_FIELD_CACHE.pop((previous.version, goal), None)
+        previous.repair(grid, changed_cells, version)
+        field = previous
+    else:
+        field = FlowField(grid, goal, version)
+    FLOW_FIELD_CACHE[key] = field
+    if len(FLOW_FIELD_CACHE) > FLOW_FIELD_CACHE_SIZE:
+        FLOW_FIELD_CACHE.popitem(last=False)
+    return field
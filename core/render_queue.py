@@ -0,0 +1,100 @@
+# core/render_queue.py
+
+from bisect import bisect_left
+from itertools import filterfalse
+from data.settings import *
+
+
+class RenderQueue:
+    """
+    Очередь отрисовки спрайтов, упорядоченная по глубине (`_layer`).
+
+    Очередь живет между кадрами и не перебирает все спрайты: спрайт сам сообщает
+    о смене слоя (сеттер BaseSprite._layer вызывает mark_changed), и при
+    синхронизации переставляются бинарным поиском только отмеченные, новые и
+    исчезнувшие спрайты. Если изменилась заметная доля очереди (full_sort_ratio),
+    она один раз сортируется целиком. Большинство спрайтов двигается по своему
+    ряду и слоя не меняет, поэтому обычный кадр обходится несколькими вставками.
+
+    При равном слое раньше рисуется спрайт, попавший в очередь раньше; новые
+    спрайты нумеруются в порядке добавления в группу.
+    """
+
+    def __init__(self, full_sort_ratio=RENDER_QUEUE_FULL_SORT_RATIO):
+        """
+        Args:
+            full_sort_ratio (float): Доля изменившихся спрайтов, начиная с которой
+                                     дешевле отсортировать очередь целиком.
+        """
+        self.full_sort_ratio = full_sort_ratio
+        self.sprites = []   # Спрайты в порядке отрисовки
+        self.keys = []      # Ключи (слой, порядковый номер) параллельно self.sprites
+        self.key_of = {}    # {спрайт: ключ, под которым он стоит в очереди}
+        self.next_order = 0
+        self.changed = {}   # {спрайт: None} - сменившие слой с прошлой синхронизации, в порядке отметки
+
+    def mark_changed(self, sprite):
+        """Отмечает, что спрайт сменил слой (вызывается из BaseSprite._layer)."""
+        self.changed[sprite] = None
+
+    def sync(self, group):
+        """
+        Приводит очередь в соответствие с группой спрайтов (вызывается раз за кадр).
+
+        Args:
+            group (pygame.sprite.AbstractGroup): Все отрисовываемые спрайты.
+        """
+        members = group.spritedict
+        removed = self.key_of.keys() - members.keys()
+        added = []
+        if len(members) != len(self.key_of) - len(removed):
+            # spritedict хранит спрайты в порядке добавления в группу
+            added = list(filterfalse(self.key_of.__contains__, members))
+        changed = [sprite for sprite in self.changed if sprite in self.key_of and sprite not in removed]
+        self.changed.clear()
+
+        for sprite in removed:
+            if sprite.render_queue is self:
+                sprite.render_queue = None
+        for sprite in added:
+            sprite.render_queue = self
+
+        if len(removed) + len(changed) + len(added) > len(self.sprites) * self.full_sort_ratio:
+            self._rebuild(removed, changed, added)
+            return
+
+        for sprite in removed:
+            self._remove(sprite)
+            del self.key_of[sprite]
+        for sprite in changed:
+            order = self.key_of[sprite][1]
+            self._remove(sprite)
+            self._insert(sprite, (sprite._layer, order))
+        for sprite in added:
+            self._insert(sprite, (sprite._layer, self.next_order))
+            self.next_order += 1
+
+    def _rebuild(self, removed, changed, added):
+        """Обновляет ключи и сортирует очередь целиком (при массовых изменениях и первом заполнении)."""
+        for sprite in removed:
+            del self.key_of[sprite]
+        for sprite in changed:
+            self.key_of[sprite] = (sprite._layer, self.key_of[sprite][1])
+        for sprite in added:
+            self.key_of[sprite] = (sprite._layer, self.next_order)
+            self.next_order += 1
+        self.sprites = sorted(self.key_of, key=self.key_of.__getitem__)
+        self.keys = list(map(self.key_of.__getitem__, self.sprites))
+
+    def _remove(self, sprite):
+        """Убирает спрайт из очереди по его текущему ключу."""
+        index = bisect_left(self.keys, self.key_of[sprite])
+        del self.keys[index]
+        del self.sprites[index]
+
+    def _insert(self, sprite, key):
+        """Вставляет спрайт на место, соответствующее ключу."""
+        index = bisect_left(self.keys, key)
+        self.keys.insert(index, key)
+        self.sprites.insert(index, sprite)
+        self.key_of[sprite] = key
@@ -0,0 +1,227 @@
+# core/simulation.py
+
+# Безголовая (без окна и звука) детерминированная симуляция боя.
+#
+# Бой идет по часам SimulationClock с фиксированным шагом и без отрисовки,
+# поэтому уровень проигрывается во много раз быстрее реального времени,
+# а при одинаковом зерне случайности результат всегда одинаковый.
+#
+# Пример:
+#     battle = HeadlessBattle(level_id=1, team=['programmer', 'coffee_machine'], seed=42)
+#     battle.place('coffee_machine', col=0, row=2)
+#     result = battle.run(on_step=my_strategy)
+
+import os
+import random
+import pygame
+from data.settings import *
+from data.assets import load_all_resources
+from core.clock import SimulationClock, set_time_source
+from core.level_manager import LevelManager
+from core.battle_manager import BattleManager
+from core.events import ENEMY_DIED
+from core.sound_manager import SoundManager
+
+SIMULATION_MAX_TIME_MS = 30 * 60 * 1000  # Ограничение длительности боя (защита от "вечных" боев)
+
+HEADLESS_STATE = {'resources_loaded': False}
+
+
+def init_headless_pygame():
+    """
+    Инициализирует pygame с фиктивными драйверами SDL (без окна и звука).
+    Минимальный режим экрана нужен только для convert_alpha при загрузке изображений.
+    Ресурсы загружаются синхронно и один раз на процесс.
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    # Иначе SDL перехватывает SIGINT/SIGTERM, и процесс нельзя остановить (например, из пула процессов)
+    os.environ.setdefault('SDL_NO_SIGNAL_HANDLERS', '1')
+    if not pygame.get_init():
+        pygame.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((1, 1))
+    if not HEADLESS_STATE['resources_loaded']:
+        load_all_resources()
+        HEADLESS_STATE['resources_loaded'] = True
+
+
+class HeadlessUIManager:
+    """Заглушка UIManager для боя без интерфейса: магазина и HUD нет, клики по ним не происходят."""
+
+    def create_battle_shop(self, team):
+        pass
+
+    def handle_shop_click(self, pos):
+        return None
+
+    def draw_grid(self, surface):
+        pass
+
+    def draw_shop_and_hud(self, *args, **kwargs):
+        pass
+
+
+class HeadlessBattle:
+    """
+    Бой одного уровня без окна, звука и отрисовки с программным управлением.
+
+    Расстановка защитников задается через place() (в том числе из функции on_step,
+    вызываемой перед каждым шагом), а результат возвращается словарем из run().
+    """
+
+    def __init__(self, level_id, team, upgrades=None, placed_mowers=None, seed=0, step_ms=SIMULATION_STEP_MS,
+                 auto_collect_coffee=True):
+        """
+        Args:
+            level_id (int): ID уровня из LEVELS.
+            team (list): Типы защитников, доступные для размещения.
+            upgrades (dict, optional): Улучшения {тип_защитника: [характеристики]}.
+            placed_mowers (dict, optional): Нейросети {ряд: тип_нейросети}.
+            seed (int): Зерно генератора случайных чисел (порядок врагов, напасти, снаряды).
+            step_ms (float): Длительность одного шага симуляции в миллисекундах.
+            auto_collect_coffee (bool): Собирать ли кофейные зерна сразу после появления
+                                        (в игре это делает игрок кликом).
+        """
+        init_headless_pygame()
+        random.seed(seed)
+
+        self.level_id = level_id
+        self.seed = seed
+        self.step_ms = step_ms
+        self.auto_collect_coffee = auto_collect_coffee
+        self.steps = 0
+        self.kills_by_type = {}
+
+        self.clock = SimulationClock()
+        set_time_source(self.clock)
+
+        self.sound_manager = SoundManager()
+        self.sound_manager.sfx_enabled = False
+        self.sound_manager.music_enabled = False
+
+        self.all_sprites = pygame.sprite.LayeredUpdates()
+        self.defenders = pygame.sprite.Group()
+        self.enemies = pygame.sprite.Group()
+        self.projectiles = pygame.sprite.Group()
+        self.coffee_beans = pygame.sprite.Group()
+        self.neuro_mowers = pygame.sprite.Group()
+
+        self.level_manager = LevelManager(level_id, self.enemies, self.all_sprites, self.sound_manager)
+        # Убийства считаются в момент гибели (Enemy.kill), а не сравнением групп до и после
+        # шага: так учитываются и враги, появившиеся и погибшие за один шаг
+        self.level_manager.event_bus.subscribe(ENEMY_DIED, self._on_enemy_died)
+        self.battle_manager = BattleManager(
+            all_sprites=self.all_sprites,
+            defenders=self.defenders,
+            enemies=self.enemies,
+            projectiles=self.projectiles,
+            coffee_beans=self.coffee_beans,
+            neuro_mowers=self.neuro_mowers,
+            ui_manager=HeadlessUIManager(),
+            level_manager=self.level_manager,
+            sound_manager=self.sound_manager,
+            team=list(team),
+            upgrades=upgrades or {},
+            placed_mowers=placed_mowers or {}
+        )
+        self.battle_manager.start()
+        # Нейросети уничтожаются после срабатывания, поэтому ряды запоминаются заранее
+        self.mower_rows = {mower: int((mower.rect.centery - GRID_START_Y) // CELL_SIZE_H)
+                           for mower in self.neuro_mowers}
+
+    @property
+    def time_ms(self):
+        """Текущее время симуляции в миллисекундах."""
+        return self.clock.now
+
+    @property
+    def coffee(self):
+        """Текущее количество кофе."""
+        return self.battle_manager.coffee
+
+    def place(self, defender_type, col, row):
+        """
+        Размещает защитника из команды, если хватает кофе и ячейка свободна.
+
+        Returns:
+            bool: True, если защитник размещен.
+        """
+        if defender_type not in self.battle_manager.team_data:
+            return False
+        if not (0 <= col < GRID_COLS and 0 <= row < GRID_ROWS):
+            return False
+        return self.battle_manager.place_defender(defender_type, (col, row))
+
+    def is_finished(self):
+        """Возвращает True, если бой завершен победой или поражением."""
+        return self.level_manager.is_complete() or self.battle_manager.is_game_over
+
+    def _on_enemy_died(self, enemy):
+        """Считает убийства по типам врагов (событие ENEMY_DIED)."""
+        self.kills_by_type[enemy.enemy_type] = self.kills_by_type.get(enemy.enemy_type, 0) + 1
+
+    def step(self):
+        """Выполняет один шаг симуляции (аналог одного кадра игры без отрисовки)."""
+        self.clock.advance(self.step_ms)
+        self.battle_manager.update()
+
+        if self.auto_collect_coffee:
+            for bean in list(self.coffee_beans):
+                self.battle_manager.coffee += bean.value
+                bean.kill()
+        self.steps += 1
+
+    def run(self, on_step=None, max_time_ms=SIMULATION_MAX_TIME_MS):
+        """
+        Проигрывает бой до победы, поражения или истечения времени.
+
+        Args:
+            on_step (callable, optional): Функция on_step(battle), вызываемая перед каждым шагом;
+                                          в ней сценарий может размещать защитников.
+            max_time_ms (float): Максимальная длительность боя в миллисекундах симуляции.
+
+        Returns:
+            dict: Результат боя (см. get_result).
+        """
+        try:
+            while not self.is_finished() and self.clock.now < max_time_ms:
+                if on_step:
+                    on_step(self)
+                self.step()
+        finally:
+            set_time_source(None)
+        return self.get_result()
+
+    def get_result(self):
+        """
+        Возвращает итог боя.
+
+        Returns:
+            dict: 'outcome' ('victory', 'defeat' или 'timeout'), 'time_ms', 'steps',
+                  'killed', 'total_enemies', 'spawned', 'kills_by_type', 'breach_row',
+                  'mowers_used', 'defenders_alive', 'coffee', а также 'level_id' и 'seed'.
+                  Сумма kills_by_type всегда равна 'killed'.
+        """
+        if self.level_manager.is_complete():
+            outcome = 'victory'
+        elif self.battle_manager.is_game_over:
+            outcome = 'defeat'
+        else:
+            outcome = 'timeout'
+        killed, total = self.level_manager.get_kill_count_data()
+        return {
+            'level_id': self.level_id,
+            'seed': self.seed,
+            'outcome': outcome,
+            'time_ms': self.clock.now,
+            'steps': self.steps,
+            'killed': killed,
+            'total_enemies': total,
+            'spawned': self.level_manager.enemies_spawned,
+            'kills_by_type': dict(self.kills_by_type),
+            'breach_row': self.battle_manager.breach_row,
+            'mowers_used': sorted(row for mower, row in self.mower_rows.items() if mower.is_active),
+            'defenders_alive': len(self.defenders),
+            'coffee': self.battle_manager.coffee,
+        }
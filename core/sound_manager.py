@@ -1,8 +1,10 @@
 # core/sound_manager.py
 
 from typing import Optional
+import io
+import os
 import pygame
-from data.assets import SOUNDS, MUSIC
+from data.assets import SOUNDS, MUSIC, MUSIC_BUFFERS
 from data.settings import DEFAULT_MUSIC_VOLUME
 
 class SoundManager:
@@ -16,6 +18,7 @@ class SoundManager:
         self.sfx_enabled = True
         self.music_enabled = True
         self.current_music = None
+        self._music_stream = None  # Поток в памяти для трека из MUSIC_BUFFERS (должен жить, пока трек играет)
 
     def toggle_sfx(self) -> None:
         """Переключает состояние воспроизведения звуковых эффектов (вкл/выкл)."""
@@ -76,7 +79,13 @@ class SoundManager:
         """
         self.current_music = name
         if self.music_enabled and name in MUSIC and MUSIC[name]:
-            pygame.mixer.music.load(MUSIC[name])
+            buffer = MUSIC_BUFFERS.get(name)
+            if buffer is not None:
+                # Трек уже прочитан в память предзагрузкой уровня - обходимся без диска
+                self._music_stream = io.BytesIO(buffer)
+                pygame.mixer.music.load(self._music_stream, os.path.splitext(MUSIC[name])[1].lstrip('.'))
+            else:
+                pygame.mixer.music.load(MUSIC[name])
             pygame.mixer.music.set_volume(volume)
             pygame.mixer.music.play(loops)
 
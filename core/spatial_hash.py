@@ -0,0 +1,212 @@
+# core/spatial_hash.py
+
+import heapq
+from data.settings import *
+
+
+class SpatialHash:
+    """
+    Равномерная сетка-хэш для поиска спрайтов по расстоянию.
+
+    Поле делится на квадратные ячейки размером cell_size; каждый спрайт хранится
+    в ячейке своего центра. Запросы по радиусу, ближайшему и k ближайшим
+    перебирают только ячейки рядом с точкой и сравнивают квадраты расстояний,
+    поэтому стоимость AOE-атак и аур зависит от плотности юнитов вокруг,
+    а не от их общего числа.
+
+    Хэш синхронизируется с группами в начале шага (sync). Внутри шага спрайты
+    немного сдвигаются, поэтому поиск захватывает запас query_margin и сверяет
+    кандидатов с их текущими rect. Результаты возвращаются в порядке добавления
+    спрайтов в хэш (как при переборе группы), чтобы поведение при равенствах
+    не зависело от раскладки по ячейкам.
+    """
+
+    def __init__(self, cell_size=SPATIAL_HASH_CELL_SIZE, query_margin=SPATIAL_HASH_QUERY_MARGIN):
+        """
+        Args:
+            cell_size (int): Сторона ячейки в пикселях.
+            query_margin (int): Запас в пикселях на перемещение спрайтов после синхронизации.
+        """
+        self.cell_size = cell_size
+        self.query_margin = query_margin
+        self.cells = {}     # {вид: {(cx, cy): [спрайты]}}
+        self.cell_of = {}   # {вид: {спрайт: (cx, cy)}}
+        self.bounds = {}    # {вид: (min_cx, min_cy, max_cx, max_cy)} - границы занятых ячеек
+        self.order = {}     # {спрайт: порядковый номер добавления}
+        self.next_order = 0
+
+    def _get_cell(self, x, y):
+        """Возвращает ключ ячейки для точки (x, y)."""
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def sync(self, kind, group):
+        """
+        Приводит ячейки вида kind в соответствие с группой спрайтов (вызывается раз за шаг).
+
+        Args:
+            kind (str): Вид спрайтов ('enemies' или 'defenders').
+            group (pygame.sprite.Group): Группа спрайтов этого вида.
+        """
+        cells = self.cells.setdefault(kind, {})
+        cell_of = self.cell_of.setdefault(kind, {})
+
+        # Уничтоженные спрайты уже не входят в группу
+        members = set(group)
+        for sprite in [s for s in cell_of if s not in members]:
+            self._remove_from_cell(cells, cell_of.pop(sprite), sprite)
+            del self.order[sprite]
+
+        # Появившиеся и сменившие ячейку
+        for sprite in group:
+            cell = self._get_cell(*sprite.rect.center)
+            old_cell = cell_of.get(sprite)
+            if old_cell == cell:
+                continue
+            if old_cell is None:
+                self.order[sprite] = self.next_order
+                self.next_order += 1
+            else:
+                self._remove_from_cell(cells, old_cell, sprite)
+            cells.setdefault(cell, []).append(sprite)
+            cell_of[sprite] = cell
+
+        if cells:
+            xs = [cx for cx, _ in cells]
+            ys = [cy for _, cy in cells]
+            self.bounds[kind] = (min(xs), min(ys), max(xs), max(ys))
+
+    @staticmethod
+    def _remove_from_cell(cells, cell, sprite):
+        """Удаляет спрайт из ячейки и саму ячейку, если она опустела."""
+        bucket = cells[cell]
+        bucket.remove(sprite)
+        if not bucket:
+            del cells[cell]
+
+    def _iter_area(self, kind, left, top, right, bottom):
+        """Перебирает спрайты из ячеек, покрывающих прямоугольную область (с запасом query_margin)."""
+        cells = self.cells.get(kind)
+        if not cells:
+            return
+        margin = self.query_margin
+        min_cx, min_cy = self._get_cell(left - margin, top - margin)
+        max_cx, max_cy = self._get_cell(right + margin, bottom + margin)
+        # Если область больше занятых ячеек, дешевле перебрать сами ячейки
+        if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) > len(cells):
+            for (cx, cy), bucket in cells.items():
+                if min_cx <= cx <= max_cx and min_cy <= cy <= max_cy:
+                    yield from bucket
+            return
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    yield from bucket
+
+    def query_radius(self, kind, center, radius, inclusive=True):
+        """
+        Находит живые спрайты, чей центр находится в радиусе от точки.
+
+        Args:
+            kind (str): Вид спрайтов.
+            center (tuple): Точка (x, y).
+            radius (float): Радиус в пикселях.
+            inclusive (bool): True - расстояние <= radius, False - строго меньше.
+
+        Returns:
+            list: Спрайты в порядке их добавления.
+        """
+        x, y = center
+        radius_sq = radius * radius
+        found = []
+        for sprite in self._iter_area(kind, x - radius, y - radius, x + radius, y + radius):
+            if not sprite.alive():
+                continue
+            sx, sy = sprite.rect.center
+            dist_sq = (sx - x) ** 2 + (sy - y) ** 2
+            if dist_sq <= radius_sq if inclusive else dist_sq < radius_sq:
+                found.append(sprite)
+        found.sort(key=self.order.__getitem__)
+        return found
+
+    def query_rect(self, kind, rect):
+        """
+        Находит живые спрайты, чей rect пересекается с заданным.
+
+        Returns:
+            list: Спрайты в порядке их добавления.
+        """
+        # Центр спрайта может лежать вне rect на половину размера спрайта
+        reach = self.cell_size
+        found = [sprite for sprite in self._iter_area(kind, rect.left - reach, rect.top - reach,
+                                                      rect.right + reach, rect.bottom + reach)
+                 if sprite.alive() and rect.colliderect(sprite.rect)]
+        found.sort(key=self.order.__getitem__)
+        return found
+
+    def find_k_nearest(self, kind, center, k, max_radius=None):
+        """
+        Находит до k ближайших живых спрайтов к точке.
+
+        Ячейки просматриваются кольцами вокруг точки; поиск останавливается, когда
+        следующее кольцо заведомо дальше k-го найденного спрайта.
+
+        Args:
+            kind (str): Вид спрайтов.
+            center (tuple): Точка (x, y).
+            k (int): Сколько спрайтов найти.
+            max_radius (float, optional): Не искать дальше этого радиуса.
+
+        Returns:
+            list: Спрайты от ближайшего к дальнему (при равенстве - в порядке добавления).
+        """
+        cells = self.cells.get(kind)
+        if not cells or k <= 0:
+            return []
+        x, y = center
+        center_cx, center_cy = self._get_cell(x, y)
+        # Дальше самой удаленной занятой ячейки искать бессмысленно
+        min_cx, min_cy, max_cx, max_cy = self.bounds[kind]
+        max_ring = max(center_cx - min_cx, max_cx - center_cx, center_cy - min_cy, max_cy - center_cy)
+        if max_radius is not None:
+            max_ring = min(max_ring, int((max_radius + self.query_margin) // self.cell_size) + 1)
+
+        best = []  # Куча из (-dist_sq, -порядок, спрайт) для k лучших
+        for ring in range(max_ring + 1):
+            # Точки кольца не ближе (ring - 1) ячеек от точки, минус сдвиг спрайтов за шаг
+            ring_dist = (ring - 1) * self.cell_size - self.query_margin
+            if len(best) == k and ring_dist > 0 and ring_dist * ring_dist > -best[0][0]:
+                break
+            for cx, cy in self._get_ring(center_cx, center_cy, ring):
+                for sprite in cells.get((cx, cy), ()):
+                    if not sprite.alive():
+                        continue
+                    sx, sy = sprite.rect.center
+                    dist_sq = (sx - x) ** 2 + (sy - y) ** 2
+                    if max_radius is not None and dist_sq > max_radius * max_radius:
+                        continue
+                    entry = (-dist_sq, -self.order[sprite], sprite)
+                    if len(best) < k:
+                        heapq.heappush(best, entry)
+                    elif entry[:2] > best[0][:2]:
+                        heapq.heapreplace(best, entry)
+        return [entry[2] for entry in sorted(best, key=lambda e: (-e[0], -e[1]))]
+
+    def find_nearest(self, kind, center, max_radius=None):
+        """Возвращает ближайший живой спрайт к точке или None (см. find_k_nearest)."""
+        nearest = self.find_k_nearest(kind, center, 1, max_radius)
+        return nearest[0] if nearest else None
+
+    @staticmethod
+    def _get_ring(center_cx, center_cy, ring):
+        """Возвращает ключи ячеек на квадратном кольце радиуса ring вокруг ячейки."""
+        if ring == 0:
+            return [(center_cx, center_cy)]
+        keys = []
+        for dx in range(-ring, ring + 1):
+            keys.append((center_cx + dx, center_cy - ring))
+            keys.append((center_cx + dx, center_cy + ring))
+        for dy in range(-ring + 1, ring):
+            keys.append((center_cx - ring, center_cy + dy))
+            keys.append((center_cx + ring, center_cy + dy))
+        return keys
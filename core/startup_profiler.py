@@ -0,0 +1,217 @@
+# core/startup_profiler.py
+
+# Профилировщик запуска игры (режим `python main.py --profile-startup`).
+# Модуль намеренно использует только стандартную библиотеку: его импортируют
+# до pygame и data.settings, чтобы замерить и их импорт тоже.
+
+import sys
+import json
+import time
+import threading
+import importlib.abc
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """
+    Собирает разбивку времени запуска:
+    - по фазам (импорты, pygame.init, загрузка ресурсов, создание UI и т.д.);
+    - по отдельным "горячим" функциям, вызываемым внутри фаз (шрифты, загрузка изображений);
+    - по импортируемым модулям (собственное и суммарное время каждого модуля).
+
+    После первого отрисованного кадра finish() печатает отчет и возвращает код
+    выхода: 1, если превышен бюджет холодного старта, иначе 0.
+    """
+
+    IMPORT_REPORT_LIMIT = 20  # Сколько самых медленных модулей показывать в отчете
+
+    def __init__(self, budget_ms=None, output_path=None):
+        """
+        Args:
+            budget_ms (float, optional): Бюджет времени до первого кадра в миллисекундах.
+            output_path (str, optional): Путь к JSON-файлу для сохранения отчета.
+        """
+        self.budget_ms = budget_ms
+        self.output_path = output_path
+        self.start_time = time.perf_counter()
+        self._last_phase_end = self.start_time
+        self.first_frame_ms = None
+        self.phases = []        # [(название, мс)] в порядке выполнения
+        self.calls = {}         # {название: {'count': int, 'ms': float}}
+        self.imports = {}       # {модуль: {'self_ms': float, 'total_ms': float}}
+        self.extra = {}         # Дополнительные показатели (например, прогресс фоновой загрузки)
+        self._import_finder = None
+
+    # --- Сбор данных ---
+
+    def install_import_hook(self):
+        """Начинает замер времени импорта модулей (вызывать до импорта игры)."""
+        if self._import_finder is None:
+            self._import_finder = _ImportTimingFinder(self)
+            sys.meta_path.insert(0, self._import_finder)
+
+    def remove_import_hook(self):
+        """Прекращает замер времени импорта."""
+        if self._import_finder in sys.meta_path:
+            sys.meta_path.remove(self._import_finder)
+        self._import_finder = None
+
+    @contextmanager
+    def phase(self, name):
+        """Контекстный менеджер для замера одной фазы запуска."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._last_phase_end = time.perf_counter()
+            self.phases.append((name, (self._last_phase_end - start) * 1000))
+
+    def time_calls(self, owner, attribute, name=None):
+        """
+        Подменяет функцию owner.attribute оберткой, суммирующей время и число ее вызовов.
+
+        Args:
+            owner: Модуль или класс, которому принадлежит функция.
+            attribute (str): Имя функции.
+            name (str, optional): Название в отчете (по умолчанию - имя функции).
+        """
+        original = getattr(owner, attribute)
+        stats = self.calls.setdefault(name or attribute, {'count': 0, 'ms': 0.0})
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                stats['count'] += 1
+                stats['ms'] += (time.perf_counter() - start) * 1000
+
+        setattr(owner, attribute, timed)
+
+    def mark_first_frame(self):
+        """Запоминает момент вывода первого кадра."""
+        if self.first_frame_ms is None:
+            now = time.perf_counter()
+            self.phases.append(('first frame', (now - self._last_phase_end) * 1000))
+            self.first_frame_ms = (now - self.start_time) * 1000
+
+    # --- Отчет ---
+
+    def is_over_budget(self):
+        """Возвращает True, если время до первого кадра превысило бюджет."""
+        return self.budget_ms is not None and self.first_frame_ms is not None and self.first_frame_ms > self.budget_ms
+
+    def to_dict(self):
+        """Возвращает все собранные данные в виде словаря (для JSON)."""
+        return {
+            'first_frame_ms': self.first_frame_ms,
+            'budget_ms': self.budget_ms,
+            'over_budget': self.is_over_budget(),
+            'phases': [{'name': name, 'ms': ms} for name, ms in self.phases],
+            'calls': self.calls,
+            'imports': self.imports,
+            'extra': self.extra,
+        }
+
+    def format_report(self):
+        """Формирует текстовый отчет."""
+        lines = []
+        budget = ''
+        if self.budget_ms is not None:
+            budget = f", budget {self.budget_ms:.0f} ms: {'EXCEEDED' if self.is_over_budget() else 'OK'}"
+        lines.append(f"Startup profile: first frame after {self.first_frame_ms or 0:.1f} ms{budget}")
+
+        lines.append("Phases:")
+        for name, ms in self.phases:
+            lines.append(f"  {name:<44}{ms:>10.1f} ms")
+
+        if self.calls:
+            lines.append("Calls inside phases:")
+            for name, stats in sorted(self.calls.items(), key=lambda item: -item[1]['ms']):
+                lines.append(f"  {name:<44}{stats['ms']:>10.1f} ms  ({stats['count']} calls)")
+
+        if self.imports:
+            slowest = sorted(self.imports.items(), key=lambda item: -item[1]['self_ms'])[:self.IMPORT_REPORT_LIMIT]
+            lines.append(f"Imports ({len(self.imports)} modules, slowest {len(slowest)} by self time):")
+            lines.append(f"  {'module':<44}{'self':>10}{'cumulative':>14}")
+            for module, stats in slowest:
+                lines.append(f"  {module:<44}{stats['self_ms']:>7.1f} ms{stats['total_ms']:>11.1f} ms")
+
+        for name, value in self.extra.items():
+            lines.append(f"{name}: {value}")
+        return '\n'.join(lines)
+
+    def finish(self):
+        """
+        Печатает отчет, при необходимости сохраняет его в JSON и возвращает код выхода.
+
+        Returns:
+            int: 1, если бюджет превышен, иначе 0.
+        """
+        self.remove_import_hook()
+        print(self.format_report())
+        if self.output_path:
+            with open(self.output_path, 'w', encoding='utf-8') as output_file:
+                json.dump(self.to_dict(), output_file, indent=1, ensure_ascii=False)
+        return 1 if self.is_over_budget() else 0
+
+
+class _ImportTimingFinder(importlib.abc.MetaPathFinder):
+    """
+    Поисковик модулей, который сам ничего не ищет: он находит спецификацию
+    через остальные поисковики из sys.meta_path и оборачивает ее загрузчик,
+    чтобы замерить выполнение модуля.
+    """
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self._local = threading.local()  # Фоновые потоки тоже могут импортировать модули
+
+    @property
+    def stack(self):
+        """Время вложенных импортов для каждого модуля, выполняющегося сейчас в этом потоке."""
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+            spec.loader = _TimedLoader(spec.loader, fullname, self)
+        return spec
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Обертка загрузчика, замеряющая собственное и суммарное время выполнения модуля."""
+
+    def __init__(self, loader, fullname, finder):
+        self.loader = loader
+        self.fullname = fullname
+        self.finder = finder
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        self.finder.stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            total_ms = (time.perf_counter() - start) * 1000
+            nested_ms = self.finder.stack.pop()
+            if self.finder.stack:
+                self.finder.stack[-1] += total_ms
+            self.finder.profiler.imports[self.fullname] = {'self_ms': total_ms - nested_ms, 'total_ms': total_ms}
+
+    def __getattr__(self, name):
+        # Остальные методы (get_data, get_resource_reader и т.д.) - от исходного загрузчика
+        return getattr(self.loader, name)
@@ -3,6 +3,12 @@
 import pygame
 import os
 import sys # <-- ДОБАВЛЕНО: для sys._MEIPASS
+import json
+import hashlib
+import mmap
+import atexit
+import threading
+from collections import OrderedDict
 from data.settings import *
 from data.levels import LEVELS
 
@@ -24,46 +30,135 @@ def resource_path(relative_path):
 
     return os.path.join(base_path, relative_path)
 
+# =============================================================================
+# СЛОВАРЬ АССЕТОВ С ФОНОВОЙ ЗАГРУЗКОЙ
+# =============================================================================
+class AssetRegistry(dict):
+    """
+    Словарь ассетов, который может заполняться фоновым загрузчиком.
+
+    Ключи, объявленные через expect(), считаются ожидаемыми: обращение к ним
+    (registry[key], key in registry, registry.get(key)) блокирует вызывающий поток,
+    пока загрузчик не положит значение. Ожидаемый ключ при этом переносится
+    в начало очереди загрузки, чтобы ожидание было как можно короче.
+    """
+
+    def __init__(self, name):
+        super().__init__()
+        self.name = name
+        self._pending = {}  # {ключ: threading.Event}
+
+    def expect(self, key):
+        """Помечает ключ как ожидаемый: до его загрузки обращения к нему будут блокироваться."""
+        if not dict.__contains__(self, key):
+            self._pending.setdefault(key, threading.Event())
+
+    def release(self, key):
+        """Снимает ожидание ключа (например, если загрузить ассет не удалось)."""
+        event = self._pending.pop(key, None)
+        if event:
+            event.set()
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        self.release(key)
+
+    def _wait(self, key):
+        event = self._pending.get(key)
+        if event is None or threading.current_thread() is LOADING_STATE['thread']:
+            return
+        _prioritize_asset(self, key)
+        event.wait()
+
+    def __getitem__(self, key):
+        self._wait(key)
+        return dict.__getitem__(self, key)
+
+    def __contains__(self, key):
+        self._wait(key)
+        return dict.__contains__(self, key)
+
+    def get(self, key, default=None):
+        self._wait(key)
+        return dict.get(self, key, default)
+
+
 # =============================================================================
 # ГЛОБАЛЬНЫЕ СЛОВАРИ ДЛЯ ХРАНЕНИЯ АССЕТОВ
 # =============================================================================
-SOUNDS = {}
-CARD_IMAGES = {}
-PROJECTILE_IMAGES = {}
-MUSIC = {}
+SOUNDS = AssetRegistry('sounds')
+CARD_IMAGES = AssetRegistry('card_images')
+PROJECTILE_IMAGES = AssetRegistry('projectile_images')
+MUSIC = AssetRegistry('music')
 UI_IMAGES = {}
 
+# Общая библиотека кадров анимаций: {(категория, папка, тип_анимации, размер): tuple[Surface]}.
+# Каждая последовательность декодируется с диска один раз, после чего один и тот же
+# кортеж кадров выдается всем экземплярам врагов, защитников и аур.
+ANIMATION_LIBRARY = {}
+ANIMATION_LIBRARY_STATS = {'hits': 0, 'misses': 0}
+# Библиотекой пользуются и основной поток, и предзагрузка уровня (core/asset_prefetcher.py).
+# Проверка, счетчики и запись идут под замком, а на время декодирования ключ отмечается
+# событием "в работе": второй поток, запросивший тот же ключ, ждет его, а не декодирует повторно.
+ANIMATION_LIBRARY_LOCK = threading.Lock()
+ANIMATION_LOADS_IN_FLIGHT = {}  # {ключ: threading.Event}
+
+# Заранее подготовленные поверхности эффектов и снарядов: {(путь, размер, прозрачность): Surface}.
+# Заполняется в load_all_resources (так же, как PROJECTILE_IMAGES), а недостающие
+# варианты досоздаются при первом обращении через get_effect_image.
+EFFECT_IMAGES = {}
+
+# Манифест ассетов (ASSET_MANIFEST_FILE): файлы с размерами и хэшами и число кадров анимаций.
+# Если манифеста нет, загрузчики, как и раньше, проверяют наличие файлов на диске.
+ASSET_MANIFEST = None
+
+# Текстурные атласы: манифест с прямоугольниками изображений и декодированные листы.
+# Листы декодируются по одному разу при первом обращении к любому их изображению.
+ATLAS_MANIFEST = None
+ATLAS_SHEETS = {}
+
+# Содержимое музыкальных файлов, заранее прочитанное в память: {имя_трека: bytes}.
+# Заполняется предзагрузкой уровня, чтобы запуск трека не обращался к диску.
+MUSIC_BUFFERS = {}
+
+# Хэши содержимого исходных файлов: {путь_от_корня_проекта: (время_изменения, размер, хэш)}.
+# Нужны как ключ кэша подготовленных изображений (BAKED_IMAGES_DIR) и звуков.
+# Индекс сохраняется в SOURCE_HASH_INDEX_FILE, поэтому при следующем запуске
+# файл перечитывается и хэшируется, только если изменились его размер или время изменения.
+SOURCE_HASHES = {}
+SOURCE_HASHES_LOCK = threading.Lock()
+SOURCE_HASHES_STATE = {'loaded': False, 'dirty': False}
+
+# Очередь фоновой загрузки: {(имя_словаря, ключ): (словарь | None, ключ, функция_загрузки)}.
+# Порядок очереди - порядок загрузки; ожидаемые ассеты переносятся в ее начало.
+LOADING_QUEUE = OrderedDict()
+LOADING_LOCK = threading.Lock()
+LOADING_STATE = {'total': 0, 'done': 0, 'thread': None}
+
 
 def load_all_resources():
     """
     Главная функция для загрузки всех игровых ресурсов.
-    Вызывается один раз при запуске игры.
-    Заполняет глобальные словари SOUNDS, MUSIC, CARD_IMAGES и др.
+    Загружает все синхронно: сначала ресурсы стартового экрана, затем остальные.
+    Используется утилитами и скриптами, которым не нужен экран загрузки;
+    игра вызывает load_startup_resources() и start_background_loading().
     """
-    # --- Загрузка звуковых эффектов (SFX) ---
-    load_sound('button', 'pressing a button.mp3')
-    load_sound('purchase', 'purchase and landing of the hero.mp3')
-    load_sound('taking', 'taking.mp3')
-    load_sound('cards', 'cards.mp3')
-    load_sound('damage', 'damage.mp3')
-    load_sound('eating', 'eating.mp3')
-    load_sound('scream', 'scream.mp3')
-    load_sound('enemy_dead', 'enemy_dead.mp3')
-    load_sound('hero_dead', 'hero_dead.mp3')
-    load_sound('money', 'money.mp3')
-    load_sound('win', 'win.mp3')
-    load_sound('misfortune', 'misfortune.mp3')
-    load_sound('tuning', 'tuning.mp3')
-    load_sound('lose', 'lose.mp3')
-    load_sound('no_money', 'no_money.mp3')
-    load_sound('thief_laugh', 'thief_laugh.mp3')
+    load_startup_resources()
+    _queue_remaining_resources()
+    _run_loading_queue()
 
-    # --- Загрузка музыки ---
-    load_music('main_team', 'main_team.mp3')
-    load_music('prep_screen', 'prep_screen.mp3')
-    for level_id in LEVELS:
-        if level_id > 0:
-            load_music(f'level_{level_id}', f'level_{level_id}.mp3')
+
+def load_startup_resources():
+    """
+    Первый этап загрузки: только то, что нужно для показа стартового экрана.
+    Вызывается синхронно до первого кадра.
+    """
+    # --- Манифест ассетов и текстурные атласы (если они были собраны) ---
+    load_asset_manifest()
+    load_atlas_manifest()
+
+    # --- Звук кнопок (нужен сразу же на стартовом экране) ---
+    load_sound('button', 'pressing a button.mp3')
 
     # --- Загрузка изображений для UI ---
     # Предполагается, что IMAGES_DIR - это что-то вроде "assets/images"
@@ -77,44 +172,201 @@ def load_all_resources():
     UI_IMAGES['title_plaque'] = load_image(ui_title_plaque_path, None, TITLE_PLAQUE_SIZE)
 
 
+def start_background_loading():
+    """
+    Второй этап загрузки: ставит остальные ресурсы в очередь и загружает их
+    в фоновом потоке, пока стартовый экран и главное меню остаются отзывчивыми.
+    Прогресс доступен через get_loading_progress().
+    """
+    if LOADING_STATE['thread'] is not None:
+        return
+    _queue_remaining_resources()
+    LOADING_STATE['thread'] = threading.Thread(target=_run_loading_queue, name='asset-loader', daemon=True)
+    LOADING_STATE['thread'].start()
+
+
+def get_loading_progress():
+    """
+    Возвращает прогресс фоновой загрузки.
+
+    Returns:
+        float: Доля загруженных ресурсов (от 0.0 до 1.0).
+    """
+    with LOADING_LOCK:
+        total, done = LOADING_STATE['total'], LOADING_STATE['done']
+    return done / total if total else 1.0
+
+
+def is_loading_complete():
+    """Возвращает True, если все ресурсы из очереди загружены."""
+    return get_loading_progress() >= 1.0
+
+
+def _queue_asset(registry, key, loader):
+    """
+    Добавляет ресурс в очередь загрузки.
+
+    Args:
+        registry (AssetRegistry | None): Словарь, в который функция загрузки кладет ассет.
+                                         Для ассетов с собственным кэшем (эффекты) - None.
+        key: Ключ ассета в словаре.
+        loader (callable): Функция без аргументов, выполняющая загрузку.
+    """
+    if registry is not None:
+        registry.expect(key)
+    with LOADING_LOCK:
+        LOADING_QUEUE[(registry.name if registry is not None else None, key)] = (registry, key, loader)
+        LOADING_STATE['total'] += 1
+
+
+def _prioritize_asset(registry, key):
+    """Переносит ожидаемый ассет в начало очереди загрузки."""
+    with LOADING_LOCK:
+        queue_key = (registry.name, key)
+        if queue_key in LOADING_QUEUE:
+            LOADING_QUEUE.move_to_end(queue_key, last=False)
+
+
+def _run_loading_queue():
+    """Загружает ресурсы из очереди по одному, пока она не опустеет."""
+    while True:
+        with LOADING_LOCK:
+            if not LOADING_QUEUE:
+                save_source_hash_index()  # Новые хэши нужны следующему запуску
+                return
+            _, (registry, key, loader) = LOADING_QUEUE.popitem(last=False)
+        try:
+            loader()
+        except Exception as e:
+            print(f"Warning: Failed to load asset '{key}': {e}")
+        finally:
+            # Ожидающие потоки не должны зависнуть, даже если ассет не загрузился
+            if registry is not None:
+                registry.release(key)
+            with LOADING_LOCK:
+                LOADING_STATE['done'] += 1
+
+
+def _queue_remaining_resources():
+    """
+    Ставит в очередь все ресурсы, не нужные стартовому экрану.
+    Порядок очереди соответствует порядку, в котором ресурсы понадобятся игроку.
+    """
+    # --- Проверка манифеста ассетов (только сообщает о расхождениях) ---
+    _queue_asset(None, 'asset_manifest_check', report_asset_manifest_problems)
+
+    # --- Загрузка музыки ---
+    _queue_asset(MUSIC, 'main_team', lambda: load_music('main_team', 'main_team.mp3'))
+    _queue_asset(MUSIC, 'prep_screen', lambda: load_music('prep_screen', 'prep_screen.mp3'))
+    for level_id in LEVELS:
+        if level_id > 0:
+            _queue_asset(MUSIC, f'level_{level_id}',
+                         lambda level_id=level_id: load_music(f'level_{level_id}', f'level_{level_id}.mp3'))
+
+    # --- Загрузка звуковых эффектов (SFX) ---
+    sound_files = {
+        'purchase': 'purchase and landing of the hero.mp3',
+        'taking': 'taking.mp3',
+        'cards': 'cards.mp3',
+        'damage': 'damage.mp3',
+        'eating': 'eating.mp3',
+        'scream': 'scream.mp3',
+        'enemy_dead': 'enemy_dead.mp3',
+        'hero_dead': 'hero_dead.mp3',
+        'money': 'money.mp3',
+        'win': 'win.mp3',
+        'misfortune': 'misfortune.mp3',
+        'tuning': 'tuning.mp3',
+        'lose': 'lose.mp3',
+        'no_money': 'no_money.mp3',
+        'thief_laugh': 'thief_laugh.mp3',
+    }
+    for name, filename in sound_files.items():
+        _queue_asset(SOUNDS, name, lambda name=name, filename=filename: load_sound(name, filename))
+
     # --- Загрузка изображений для карточек юнитов ---
     all_units = {**DEFENDERS_DATA, **ENEMIES_DATA, **NEURO_MOWERS_DATA, **CALAMITIES_DATA, **UI_ELEMENTS_DATA}
-    card_size = (SHOP_CARD_SIZE - 10, SHOP_CARD_SIZE - 10)
-
     for unit_type, data in all_units.items():
-        category = data.get('category')
-        anim_data = data.get('animation_data')
-        relative_img_path_in_images_dir = "" # Путь ВНУТРИ папки IMAGES_DIR
-
-        if category:
-            if anim_data:
-                folder = anim_data.get('folder', unit_type)
-                anim_type_for_card = 'walk' if category == 'enemies' else 'idle'
-                # Путь от папки IMAGES_DIR (e.g. assets/images)
-                relative_img_path_in_images_dir = os.path.join(category, folder, f'{anim_type_for_card}_0.png')
-            else:
-                relative_img_path_in_images_dir = os.path.join(category, f"{unit_type}.png")
-        print(relative_img_path_in_images_dir)
-        if relative_img_path_in_images_dir:
-            # Собираем полный путь от корня проекта
-            #full_path_from_project_root = os.path.join(IMAGES_DIR, relative_img_path_in_images_dir)
-            current_size = card_size
-            if unit_type in UI_ELEMENTS_DATA:
-                current_size = None
-            CARD_IMAGES[unit_type] = load_image(relative_img_path_in_images_dir, DEFAULT_COLORS.get(unit_type), current_size)
+        if data.get('category'):
+            _queue_asset(CARD_IMAGES, unit_type,
+                         lambda unit_type=unit_type, data=data: _load_card_image(unit_type, data))
 
     # --- Загрузка изображений для снарядов ---
     projectile_size = (30, 30)
     for p_type in CALCULUS_PROJECTILE_TYPES:
         # Путь от папки IMAGES_DIR (e.g. assets/images)
         path_in_images_dir = os.path.join('projectiles', 'calculus_projectiles', f'{p_type}.png')
-        #full_path_from_project_root = os.path.join(IMAGES_DIR, path_in_images_dir)
-        PROJECTILE_IMAGES[p_type] = load_image(path_in_images_dir, DEFAULT_COLORS['integral'], projectile_size)
+        _queue_asset(PROJECTILE_IMAGES, p_type, lambda p_type=p_type, path=path_in_images_dir:
+                     _load_projectile_image(p_type, path, DEFAULT_COLORS['integral'], projectile_size))
 
     for p_type in PROGRAMMER_PROJECTILE_TYPES:
         path_in_images_dir = os.path.join('projectiles', 'programmer_projectiles', f'{p_type}.png')
-        #full_path_from_project_root = os.path.join(IMAGES_DIR, path_in_images_dir)
-        PROJECTILE_IMAGES[p_type] = load_image(path_in_images_dir, DEFAULT_COLORS['bracket'], projectile_size)
+        _queue_asset(PROJECTILE_IMAGES, p_type, lambda p_type=p_type, path=path_in_images_dir:
+                     _load_projectile_image(p_type, path, DEFAULT_COLORS['bracket'], projectile_size))
+
+    # --- Подготовка поверхностей эффектов и снарядов ---
+    # Все варианты (путь, размер, прозрачность), которые создаются во время боя,
+    # декодируются один раз здесь, чтобы выстрелы и эффекты не обращались к диску.
+    effect_specs = [
+        ('projectiles/paint_splat.png', DEFAULT_COLORS['paint_splat'], projectile_size, None),
+        ('projectiles/sound_wave.png', DEFAULT_COLORS['sound_wave'], (40, CELL_SIZE_H - 10), None),
+        (os.path.join('resources', 'coffee_bean.png'), DEFAULT_COLORS['coffee_bean'], (40, 40), None),
+    ]
+    for radius in get_radius_variants('modnik'):
+        pixel_radius = radius * CELL_SIZE_W
+        effect_specs.append(('projectiles/explosion.png', DEFAULT_COLORS['explosion'],
+                             (pixel_radius * 2, pixel_radius * 2), None))
+    for radius in get_radius_variants('botanist'):
+        diameter = radius * CELL_SIZE_W * 2
+        effect_specs.append(('projectiles/book_attack.png', DEFAULT_COLORS['book_attack'], (diameter, diameter),
+                             BOOK_ATTACK_ALPHA))
+
+    for calamity_type in CALAMITIES_DATA:
+        if calamity_type != 'big_party':
+            effect_specs.append((os.path.join('effects', f'{calamity_type}_aura.png'), (0, 0, 0, 0),
+                                 (CELL_SIZE_W + 10, CELL_SIZE_H + 20), None))
+    for mower_type in NEURO_MOWERS_DATA:
+        effect_specs.append((f'systems/{mower_type}.png', DEFAULT_COLORS[mower_type],
+                             (CELL_SIZE_W - 20, CELL_SIZE_H - 20), None))
+
+    for path, color, size, alpha in effect_specs:
+        _queue_asset(None, (path, tuple(size), alpha),
+                     lambda path=path, color=color, size=size, alpha=alpha: get_effect_image(path, color, size, alpha))
+
+
+def _load_card_image(unit_type, data):
+    """Загружает изображение карточки юнита и кладет его в CARD_IMAGES."""
+    card_size = (SHOP_CARD_SIZE - 10, SHOP_CARD_SIZE - 10)
+    category = data.get('category')
+    anim_data = data.get('animation_data')
+
+    if anim_data:
+        folder = anim_data.get('folder', unit_type)
+        anim_type_for_card = 'walk' if category == 'enemies' else 'idle'
+        # Путь от папки IMAGES_DIR (e.g. assets/images)
+        relative_img_path_in_images_dir = os.path.join(category, folder, f'{anim_type_for_card}_0.png')
+    else:
+        relative_img_path_in_images_dir = os.path.join(category, f"{unit_type}.png")
+
+    current_size = card_size
+    if unit_type in UI_ELEMENTS_DATA:
+        current_size = None
+    CARD_IMAGES[unit_type] = load_image(relative_img_path_in_images_dir, DEFAULT_COLORS.get(unit_type), current_size)
+
+
+def _load_projectile_image(p_type, path_in_images_dir, default_color, size):
+    """Загружает изображение снаряда и кладет его в PROJECTILE_IMAGES."""
+    PROJECTILE_IMAGES[p_type] = load_image(path_in_images_dir, default_color, size)
+
+
+def get_radius_variants(unit_type):
+    """Возвращает возможные значения радиуса юнита: базовое и с учетом улучшения."""
+    data = DEFENDERS_DATA[unit_type]
+    radii = [data['radius']]
+    radius_upgrade = data.get('upgrades', {}).get('radius')
+    if radius_upgrade:
+        radii.append(data['radius'] + radius_upgrade['value'])
+    return radii
 
 
 # In data/assets.py
@@ -137,9 +389,15 @@ def load_image(path_from_project_root, default_color, size=None, raise_on_error=
     """
     actual_path = resource_path(os.path.join("assets", "images", path_from_project_root))
     try:
-        image = pygame.image.load(actual_path).convert_alpha()
-        if size:
-            image = pygame.transform.scale(image, size)
+        # Уже масштабированная копия из кэша избавляет от декодирования и масштабирования
+        image = _load_baked_image(actual_path, size) if size else None
+        if image is None:
+            image = _get_atlas_image(path_from_project_root, actual_path)
+            if image is None:
+                image = pygame.image.load(actual_path).convert_alpha()
+            if size:
+                image = pygame.transform.scale(image, size)
+                _store_baked_image(actual_path, size, image)
         return image
     except (pygame.error, FileNotFoundError) as e:
         if raise_on_error:
@@ -156,6 +414,446 @@ def load_image(path_from_project_root, default_color, size=None, raise_on_error=
         return fallback_surface
 
 
+def get_source_hash(actual_path):
+    """
+    Возвращает хэш содержимого исходного файла.
+
+    Хэш пересчитывается, только если изменились время модификации или размер файла.
+    Известные хэши хранятся в SOURCE_HASH_INDEX_FILE, поэтому и холодный запуск
+    с готовым кэшем обходится одним stat на файл вместо чтения его целиком.
+
+    Args:
+        actual_path (str): Полный путь к файлу.
+
+    Returns:
+        str | None: Шестнадцатеричный хэш или None, если файл недоступен.
+    """
+    _load_source_hash_index()
+    index_key = os.path.relpath(actual_path, resource_path('')).replace(os.sep, '/')
+    try:
+        stat = os.stat(actual_path)
+        cached = SOURCE_HASHES.get(index_key)
+        if cached and cached[0] == stat.st_mtime and cached[1] == stat.st_size:
+            return cached[2]
+        with open(actual_path, 'rb') as source_file:
+            digest = hashlib.sha1(source_file.read()).hexdigest()
+    except OSError:
+        return None
+    with SOURCE_HASHES_LOCK:
+        SOURCE_HASHES[index_key] = (stat.st_mtime, stat.st_size, digest)
+        SOURCE_HASHES_STATE['dirty'] = True
+    return digest
+
+
+def _load_source_hash_index():
+    """Один раз за сессию читает сохраненный индекс хэшей исходников (поврежденный файл игнорируется)."""
+    if SOURCE_HASHES_STATE['loaded']:
+        return
+    with SOURCE_HASHES_LOCK:
+        if SOURCE_HASHES_STATE['loaded']:
+            return
+        try:
+            with open(resource_path(SOURCE_HASH_INDEX_FILE), encoding='utf-8') as index_file:
+                entries = json.load(index_file)
+            SOURCE_HASHES.update((path, tuple(entry)) for path, entry in entries.items() if len(entry) == 3)
+        except (OSError, ValueError, TypeError, AttributeError):
+            pass
+        SOURCE_HASHES_STATE['loaded'] = True
+        atexit.register(save_source_hash_index)  # Хэши, посчитанные после загрузки (предзагрузка уровней)
+
+
+def save_source_hash_index():
+    """Сохраняет индекс хэшей исходников, если в нем появились новые записи. Ошибки записи игнорируются."""
+    with SOURCE_HASHES_LOCK:
+        if not SOURCE_HASHES_STATE['dirty']:
+            return
+        entries = {path: list(entry) for path, entry in SOURCE_HASHES.items()}
+        SOURCE_HASHES_STATE['dirty'] = False
+    index_path = resource_path(SOURCE_HASH_INDEX_FILE)
+    try:
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        temp_path = f'{index_path}.{os.getpid()}.{threading.get_ident()}.tmp'  # Свой файл у каждого потока и процесса
+        with open(temp_path, 'w', encoding='utf-8') as index_file:
+            json.dump(entries, index_file)
+        os.replace(temp_path, index_path)  # Атомарная замена: читатель не увидит половину файла
+    except OSError:
+        pass
+
+
+def _get_baked_image_path(actual_path, size):
+    """Возвращает путь к файлу кэша для пары (исходник, размер) или None."""
+    if not BAKED_IMAGES_ENABLED:
+        return None
+    digest = get_source_hash(actual_path)
+    if digest is None:
+        return None
+    width, height = int(size[0]), int(size[1])
+    return resource_path(os.path.join(BAKED_IMAGES_DIR, f'{digest}_{width}x{height}.rgba'))
+
+
+def _load_baked_image(actual_path, size):
+    """
+    Загружает уже масштабированное изображение из кэша подготовленных ассетов.
+
+    Ключ кэша - хэш содержимого исходника и целевой размер, поэтому изменение
+    файла или размерной константы в data/configs просто дает новый ключ.
+
+    Returns:
+        pygame.Surface | None: Готовая поверхность или None при промахе кэша.
+    """
+    baked_path = _get_baked_image_path(actual_path, size)
+    if baked_path is None:
+        return None
+    width, height = int(size[0]), int(size[1])
+    try:
+        with open(baked_path, 'rb') as baked_file:
+            pixels = baked_file.read()
+    except OSError:
+        return None
+    if len(pixels) != width * height * 4:
+        return None  # Поврежденный или недописанный файл считаем промахом
+    return pygame.image.frombuffer(pixels, (width, height), 'RGBA').convert_alpha()
+
+
+def _store_baked_image(actual_path, size, image):
+    """Сохраняет масштабированное изображение в кэш. Ошибки записи игнорируются."""
+    baked_path = _get_baked_image_path(actual_path, size)
+    if baked_path is None:
+        return
+    try:
+        os.makedirs(os.path.dirname(baked_path), exist_ok=True)
+        temp_path = f'{baked_path}.{os.getpid()}.{threading.get_ident()}.tmp'  # Свой файл у каждого потока и процесса
+        with open(temp_path, 'wb') as baked_file:
+            baked_file.write(pygame.image.tobytes(image, 'RGBA'))
+        os.replace(temp_path, baked_path)  # Атомарная замена: читатель не увидит половину файла
+    except OSError:
+        pass
+
+
+def load_asset_manifest():
+    """
+    Загружает манифест ассетов, созданный tools/build_asset_manifest.py.
+
+    Returns:
+        dict | None: Содержимое манифеста или None, если он отсутствует или поврежден.
+    """
+    global ASSET_MANIFEST
+    try:
+        with open(resource_path(ASSET_MANIFEST_FILE), encoding='utf-8') as manifest_file:
+            ASSET_MANIFEST = json.load(manifest_file)
+    except (OSError, ValueError):
+        print(f"Warning: Asset manifest '{ASSET_MANIFEST_FILE}' not found. Falling back to file system checks.")
+        ASSET_MANIFEST = None
+    return ASSET_MANIFEST
+
+
+def get_animation_frame_count(category, folder, anim_type):
+    """
+    Возвращает число кадров анимации по манифесту ассетов.
+
+    Returns:
+        int | None: Число кадров (0, если анимации нет) или None, если манифест не загружен.
+    """
+    if ASSET_MANIFEST is None:
+        return None
+    return ASSET_MANIFEST['animations'].get(f'{category}/{folder}/{anim_type}', 0)
+
+
+def is_asset_listed(path_from_project_root, actual_path):
+    """
+    Проверяет наличие файла ассета: по манифесту, а без него - на диске.
+
+    Args:
+        path_from_project_root (str): Путь от корня проекта (например, "assets/sounds/win.mp3").
+        actual_path (str): Полный путь к файлу.
+    """
+    if ASSET_MANIFEST is None:
+        return os.path.exists(actual_path)
+    manifest_key = os.path.relpath(path_from_project_root, ASSETS_DIR).replace(os.sep, '/')
+    return manifest_key in ASSET_MANIFEST['files']
+
+
+def list_asset_files():
+    """
+    Возвращает пути всех файлов ассетов относительно ASSETS_DIR (с разделителем '/').
+    Собранные атласы и сам манифест не считаются ассетами.
+    """
+    assets_root = resource_path(ASSETS_DIR)
+    excluded_dirs = {os.path.normpath(resource_path(ATLAS_DIR))}
+    manifest_path = os.path.normpath(resource_path(ASSET_MANIFEST_FILE))
+    paths = []
+    for root, dirs, files in os.walk(assets_root):
+        dirs[:] = sorted(d for d in dirs if os.path.normpath(os.path.join(root, d)) not in excluded_dirs)
+        for filename in files:
+            full_path = os.path.join(root, filename)
+            if os.path.normpath(full_path) != manifest_path:
+                paths.append(os.path.relpath(full_path, assets_root).replace(os.sep, '/'))
+    return sorted(paths)
+
+
+def check_asset_manifest():
+    """
+    Сравнивает манифест ассетов с файлами на диске.
+
+    Returns:
+        dict | None: Словарь со списками 'missing' (в манифесте, но нет на диске),
+                     'unlisted' (на диске, но нет в манифесте) и 'changed' (размер файла
+                     не совпадает с манифестом), или None, если манифест не загружен.
+    """
+    if ASSET_MANIFEST is None:
+        return None
+    listed = ASSET_MANIFEST['files']
+    on_disk = set(list_asset_files())
+    changed = []
+    for path in sorted(on_disk & set(listed)):
+        if os.path.getsize(resource_path(os.path.join(ASSETS_DIR, path))) != listed[path]['bytes']:
+            changed.append(path)
+    return {
+        'missing': sorted(set(listed) - on_disk),
+        'unlisted': sorted(on_disk - set(listed)),
+        'changed': changed,
+    }
+
+
+def report_asset_manifest_problems():
+    """Выводит предупреждения о расхождениях между манифестом ассетов и файлами на диске."""
+    problems = check_asset_manifest()
+    if not problems:
+        return
+    for path in problems['missing']:
+        print(f"Warning: Asset '{path}' is listed in the manifest but missing on disk.")
+    for path in problems['unlisted']:
+        print(f"Warning: Asset '{path}' is not listed in the manifest. Run tools/build_asset_manifest.py.")
+    for path in problems['changed']:
+        print(f"Warning: Asset '{path}' has changed since the manifest was built. Run tools/build_asset_manifest.py.")
+
+
+def load_atlas_manifest():
+    """
+    Загружает манифест текстурных атласов, созданный tools/build_atlas.py.
+
+    Если манифест отсутствует или поврежден, атласы не используются и все
+    изображения загружаются из отдельных файлов.
+
+    Returns:
+        dict | None: Содержимое манифеста или None.
+    """
+    global ATLAS_MANIFEST
+    manifest_path = resource_path(os.path.join(ATLAS_DIR, ATLAS_MANIFEST_FILE))
+    try:
+        with open(manifest_path, encoding='utf-8') as manifest_file:
+            ATLAS_MANIFEST = json.load(manifest_file)
+    except (OSError, ValueError):
+        ATLAS_MANIFEST = None
+    ATLAS_SHEETS.clear()
+    return ATLAS_MANIFEST
+
+
+def _get_atlas_image(path_in_images_dir, actual_path):
+    """
+    Возвращает изображение из атласа в виде подповерхности листа.
+
+    Args:
+        path_in_images_dir (str): Путь к изображению внутри IMAGES_DIR.
+        actual_path (str): Полный путь к исходному файлу изображения.
+
+    Returns:
+        pygame.Surface | None: Подповерхность листа или None, если изображения нет
+                               в атласе или исходный файл новее собранного атласа.
+    """
+    if not ATLAS_MANIFEST:
+        return None
+    entry = ATLAS_MANIFEST['sprites'].get(path_in_images_dir.replace(os.sep, '/'))
+    if entry is None:
+        return None
+    try:
+        # Исходник изменился после сборки - атлас устарел, читаем файл напрямую
+        if os.path.getmtime(actual_path) > entry['mtime']:
+            return None
+    except OSError:
+        pass  # Исходника нет (например, в сборке поставляются только атласы)
+
+    sheet = ATLAS_SHEETS.get(entry['sheet'])
+    if sheet is None:
+        sheet_path = resource_path(os.path.join(ATLAS_DIR, entry['sheet']))
+        sheet = pygame.image.load(sheet_path).convert_alpha()
+        ATLAS_SHEETS[entry['sheet']] = sheet
+    return sheet.subsurface(pygame.Rect(entry['rect']))
+
+
+def get_effect_image(path_from_project_root, default_color, size, alpha=None):
+    """
+    Возвращает общую поверхность эффекта или снаряда из реестра EFFECT_IMAGES.
+
+    При первом обращении изображение загружается через load_image и, если указано,
+    получает заданную прозрачность. Последующие вызовы с тем же набором параметров
+    возвращают ту же поверхность без обращения к диску, поэтому изменять ее нельзя.
+
+    Args:
+        path_from_project_root (str): Путь к изображению внутри IMAGES_DIR.
+        default_color (tuple | None): Цвет для резервной поверхности (fallback).
+        size (tuple): Кортеж (ширина, высота) для масштабирования.
+        alpha (int, optional): Прозрачность поверхности (0-255).
+
+    Returns:
+        pygame.Surface: Готовая к отрисовке поверхность.
+    """
+    key = (path_from_project_root, tuple(size), alpha)
+    image = EFFECT_IMAGES.get(key)
+    if image is None:
+        image = load_image(path_from_project_root, default_color, size)
+        if alpha is not None:
+            image.set_alpha(alpha)
+        EFFECT_IMAGES[key] = image
+    return image
+
+
+def load_animation_frames(category, folder, anim_type, size):
+    """
+    Возвращает кадры анимации из общей библиотеки, загружая их при первом обращении.
+
+    Кадры ищутся по шаблону `{категория}/{папка}/{тип_анимации}_{N}.png`. Их число
+    берется из манифеста ассетов, а без манифеста кадры перебираются, пока
+    очередной файл не будет найден. Если не удалось загрузить ни одного кадра,
+    в библиотеку кладется один прозрачный резервный кадр.
+
+    Args:
+        category (str): Папка категории внутри IMAGES_DIR (например, 'enemies').
+        folder (str): Папка конкретного юнита или эффекта.
+        anim_type (str): Тип анимации ('idle', 'walk', 'attack', 'aura' и т.д.).
+        size (tuple): Кортеж (ширина, высота) для масштабирования кадров.
+
+    Returns:
+        tuple[pygame.Surface]: Неизменяемая последовательность кадров, общая для всех экземпляров.
+    """
+    key = (category, folder, anim_type, tuple(size))
+    with ANIMATION_LIBRARY_LOCK:
+        frames = ANIMATION_LIBRARY.get(key)
+        if frames is not None:
+            ANIMATION_LIBRARY_STATS['hits'] += 1
+            return frames
+        event = ANIMATION_LOADS_IN_FLIGHT.get(key)
+        if event is None:
+            ANIMATION_LIBRARY_STATS['misses'] += 1
+            ANIMATION_LOADS_IN_FLIGHT[key] = threading.Event()
+
+    if event is not None:
+        # Ключ декодирует другой поток - дожидаемся его кадров
+        event.wait()
+        with ANIMATION_LIBRARY_LOCK:
+            frames = ANIMATION_LIBRARY.get(key)
+            if frames is not None:
+                ANIMATION_LIBRARY_STATS['hits'] += 1
+                return frames
+        # Загрузка в другом потоке сорвалась или кадры уже освобождены - пробуем сами
+        return load_animation_frames(category, folder, anim_type, size)
+
+    try:
+        frames = _decode_animation_frames(category, folder, anim_type, size)
+        with ANIMATION_LIBRARY_LOCK:
+            ANIMATION_LIBRARY[key] = frames
+    finally:
+        with ANIMATION_LIBRARY_LOCK:
+            ANIMATION_LOADS_IN_FLIGHT.pop(key).set()
+    return frames
+
+
+def _decode_animation_frames(category, folder, anim_type, size):
+    """Загружает кадры анимации с диска (см. load_animation_frames) и возвращает их кортежем."""
+    loaded_frames = []
+    frame_count = get_animation_frame_count(category, folder, anim_type)
+    if frame_count is not None:
+        # Число кадров известно из манифеста - перебор файлов не нужен
+        for frame_index in range(frame_count):
+            path = os.path.join(category, folder, f"{anim_type}_{frame_index}.png")
+            loaded_frames.append(load_image(path, None, size))
+    else:
+        frame_index = 0
+        while True:
+            path = os.path.join(category, folder, f"{anim_type}_{frame_index}.png")
+            try:
+                loaded_frames.append(load_image(path, None, size, raise_on_error=True))
+                frame_index += 1
+            except (FileNotFoundError, pygame.error):
+                break
+
+    # Резервный вариант на случай, если для анимации не было загружено ни одного кадра
+    if not loaded_frames:
+        fallback_surface = pygame.Surface(size, pygame.SRCALPHA)
+        fallback_surface.fill((0, 0, 0, 0))
+        loaded_frames.append(fallback_surface)
+
+    return tuple(loaded_frames)
+
+
+def get_unit_animation_keys(unit_type, data, default_category, size):
+    """
+    Возвращает ключи общей библиотеки анимаций, которые понадобятся юниту.
+
+    Повторяет правила Enemy.load_animations и Defender.load_animations: каждая
+    анимация - это ключ-список в 'animation_data' юнита.
+
+    Args:
+        unit_type (str): Тип юнита (используется как папка по умолчанию).
+        data (dict): Данные юнита из DEFENDERS_DATA или ENEMIES_DATA.
+        default_category (str): Категория, если в данных она не указана.
+        size (tuple): Размер кадров.
+
+    Returns:
+        list[tuple]: Ключи вида (категория, папка, тип_анимации, размер).
+    """
+    anim_data = data.get('animation_data')
+    if not anim_data:
+        return []
+    category = data.get('category', default_category)
+    folder = anim_data.get('folder', unit_type)
+    return [(category, folder, anim_type, tuple(size))
+            for anim_type, frames in anim_data.items() if isinstance(frames, list)]
+
+
+def release_animation_frames(key):
+    """
+    Удаляет последовательность кадров из общей библиотеки.
+    Спрайты, которые уже получили эти кадры, продолжают ими пользоваться.
+    """
+    with ANIMATION_LIBRARY_LOCK:
+        ANIMATION_LIBRARY.pop(tuple(key), None)
+
+
+def load_music_buffer(name):
+    """
+    Читает музыкальный трек в память (MUSIC_BUFFERS), чтобы его запуск не обращался к диску.
+
+    Args:
+        name (str): Имя трека (ключ в словаре MUSIC).
+    """
+    path = MUSIC.get(name)
+    if not path or name in MUSIC_BUFFERS:
+        return
+    try:
+        with open(path, 'rb') as music_file:
+            MUSIC_BUFFERS[name] = music_file.read()
+    except OSError:
+        print(f"Warning: Music file '{path}' could not be read into memory.")
+
+
+def release_music_buffer(name):
+    """Освобождает прочитанный в память музыкальный трек."""
+    MUSIC_BUFFERS.pop(name, None)
+
+
+def get_animation_library_stats():
+    """
+    Возвращает статистику работы библиотеки анимаций.
+
+    Returns:
+        dict: Словарь с количеством попаданий ('hits'), промахов ('misses')
+              и загруженных последовательностей ('sequences').
+    """
+    with ANIMATION_LIBRARY_LOCK:
+        return {**ANIMATION_LIBRARY_STATS, 'sequences': len(ANIMATION_LIBRARY)}
+
+
 def load_sound(name, filename_in_sounds_dir):
     """
     Загружает звуковой эффект и добавляет его в глобальный словарь SOUNDS.
@@ -172,13 +870,67 @@ def load_sound(name, filename_in_sounds_dir):
     path_from_project_root = os.path.join(ASSETS_DIR, 'sounds', filename_in_sounds_dir)
     actual_path = resource_path(path_from_project_root)
     try:
-        sound = pygame.mixer.Sound(actual_path)
+        # Декодированный PCM из кэша избавляет от повторного декодирования mp3
+        sound = _load_cached_pcm(actual_path)
+        if sound is None:
+            sound = pygame.mixer.Sound(actual_path)
+            _store_cached_pcm(actual_path, sound)
         SOUNDS[name] = sound
     except (pygame.error, FileNotFoundError):
         print(f"Warning: Sound '{actual_path}' (original relative: '{path_from_project_root}') not found. Sound will not be played.")
         SOUNDS[name] = None
 
 
+def _get_pcm_cache_path(actual_path):
+    """
+    Возвращает путь к файлу кэша декодированного звука или None.
+
+    Ключ - хэш исходника и текущий формат микшера (частота, размер сэмпла, каналы),
+    поэтому изменение файла или настроек AUDIO_* в data/configs дает новый ключ.
+    """
+    if not SOUND_CACHE_ENABLED:
+        return None
+    mixer_format = pygame.mixer.get_init()
+    digest = get_source_hash(actual_path)
+    if not mixer_format or digest is None:
+        return None
+    frequency, sample_size, channels = mixer_format
+    return resource_path(os.path.join(SOUND_CACHE_DIR, f'{digest}_{frequency}_{sample_size}_{channels}.pcm'))
+
+
+def _load_cached_pcm(actual_path):
+    """
+    Создает звук из кэша декодированного PCM без повторного декодирования.
+
+    Returns:
+        pygame.mixer.Sound | None: Звук или None при промахе кэша.
+    """
+    cache_path = _get_pcm_cache_path(actual_path)
+    if cache_path is None:
+        return None
+    try:
+        with open(cache_path, 'rb') as cache_file, \
+                mmap.mmap(cache_file.fileno(), 0, access=mmap.ACCESS_READ) as pcm:
+            return pygame.mixer.Sound(buffer=pcm)  # Sound копирует данные, файл можно закрыть
+    except (OSError, ValueError, pygame.error):
+        return None  # Нет файла, пустой файл или несовместимые данные - считаем промахом
+
+
+def _store_cached_pcm(actual_path, sound):
+    """Сохраняет декодированный звук в кэш. Ошибки записи игнорируются."""
+    cache_path = _get_pcm_cache_path(actual_path)
+    if cache_path is None:
+        return
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temp_path = f'{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp'  # Свой файл у каждого потока и процесса
+        with open(temp_path, 'wb') as cache_file:
+            cache_file.write(sound.get_raw())
+        os.replace(temp_path, cache_path)
+    except OSError:
+        pass
+
+
 def load_music(name, filename_in_music_dir):
     """
     Загружает путь к музыкальному файлу и добавляет его в глобальный словарь MUSIC.
@@ -193,7 +945,7 @@ def load_music(name, filename_in_music_dir):
     path_from_project_root = os.path.join(ASSETS_DIR, 'sounds', 'music', filename_in_music_dir)
     actual_path = resource_path(path_from_project_root)
 
-    if os.path.exists(actual_path): # Проверяем существование файла по актуальному пути
+    if is_asset_listed(path_from_project_root, actual_path): # Проверяем по манифесту (или на диске)
         MUSIC[name] = actual_path
     else:
         print(f"Warning: Music file '{actual_path}' (original relative: '{path_from_project_root}') not found.")
@@ -8,6 +8,10 @@
 SCREEN_WIDTH = 1280      # Ширина окна в пикселях
 SCREEN_HEIGHT = 720     # Высота окна в пикселях
 FPS = 60                # Целевая частота кадров в секунду
+# Бой обновляется фиксированными шагами независимо от частоты отрисовки.
+# Скорости юнитов и снарядов заданы в пикселях за один такой шаг.
+SIMULATION_STEP_MS = 1000 / FPS     # Длительность одного шага симуляции боя в мс
+MAX_SIMULATION_STEPS_PER_FRAME = 5  # Сколько шагов можно "догнать" за один кадр при просадке FPS
 TITLE = "Студенты против Злоключений" # Заголовок окна игры
 
 # =============================================================================
@@ -17,6 +21,32 @@ TITLE = "Студенты против Злоключений" # Заголов
 ASSETS_DIR = 'assets'
 IMAGES_DIR = f'{ASSETS_DIR}/images'
 
+# --- Манифест ассетов ---
+# Список всех файлов ассетов с размерами и хэшами и число кадров каждой анимации.
+# Генерируется скриптом tools/build_asset_manifest.py и хранится в репозитории.
+ASSET_MANIFEST_FILE = f'{ASSETS_DIR}/asset_manifest.json'
+
+# --- Текстурные атласы ---
+# Атласы собираются офлайн скриптом tools/build_atlas.py. Если манифеста нет,
+# изображения загружаются из отдельных файлов, как и раньше.
+ATLAS_DIR = f'{ASSETS_DIR}/atlas'
+ATLAS_MANIFEST_FILE = 'atlas_manifest.json'
+ATLAS_CATEGORIES = ['calamities', 'defenders', 'effects', 'enemies', 'projectiles', 'resources', 'systems', 'ui']
+ATLAS_MAX_SHEET_SIZE = 2048  # Максимальная ширина и высота одного листа атласа
+ATLAS_PADDING = 1            # Отступ между изображениями на листе
+
+# --- Кэш подготовленных ассетов ---
+# Папка для данных, которые можно восстановить из исходников (удаление безопасно).
+CACHE_DIR = '.cache'
+# Уже масштабированные и сконвертированные изображения, ключ - (хэш исходника, размер).
+BAKED_IMAGES_DIR = f'{CACHE_DIR}/baked_images'
+BAKED_IMAGES_ENABLED = True
+# Хэши исходников с размером и временем изменения, чтобы холодный запуск не перечитывал файлы целиком.
+SOURCE_HASH_INDEX_FILE = f'{CACHE_DIR}/source_hashes.json'
+# Декодированные звуки (сырой PCM в формате микшера), ключ - (хэш исходника, формат микшера).
+SOUND_CACHE_DIR = f'{CACHE_DIR}/sounds'
+SOUND_CACHE_ENABLED = True
+
 # =============================================================================
 # 3. НАСТРОЙКИ БОЕВОЙ СЕТКИ
 # =============================================================================
@@ -30,6 +60,20 @@ GRID_START_X = 150      # Отступ сетки от левого края э
 GRID_START_Y = 150      # Отступ сетки от верхнего края экрана
 GRID_WIDTH = GRID_COLS * CELL_SIZE_W   # Рассчитанная общая ширина сетки
 GRID_HEIGHT = GRID_ROWS * CELL_SIZE_H  # Рассчитанная общая высота сетки
+DEFENDER_SPRITE_SIZE = (CELL_SIZE_W - 10, CELL_SIZE_H - 10)  # Размер кадров анимации защитников
+ENEMY_SPRITE_SIZE = (CELL_SIZE_W - 20, CELL_SIZE_H - 10)     # Размер кадров анимации врагов
+# Пространственный хэш для поиска юнитов по радиусу (core/spatial_hash.py)
+SPATIAL_HASH_CELL_SIZE = CELL_SIZE_W  # Сторона ячейки хэша в пикселях
+SPATIAL_HASH_QUERY_MARGIN = CELL_SIZE_W // 2  # Запас на перемещение юнитов за шаг после синхронизации хэша
+ENEMY_INDEX_BUCKET_WIDTH = CELL_SIZE_W  # Ширина корзины индекса врагов по оси X (core/enemy_index.py)
+ENEMY_INDEX_QUERY_MARGIN = CELL_SIZE_W // 2  # Запас на перемещение врагов за шаг после синхронизации индекса
+ENEMY_INDEX_HEAP_SLACK = 64  # Сколько устаревших записей кучи здоровья допускать сверх двойного числа врагов
+RENDER_QUEUE_FULL_SORT_RATIO = 0.25  # Доля изменившихся спрайтов, при которой очередь отрисовки сортируется целиком
+PATH_CACHE_SIZE = 256  # Сколько найденных путей A* хранить в кэше (core/pathfinding.py)
+FLOW_FIELD_CACHE_SIZE = 32  # Сколько полей направлений к целям хранить в кэше (core/pathfinding.py)
+OCCUPANCY_CHANGE_LOG_SIZE = 64  # Сколько изменений проходимости помнит сетка занятости для ремонта путей
+HPA_CLUSTER_SIZE = 10  # Сторона кластера иерархического поиска пути в клетках (core/hierarchical_pathfinding.py)
+HPA_LONG_ENTRANCE = 6  # С какой длины вход между кластерами получает два перехода вместо одного
 
 # =============================================================================
 # 4. НАСТРОЙКИ КОМАНДЫ
@@ -47,6 +47,7 @@ MATH_TEACHER_SPEED_PENALTY = 2.0    # Делитель скорости Мате
 MEDIC_HEAL_TICK_AMOUNT = 75         # Количество здоровья, восстанавливаемое Медиком за раз
 AURA_ANIMATION_SPEED = 0.1          # Скорость анимации ауры Активиста
 ENEMY_ATTACK_OFFSET = 80            # Смещение врага при атаке, чтобы он "наезжал" на защитника
+BOOK_ATTACK_ALPHA = 150             # Прозрачность эффекта атаки Ботана
 
 # --- Напасти ---
 CALAMITY_TRIGGERS = [0.3, 0.7] # Прогресс спавна (30% и 70%), при котором срабатывают напасти
@@ -21,6 +21,8 @@ START_SCREEN_BUTTON_V_OFFSET = 50
 START_SCREEN_BUTTON_V_SPACING = 120
 PAUSE_MENU_BUTTON_SIZE = (400, 80)
 PAUSE_MENU_V_SPACING = 100
+LOADING_BAR_SIZE = (400, 20)         # Полоса фоновой загрузки ресурсов
+LOADING_BAR_BOTTOM_OFFSET = 60       # Отступ полосы загрузки от нижнего края экрана
 
 # --- Конфигурации кнопок для универсального меню ---
 # Списки кортежей для создания кнопок в универсальном меню (пауза, победа и т.д.)
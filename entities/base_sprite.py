@@ -2,7 +2,8 @@
 
 import pygame
 from data.settings import *
-from data.assets import load_image
+from data.assets import get_effect_image
+from core.clock import get_ticks
 
 
 class BaseSprite(pygame.sprite.Sprite):
@@ -20,11 +21,26 @@ class BaseSprite(pygame.sprite.Sprite):
         """
         super().__init__(*groups)
         # Время последнего обновления, может использоваться дочерними классами для таймеров.
-        self.last_update = pygame.time.get_ticks()
+        self.last_update = get_ticks()
         # Определяем слой для отрисовки. Спрайты с большим значением _layer рисуются поверх.
         # `self.rect.bottom` обеспечивает эффект псевдо-3D: те, кто ниже на экране, кажутся ближе.
         self._layer = self.rect.bottom if hasattr(self, 'rect') else 4
 
+    # Очередь отрисовки (core/render_queue.py), в которой стоит спрайт; ее назначает сама очередь
+    render_queue = None
+
+    @property
+    def _layer(self):
+        """Слой отрисовки. До первого присваивания атрибута нет (на это рассчитывает LayeredUpdates)."""
+        return self._draw_layer
+
+    @_layer.setter
+    def _layer(self, value):
+        """Меняет слой и сообщает очереди отрисовки, что спрайт нужно переставить."""
+        if self.render_queue is not None and value != self._draw_layer:
+            self.render_queue.mark_changed(self)
+        self._draw_layer = value
+
     def draw(self, surface):
         """
         Стандартный метод отрисовки спрайта на поверхности.
@@ -51,17 +67,18 @@ class ExplosionEffect(BaseSprite):
         """
         super().__init__(*groups)
         self.radius = radius
-        # Загружаем изображение и масштабируем его до диаметра взрыва
-        self.image = load_image('projectiles/explosion.png', DEFAULT_COLORS['explosion'], (self.radius * 2, self.radius * 2))
+        # Берем из реестра изображение, масштабированное до диаметра взрыва
+        self.image = get_effect_image('projectiles/explosion.png', DEFAULT_COLORS['explosion'],
+                                      (self.radius * 2, self.radius * 2))
         self.rect = self.image.get_rect(center=center)
-        self.spawn_time = pygame.time.get_ticks()
+        self.spawn_time = get_ticks()
         self.lifetime = EXPLOSION_LIFETIME # Время жизни эффекта из настроек
 
     def update(self, *args, **kwargs):
         """
         Обновляет состояние эффекта. Если время жизни истекло, уничтожает спрайт.
         """
-        if pygame.time.get_ticks() - self.spawn_time > self.lifetime:
+        if get_ticks() - self.spawn_time > self.lifetime:
             self.kill()
 
 
@@ -80,15 +97,16 @@ class BookAttackEffect(BaseSprite):
             diameter (int): Диаметр круга атаки в пикселях.
         """
         super().__init__(groups)
-        self.image = load_image('projectiles/book_attack.png', DEFAULT_COLORS['book_attack'], (diameter, diameter))
-        self.image.set_alpha(150) # Делаем эффект полупрозрачным
+        # Полупрозрачный вариант изображения заранее подготовлен в реестре эффектов
+        self.image = get_effect_image('projectiles/book_attack.png', DEFAULT_COLORS['book_attack'], (diameter, diameter),
+                                      alpha=BOOK_ATTACK_ALPHA)
         self.rect = self.image.get_rect(center=center_pos)
-        self.spawn_time = pygame.time.get_ticks()
+        self.spawn_time = get_ticks()
         self.lifetime = BOOK_ATTACK_LIFETIME # Время жизни эффекта из настроек
 
     def update(self, *args, **kwargs):
         """
         Обновляет состояние эффекта. Если время жизни истекло, уничтожает спрайт.
         """
-        if pygame.time.get_ticks() - self.spawn_time > self.lifetime:
+        if get_ticks() - self.spawn_time > self.lifetime:
             self.kill()
\ No newline at end of file
@@ -1,14 +1,16 @@
 # entities/defenders.py
 
 import pygame
-import os
 import random
 import math
 from data.settings import *
-from data.assets import PROJECTILE_IMAGES, load_image
+from data.assets import PROJECTILE_IMAGES, load_animation_frames
 from entities.base_sprite import BaseSprite, ExplosionEffect, BookAttackEffect
 from entities.projectiles import Bracket, PaintSplat, SoundWave
 from entities.other_sprites import CoffeeBean, AuraEffect
+from core.clock import get_ticks
+from core.lane_index import get_lane
+from core.events import DEFENDER_DAMAGED, DEFENDER_DIED, DEFENDER_MOVED
 
 
 class Defender(BaseSprite):
@@ -51,7 +53,7 @@ class Defender(BaseSprite):
             self.image.fill(DEFAULT_COLORS.get(unit_type, RED))
             self.rect = self.image.get_rect(center=(x, y))
 
-        self.last_anim_update = pygame.time.get_ticks()
+        self.last_anim_update = get_ticks()
         self.anim_speed = self.data.get('animation_data', {}).get('speed', 0.3)
 
         self._layer = self.rect.bottom
@@ -64,6 +66,12 @@ class Defender(BaseSprite):
         self.is_upgraded = False    # Был ли юнит улучшен на экране подготовки
         self.buff_multiplier = 1.0  # Множитель урона от аур (например, Активиста)
         self.calamity_damage_multiplier = 1.0 # Множитель урона/здоровья от "напастей"
+        self.event_bus = None       # Шина событий боя (core.events), назначается при размещении
+
+    def emit_event(self, event_type, **payload):
+        """Сообщает о событии жизненного цикла в шину событий боя, если она подключена."""
+        if self.event_bus is not None:
+            self.event_bus.emit(event_type, self, **payload)
 
     def get_hit(self, damage):
         """Обрабатывает получение урона."""
@@ -73,47 +81,28 @@ class Defender(BaseSprite):
         if 'hit' in self.animations and self.animations['hit']:
             self.current_animation = 'hit'
             self.frame_index = 0
+        self.emit_event(DEFENDER_DAMAGED, damage=damage)
 
     def load_animations(self):
-        """Загружает все кадры анимаций для юнита, итеративно проверяя файлы."""
+        """Берет кадры анимаций юнита из общей библиотеки, загружая их с диска только один раз."""
         anim_data = self.data.get('animation_data')
         if not anim_data:
             return
 
-        size = (CELL_SIZE_W - 10, CELL_SIZE_H - 10)
+        size = DEFENDER_SPRITE_SIZE
         category = self.data.get('category', 'defenders')
         folder = anim_data.get('folder', self.data.get('type'))
 
         for anim_type in anim_data:
             if not isinstance(anim_data[anim_type], list):
                 continue
-
-            self.animations[anim_type] = []
-            frame_index = 0
-            while True:
-                filename = f"{anim_type}_{frame_index}.png"
-                path = os.path.join(category, folder, filename)
-
-                try:
-                    img = load_image(path, DEFAULT_COLORS.get(self.data['type']), size, raise_on_error=True)
-                    self.animations[anim_type].append(img)
-                    frame_index += 1
-                except (FileNotFoundError, pygame.error):
-                    break
-
-            # Резервный вариант на случай, если для анимации не было загружено ни одного кадра
-            if not self.animations.get(anim_type):
-                fallback_surface = pygame.Surface(size, pygame.SRCALPHA)
-                fallback_surface.fill((0, 0, 0, 0))
-                self.animations[anim_type] = [fallback_surface]
+            self.animations[anim_type] = load_animation_frames(category, folder, anim_type, size)
 
     def animate(self):
         """Управляет сменой кадров текущей анимации."""
         if not self.animations or not self.animations.get(self.current_animation):
             return
 
-        anim_sequence = self.animations[self.current_animation]
-
         # Принудительно включаем анимацию 'hit', если юнита едят
         if self.is_being_eaten and self.current_animation != 'hit':
             if 'hit' in self.animations and self.animations['hit']:
@@ -122,7 +111,13 @@ class Defender(BaseSprite):
         elif not self.is_being_eaten and self.current_animation == 'hit':
             pass
 
-        now = pygame.time.get_ticks()
+        # Последовательность берется после возможного переключения, а номер кадра
+        # ограничивается ее длиной: у разных анимаций разное число кадров
+        anim_sequence = self.animations[self.current_animation]
+        if self.frame_index >= len(anim_sequence):
+            self.frame_index = 0
+
+        now = get_ticks()
         if now - self.last_anim_update > self.anim_speed * 1000:
             self.last_anim_update = now
             self.image = anim_sequence[int(self.frame_index)]
@@ -134,6 +129,13 @@ class Defender(BaseSprite):
                     self.current_animation = 'idle'
                 self.frame_index = 0
 
+    def has_enemy_ahead(self, lane_index):
+        """Проверяет, есть ли враг на линии юнита правее его левого края (поиск по индексу линий)."""
+        row = get_lane(self)
+        if row is None:
+            return False
+        return lane_index.get_nearest_enemy_right(row, self.rect.left) is not None
+
     def get_final_damage(self, base_damage):
         """Рассчитывает итоговый урон с учетом всех модификаторов."""
         return base_damage * self.buff_multiplier * self.calamity_damage_multiplier
@@ -189,6 +191,7 @@ class Defender(BaseSprite):
         if self.is_animate:
             self.sound_manager.play_sfx('hero_dead')
         super().kill()
+        self.emit_event(DEFENDER_DIED)
 
 
 class ProgrammerBoy(Defender):
@@ -198,7 +201,7 @@ class ProgrammerBoy(Defender):
         self.all_sprites = all_sprites
         self.projectile_group = projectile_group
         self.attack_cooldown = self.data['cooldown'] * 1000
-        self.last_shot = pygame.time.get_ticks()
+        self.last_shot = get_ticks()
 
     def update(self, **kwargs):
         super().update(**kwargs)
@@ -207,11 +210,9 @@ class ProgrammerBoy(Defender):
 
         if self.is_being_eaten: return
 
-        now = pygame.time.get_ticks()
+        now = get_ticks()
         # Проверяем, есть ли враг на линии справа от юнита
-        has_enemy_in_row = any(
-            enemy.rect.centery == self.rect.centery and enemy.rect.left >= self.rect.left
-            for enemy in enemies_group)
+        has_enemy_in_row = self.has_enemy_ahead(kwargs.get('lane_index'))
 
         # Если есть враг и перезарядка прошла, стреляем
         if self.alive() and has_enemy_in_row and now - self.last_shot > self.attack_cooldown:
@@ -232,7 +233,7 @@ class BotanistGirl(Defender):
         self.all_sprites = all_sprites
         self.enemies_group = enemies_group
         self.attack_cooldown = self.data['cooldown'] * 1000
-        self.last_attack = pygame.time.get_ticks()
+        self.last_attack = get_ticks()
         self.explosion_radius = self.data['radius']
 
     def update(self, **kwargs):
@@ -240,31 +241,28 @@ class BotanistGirl(Defender):
         enemies_group = kwargs.get('enemies_group')
         if not enemies_group or self.is_being_eaten: return
 
-        now = pygame.time.get_ticks()
+        now = get_ticks()
         if self.alive() and now - self.last_attack > self.attack_cooldown:
-            target = self.find_strongest_enemy(enemies_group)
+            target = self.find_strongest_enemy(kwargs.get('enemy_index'))
             if target:
                 self.last_attack = now
-                self.attack(target, enemies_group)
+                self.attack(target, kwargs.get('spatial_hash'))
                 self.current_animation = 'attack'
                 self.frame_index = 0
 
-    def find_strongest_enemy(self, enemies_group):
-        """Находит врага с наибольшим текущим здоровьем."""
-        if not enemies_group:
-            return None
-        return max(enemies_group, key=lambda e: e.health)
+    def find_strongest_enemy(self, enemy_index):
+        """Находит врага с наибольшим текущим здоровьем (вершина кучи индекса врагов)."""
+        return enemy_index.get_strongest()
 
-    def attack(self, target, enemies_group):
+    def attack(self, target, spatial_hash):
         """Наносит урон по области вокруг цели."""
         damage = self.get_final_damage(self.data['damage'])
         explosion_center = target.rect.center
         pixel_radius = self.explosion_radius * CELL_SIZE_W
         BookAttackEffect(explosion_center, self.all_sprites, pixel_radius * 2)
-        # Проверяем каждого врага на попадание в радиус взрыва
-        for enemy in enemies_group:
-            if pygame.math.Vector2(enemy.rect.center).distance_to(explosion_center) <= pixel_radius:
-                enemy.get_hit(damage)
+        # Урон получают враги в радиусе взрыва (поиск только по соседним ячейкам хэша)
+        for enemy in spatial_hash.query_radius('enemies', explosion_center, pixel_radius):
+            enemy.get_hit(damage)
 
 
 class CoffeeMachine(Defender):
@@ -274,7 +272,7 @@ class CoffeeMachine(Defender):
         self.all_sprites = all_sprites
         self.coffee_bean_group = coffee_bean_group
         self.production_cooldown = self.data['cooldown'] * 1000
-        self.last_production = pygame.time.get_ticks()
+        self.last_production = get_ticks()
         self.is_producing = False
         self.producing_timer = 0
         self.producing_duration = COFFEE_MACHINE_PRODUCING_DURATION
@@ -283,7 +281,9 @@ class CoffeeMachine(Defender):
 
     def kill(self):
         """У Кофемашины нет звука смерти героя, поэтому используется базовый kill."""
+        if not self.alive(): return
         pygame.sprite.Sprite.kill(self)
+        self.emit_event(DEFENDER_DIED)
 
     def manage_scream_sound(self):
         """Кофемашина не кричит, когда ее атакуют."""
@@ -302,7 +302,7 @@ class CoffeeMachine(Defender):
 
     def update(self, **kwargs):
         self.animate()
-        now = pygame.time.get_ticks()
+        now = get_ticks()
 
         if self.is_producing and now - self.producing_timer > self.producing_duration:
             self.is_producing = False
@@ -329,27 +329,26 @@ class Activist(Defender):
 
 class Guitarist(Defender):
     """Атакует всех врагов на своей линии проникающей звуковой волной."""
-    def __init__(self, x, y, groups, data, sound_manager, all_sprites, enemies_group):
+    def __init__(self, x, y, groups, data, sound_manager, all_sprites, enemies_group, sound_wave_group):
         super().__init__(x, y, groups, data, sound_manager)
         self.all_sprites = all_sprites
+        self.sound_wave_group = sound_wave_group
         self.attack_cooldown = self.data['cooldown'] * 1000
-        self.last_attack = pygame.time.get_ticks()
+        self.last_attack = get_ticks()
 
     def update(self, **kwargs):
         super().update(**kwargs)
         enemies_group = kwargs.get('enemies_group')
         if not enemies_group or self.is_being_eaten: return
 
-        now = pygame.time.get_ticks()
-        has_enemy_in_row = any(
-            e.rect.centery == self.rect.centery and e.rect.left >= self.rect.left
-            for e in enemies_group)
+        now = get_ticks()
+        has_enemy_in_row = self.has_enemy_ahead(kwargs.get('lane_index'))
 
         if self.alive() and has_enemy_in_row and now - self.last_attack > self.attack_cooldown:
             self.last_attack = now
             damage = self.get_final_damage(self.data['damage'])
             speed = self.data.get('projectile_speed', SOUNDWAVE_PROJECTILE_SPEED)
-            SoundWave(self.rect.center, (self.all_sprites,), damage, self.rect.centery, speed)
+            SoundWave(self.rect.center, (self.all_sprites, self.sound_wave_group), damage, self.rect.centery, speed)
             self.current_animation = 'attack'
             self.frame_index = 0
 
@@ -362,7 +361,7 @@ class Medic(Defender):
         self.heal_radius = self.data['radius']
         self.heal_tick_amount = MEDIC_HEAL_TICK_AMOUNT
         self.heal_cooldown = MEDIC_HEAL_COOLDOWN_MS
-        self.last_heal_time = pygame.time.get_ticks()
+        self.last_heal_time = get_ticks()
 
     def update(self, **kwargs):
         super().update(**kwargs)
@@ -371,10 +370,10 @@ class Medic(Defender):
 
         if self.is_being_eaten: return
 
-        now = pygame.time.get_ticks()
+        now = get_ticks()
         if now - self.last_heal_time > self.heal_cooldown:
             self.last_heal_time = now
-            healed = self.heal(defenders_group)
+            healed = self.heal(kwargs.get('spatial_hash'))
             # Запускаем анимацию, только если лечение произошло
             if healed and self.heal_pool > 0:
                 self.current_animation = 'attack'
@@ -383,22 +382,21 @@ class Medic(Defender):
         if self.heal_pool <= 0:
             self.kill()
 
-    def find_most_wounded_ally_in_range(self, defenders_group):
+    def find_most_wounded_ally_in_range(self, spatial_hash):
         """Находит союзника с наименьшим процентом здоровья в радиусе."""
         pixel_radius = self.heal_radius * CELL_SIZE_W
         allies_in_range = [
-            d for d in defenders_group
-            if d.alive() and d is not self and d.health < d.max_health and
-               pygame.math.Vector2(self.rect.center).distance_to(d.rect.center) <= pixel_radius
+            d for d in spatial_hash.query_radius('defenders', self.rect.center, pixel_radius)
+            if d is not self and d.health < d.max_health
         ]
         if not allies_in_range:
             return None
         # Ключ для сортировки - процент здоровья, чтобы лечить наиболее раненых
         return min(allies_in_range, key=lambda d: d.health / d.max_health)
 
-    def heal(self, defenders_group):
+    def heal(self, spatial_hash):
         """Лечит найденную цель."""
-        target = self.find_most_wounded_ally_in_range(defenders_group)
+        target = self.find_most_wounded_ally_in_range(spatial_hash)
         if target:
             heal_amount = min(self.heal_tick_amount, self.heal_pool)
             target.health = min(target.max_health, target.health + heal_amount)
@@ -414,7 +412,7 @@ class Artist(Defender):
         self.all_sprites = all_sprites
         self.projectile_group = projectile_group
         self.attack_cooldown = self.data['cooldown'] * 1000
-        self.last_shot = pygame.time.get_ticks()
+        self.last_shot = get_ticks()
 
     def update(self, **kwargs):
         super().update(**kwargs)
@@ -423,10 +421,8 @@ class Artist(Defender):
 
         if self.is_being_eaten: return
 
-        now = pygame.time.get_ticks()
-        has_enemy_in_row = any(
-            enemy.rect.centery == self.rect.centery and enemy.rect.left >= self.rect.left
-            for enemy in enemies_group)
+        now = get_ticks()
+        has_enemy_in_row = self.has_enemy_ahead(kwargs.get('lane_index'))
 
         if self.alive() and has_enemy_in_row and now - self.last_shot > self.attack_cooldown:
             self.last_shot = now
@@ -450,16 +446,17 @@ class Fashionista(Defender):
 
     def update(self, **kwargs):
         enemies_group = kwargs.get('enemies_group')
+        spatial_hash = kwargs.get('spatial_hash')
         if not enemies_group or not self.alive():
             return
 
         # Если уже столкнулся с врагом, взрывается
-        if pygame.sprite.spritecollideany(self, enemies_group):
-            self.explode(enemies_group)
+        if spatial_hash.query_rect('enemies', self.rect):
+            self.explode(spatial_hash)
             return
 
         if self.state == 'SEEKING':
-            self.target = self.find_closest_enemy(enemies_group)
+            self.target = self.find_closest_enemy(spatial_hash)
             if self.target:
                 self.state = 'WALKING'
         elif self.state == 'WALKING':
@@ -471,21 +468,15 @@ class Fashionista(Defender):
             direction = pygame.math.Vector2(self.target.rect.center) - pygame.math.Vector2(self.rect.center)
             if direction.length() > 0:
                 self.rect.move_ip(direction.normalize() * self.speed)
+                self.emit_event(DEFENDER_MOVED)
 
         super().update(**kwargs)
 
-    def find_closest_enemy(self, enemies_group):
-        """Находит ближайшего врага на всем поле."""
-        closest_enemy = None
-        min_dist = float('inf')
-        for enemy in enemies_group:
-            dist = pygame.math.Vector2(self.rect.center).distance_to(enemy.rect.center)
-            if dist < min_dist:
-                min_dist = dist
-                closest_enemy = enemy
-        return closest_enemy
-
-    def explode(self, enemies_group):
+    def find_closest_enemy(self, spatial_hash):
+        """Находит ближайшего врага на всем поле (поиск кольцами ячеек от юнита)."""
+        return spatial_hash.find_nearest('enemies', self.rect.center)
+
+    def explode(self, spatial_hash):
         """Создает эффект взрыва и наносит урон всем врагам в радиусе."""
         if not self.alive(): return
 
@@ -493,12 +484,12 @@ class Fashionista(Defender):
 
         pixel_radius = self.explosion_radius * CELL_SIZE_W
         ExplosionEffect(self.rect.center, pixel_radius, self.all_sprites)
-        for enemy in enemies_group:
-            if pygame.math.Vector2(self.rect.center).distance_to(enemy.rect.center) <= pixel_radius:
-                enemy.get_hit(self.damage)
+        for enemy in spatial_hash.query_radius('enemies', self.rect.center, pixel_radius):
+            enemy.get_hit(self.damage)
         self.kill()
 
     def kill(self):
         """Переопределенный метод, чтобы убрать стандартный звук смерти героя."""
         if self.alive():
-             pygame.sprite.Sprite.kill(self)
\ No newline at end of file
+             pygame.sprite.Sprite.kill(self)
+             self.emit_event(DEFENDER_DIED)
\ No newline at end of file
@@ -2,15 +2,16 @@
 
 import pygame
 import random
-import os
 import math
 from data.settings import *
-from data.assets import load_image, PROJECTILE_IMAGES
+from data.assets import load_animation_frames, PROJECTILE_IMAGES
 from entities.base_sprite import BaseSprite
 from entities.projectiles import Integral
-from entities.defenders import CoffeeMachine
 from entities.other_sprites import CalamityAuraEffect
-from core.pathfinding import find_path
+from core.pathfinding import get_flow_field
+from core.clock import get_ticks
+from core.lane_index import get_lane
+from core.events import ENEMY_DAMAGED, ENEMY_DIED, DEFENDER_MOVED
 
 class Enemy(BaseSprite):
     """
@@ -32,6 +33,8 @@ class Enemy(BaseSprite):
         self.sound_manager = sound_manager
         self.data = ENEMIES_DATA[enemy_type]
         self.enemy_type = enemy_type
+        self.enemy_index = None # Индекс врагов (core.enemy_index), которому сообщается о смене здоровья
+        self.event_bus = None # Шина событий боя (core.events), назначается при появлении врага
         self.max_health = self.data['health']
         self.health = self.max_health
         self.speed = self.data['speed']
@@ -57,7 +60,7 @@ class Enemy(BaseSprite):
         self._layer = self.rect.bottom
 
         self.anim_speed = self.data.get('animation_data', {}).get('speed', 0.3)
-        self.last_anim_update = pygame.time.get_ticks()
+        self.last_anim_update = get_ticks()
 
         # --- Атака и состояния ---
         self.attack_cooldown = self.data['cooldown'] * 1000 if self.data['cooldown'] else DEFAULT_ATTACK_COOLDOWN_MS
@@ -68,35 +71,31 @@ class Enemy(BaseSprite):
         self.is_slowed = False
         self.is_attacking = False
 
+    @property
+    def health(self):
+        """Текущее здоровье врага."""
+        return self._health
+
+    @health.setter
+    def health(self, value):
+        """Меняет здоровье и сообщает об этом индексу врагов, чтобы запросы "самый сильный" были точными."""
+        self._health = value
+        if self.enemy_index is not None:
+            self.enemy_index.update_health(self)
+
     def load_animations(self):
-        """Загружает все кадры анимаций для врага из файлов (аналогично Defender)."""
+        """Берет кадры анимаций врага из общей библиотеки (аналогично Defender)."""
         anim_data = self.data.get('animation_data')
         if not anim_data: return
 
-        size = (CELL_SIZE_W - 20, CELL_SIZE_H - 10)
+        size = ENEMY_SPRITE_SIZE
         category = self.data.get('category', 'enemies')
         folder = anim_data.get('folder', self.enemy_type)
 
         for anim_type in anim_data:
             if not isinstance(anim_data[anim_type], list):
                 continue
-
-            self.animations[anim_type] = []
-            frame_index = 0
-            while True:
-                filename = f"{anim_type}_{frame_index}.png"
-                path = os.path.join(category, folder, filename)
-                try:
-                    img = load_image(path, DEFAULT_COLORS.get(self.enemy_type), size, raise_on_error=True)
-                    self.animations[anim_type].append(img)
-                    frame_index += 1
-                except (FileNotFoundError, pygame.error):
-                    break
-
-            if not self.animations.get(anim_type):
-                fallback_surface = pygame.Surface(size, pygame.SRCALPHA)
-                fallback_surface.fill((0, 0, 0, 0))
-                self.animations[anim_type] = [fallback_surface]
+            self.animations[anim_type] = load_animation_frames(category, folder, anim_type, size)
 
     def set_animation(self, new_animation_type):
         """Безопасно меняет текущую анимацию, сбрасывая индекс кадра."""
@@ -116,7 +115,7 @@ class Enemy(BaseSprite):
                 self.set_animation('walk')
 
         anim_sequence = self.animations[self.current_animation]
-        now = pygame.time.get_ticks()
+        now = get_ticks()
         if now - self.last_anim_update > self.anim_speed * 1000:
             self.last_anim_update = now
             self.frame_index = (self.frame_index + 1) % len(anim_sequence)
@@ -126,12 +125,18 @@ class Enemy(BaseSprite):
 
         self.image = anim_sequence[self.frame_index]
 
+    def emit_event(self, event_type, **payload):
+        """Сообщает о событии жизненного цикла в шину событий боя, если она подключена."""
+        if self.event_bus is not None:
+            self.event_bus.emit(event_type, self, **payload)
+
     def get_hit(self, damage):
         """Обрабатывает получение урона и запускает анимацию 'hit'."""
         self.health -= damage
         self.sound_manager.play_sfx('damage')
         if 'hit' in self.animations and self.animations['hit']:
             self.set_animation('hit')
+        self.emit_event(ENEMY_DAMAGED, damage=damage)
 
     def apply_calamity_effect(self, calamity_type):
         """Применяет положительный для врага эффект от "напасти"."""
@@ -160,14 +165,12 @@ class Enemy(BaseSprite):
             self.aura_effect.kill()
             self.aura_effect = None
 
-    def get_melee_target(self, defenders_group):
+    def get_melee_target(self, lane_index):
         """Ищет цель для атаки в ближнем бою (на той же линии)."""
-        if not defenders_group:
+        row = get_lane(self)
+        if lane_index is None or row is None:
             return None
-        for defender in defenders_group:
-            if defender.alive() and self.rect.colliderect(defender.rect) and defender.rect.centery == self.rect.centery:
-                return defender
-        return None
+        return lane_index.get_colliding_defender(row, self.rect)
 
     def perform_melee_attack(self, target):
         """Выполняет атаку на цель в ближнем бою."""
@@ -188,7 +191,7 @@ class Enemy(BaseSprite):
             self.current_target.is_being_eaten = True
             self.current_target.attacker = self
 
-        now = pygame.time.get_ticks()
+        now = get_ticks()
         if now - self.last_attack_time > self.attack_cooldown:
             self.last_attack_time = now
             self.sound_manager.play_sfx('eating')
@@ -196,7 +199,7 @@ class Enemy(BaseSprite):
 
     def update(self, **kwargs):
         """Обновляет состояние врага. Логика для базового врага (идти и атаковать)."""
-        defenders_group = kwargs.get('defenders_group')
+        lane_index = kwargs.get('lane_index')
 
         self.animate()
         self._layer = self.rect.bottom
@@ -212,11 +215,11 @@ class Enemy(BaseSprite):
             return
 
         # Обновление таймера замедления
-        if self.is_slowed and pygame.time.get_ticks() > self.slow_timer:
+        if self.is_slowed and get_ticks() > self.slow_timer:
             self.speed = self.original_speed
             self.is_slowed = False
 
-        target = self.get_melee_target(defenders_group)
+        target = self.get_melee_target(lane_index)
         if target:
             # Если есть цель, атакуем
             self.perform_melee_attack(target)
@@ -241,6 +244,7 @@ class Enemy(BaseSprite):
             if self.current_target:
                 self.current_target.is_being_eaten = False
             super().kill()
+            self.emit_event(ENEMY_DIED)
 
     def slow_down(self, factor, duration):
         """Применяет эффект замедления."""
@@ -248,14 +252,14 @@ class Enemy(BaseSprite):
             self.speed = self.original_speed * factor
             self.is_slowed = True
         # Обновляем таймер, даже если уже замедлен, чтобы продлить эффект
-        self.slow_timer = pygame.time.get_ticks() + duration
+        self.slow_timer = get_ticks() + duration
 
 
 class Calculus(Enemy):
     """Враг, атакующий на расстоянии."""
     def __init__(self, row, groups, enemy_type, sound_manager):
         super().__init__(row, groups, enemy_type, sound_manager)
-        self.last_shot = pygame.time.get_ticks()
+        self.last_shot = get_ticks()
 
     def update(self, **kwargs):
         # Базовая логика: анимация, проверка здоровья и замедления
@@ -266,27 +270,26 @@ class Calculus(Enemy):
             self.kill()
             return
 
-        if self.is_slowed and pygame.time.get_ticks() > self.slow_timer:
+        if self.is_slowed and get_ticks() > self.slow_timer:
             self.speed = self.original_speed
             self.is_slowed = False
 
-        defenders_group = kwargs.get('defenders_group')
+        lane_index = kwargs.get('lane_index')
         all_sprites = kwargs.get('all_sprites')
         projectiles = kwargs.get('projectiles')
 
         is_shooting = False
-        if defenders_group:
+        row = get_lane(self)
+        if lane_index and row is not None:
             # Проверяем, есть ли цель на линии впереди
-            is_shooting = any(
-                d.alive() and d.rect.centery == self.rect.centery and d.rect.right < self.rect.left
-                for d in defenders_group
-            ) and self.rect.right < SCREEN_WIDTH # Не стреляем, пока не вышли на экран
+            is_shooting = lane_index.get_nearest_defender_left(row, self.rect.left) is not None \
+                          and self.rect.right < SCREEN_WIDTH # Не стреляем, пока не вышли на экран
 
         self.is_attacking = is_shooting
 
         if is_shooting:
             # Если есть цель, останавливаемся и стреляем
-            now = pygame.time.get_ticks()
+            now = get_ticks()
             if now - self.last_shot > self.attack_cooldown:
                 self.last_shot = now
                 damage = self.damage * self.damage_multiplier
@@ -319,7 +322,7 @@ class MathTeacher(Enemy):
         self._layer = self.rect.bottom
         if self.health <= 0: self.kill(); return
 
-        if self.is_slowed and pygame.time.get_ticks() > self.slow_timer:
+        if self.is_slowed and get_ticks() > self.slow_timer:
             self.speed = self.original_speed
             self.is_slowed = False
 
@@ -328,15 +331,13 @@ class MathTeacher(Enemy):
             super().update(**kwargs)
             return
 
-        defenders_group = kwargs.get('defenders_group')
-
         if self.state == 'WALKING':
-            target = self.find_jump_target(defenders_group)
+            target = self.find_jump_target(kwargs.get('lane_index'))
             if target:
                 # Начинаем прыжок
                 self.state = 'JUMPING'
                 self.is_attacking = True
-                self.jump_timer = pygame.time.get_ticks()
+                self.jump_timer = get_ticks()
                 self.jump_start_pos = self.float_pos.copy()
                 target_x = target.rect.centerx - CELL_SIZE_W # Цель - за защитником
                 self.jump_target_pos = pygame.math.Vector2(target_x, self.original_y)
@@ -345,7 +346,7 @@ class MathTeacher(Enemy):
                 self.rect.centerx = int(self.float_pos.x)
 
         elif self.state == 'JUMPING':
-            elapsed_time = pygame.time.get_ticks() - self.jump_timer
+            elapsed_time = get_ticks() - self.jump_timer
             progress = min(1.0, elapsed_time / self.jump_duration)
 
             # Линейная интерполяция по X и синусоидальная по Y для параболической траектории
@@ -363,12 +364,9 @@ class MathTeacher(Enemy):
                 self.has_jumped = True
                 self.speed /= 2.0 # Скорость снижается после прыжка
 
-    def find_jump_target(self, defenders_group):
+    def find_jump_target(self, lane_index):
         """Находит первого защитника на линии для перепрыгивания."""
-        for defender in defenders_group:
-            if defender.alive() and self.rect.colliderect(defender.rect) and defender.rect.centery == self.rect.centery:
-                return defender
-        return None
+        return self.get_melee_target(lane_index)
 
 
 class Addict(Enemy):
@@ -378,45 +376,58 @@ class Addict(Enemy):
         self.state = 'SEEKING'
         self.target_defender = None
         self.victim = None
-        self.path = []  # Список кортежей (row, col) для пути
+        self.flow_field = None  # Общее поле направлений к клетке цели
+        self.next_node = None  # Клетка (row, col), к которой Наркоман идет сейчас
         self.path_recalculation_cooldown = 1000  # мс
         self.last_path_recalculation = 0
 
-    def find_strongest_defender(self, defenders_group):
-        living_defenders = [d for d in defenders_group if d.alive() and not isinstance(d, CoffeeMachine)]
+    def find_strongest_defender(self, heroes):
+        """Находит защитника с наибольшим уроном среди героев (кофемашины не в счет)."""
+        living_defenders = [d for d in heroes if d.alive()]
         if not living_defenders: return None
         return max(living_defenders, key=lambda d: d.get_final_damage(d.data.get('damage', 0)))
 
-    def _recalculate_path(self, grid_state):
-        """Пересчитывает путь до цели с помощью A*."""
-        self.last_path_recalculation = pygame.time.get_ticks()
-
-        # 1. Определяем начальные и конечные координаты в сетке
-        start_row = max(0, min(GRID_ROWS - 1, int((self.rect.centery - GRID_START_Y) / CELL_SIZE_H)))
-        start_col = max(0, min(GRID_COLS - 1, int((self.rect.centerx - GRID_START_X) / CELL_SIZE_W)))
-
-        end_row = max(0, min(GRID_ROWS - 1, int((self.target_defender.rect.centery - GRID_START_Y) / CELL_SIZE_H)))
-        end_col = max(0, min(GRID_COLS - 1, int((self.target_defender.rect.centerx - GRID_START_X) / CELL_SIZE_W)))
+    def _get_cell(self, sprite):
+        """Возвращает клетку сетки (row, col) под центром спрайта, прижатую к границам поля."""
+        row = max(0, min(GRID_ROWS - 1, int((sprite.rect.centery - GRID_START_Y) / CELL_SIZE_H)))
+        col = max(0, min(GRID_COLS - 1, int((sprite.rect.centerx - GRID_START_X) / CELL_SIZE_W)))
+        return row, col
 
-        # 2. Создаем КОПИЮ сетки, чтобы не изменять оригинал
-        grid_copy = [row[:] for row in grid_state]
-
-        # 3. <--- КЛЮЧЕВОЕ ИСПРАВЛЕНИЕ --->
-        # Делаем целевую клетку временно проходимой (значение 0)
-        grid_copy[end_row][end_col] = 0
-
-        # 4. Ищем путь по модифицированной сетке
-        self.path = find_path(grid_copy, (start_row, start_col), (end_row, end_col))
+    def _update_flow_field(self, occupancy_grid):
+        """
+        Берет общее поле направлений к клетке цели для текущей версии сетки занятости.
+        Поле строится один раз на всех Наркоманов, преследующих ту же клетку.
+        """
+        goal = self._get_cell(self.target_defender)
+        field = self.flow_field
+        if field is not None and field.goal == goal and field.version == occupancy_grid.version:
+            return
+        self.last_path_recalculation = get_ticks()
+        # Поле к той же цели чиним только в изменившихся клетках, а не строим заново
+        changed_cells = None
+        if field is not None and field.goal == goal:
+            changed_cells = occupancy_grid.get_changes_since(field.version)
+        self.flow_field = get_flow_field(occupancy_grid.cells, goal, occupancy_grid.version,
+                                         previous=field, changed_cells=changed_cells)
+
+        # Текущий шаг сохраняем, если из него цель все еще достижима, иначе начинаем со своей клетки
+        if self.next_node is None or self.flow_field.get_distance(self.next_node) is None:
+            start = self._get_cell(self)
+            if self.flow_field.get_distance(start) is not None:
+                self.next_node = start
+            else:
+                # Своя клетка занята или отрезана: шаг к достижимому соседу (или None)
+                self.next_node = self.flow_field.get_next_step(start)
 
     def update(self, **kwargs):
-        defenders_group = kwargs.get('defenders_group')
-        grid_state = kwargs.get('grid_state')
+        heroes = kwargs.get('heroes')
+        occupancy_grid = kwargs.get('occupancy_grid')
 
         self.animate()
         self._layer = self.rect.bottom
         if self.health <= 0: self.kill(); return
 
-        if self.is_slowed and pygame.time.get_ticks() > self.slow_timer:
+        if self.is_slowed and get_ticks() > self.slow_timer:
             self.speed = self.original_speed
             self.is_slowed = False
 
@@ -425,11 +436,11 @@ class Addict(Enemy):
         # --- НАЧАЛО ИЗМЕНЕННОЙ ЛОГИКИ ---
 
         # 1. Поиск и обновление цели
-        new_target = self.find_strongest_defender(defenders_group)
+        new_target = self.find_strongest_defender(heroes)
         # Если появилась новая, более сильная цель, или старая цель исчезла
         if new_target != self.target_defender:
             self.target_defender = new_target
-            self.path = []  # Сбрасываем старый путь, чтобы пересчитать его для новой цели
+            self.next_node = None  # Сбрасываем старый шаг, чтобы идти к новой цели от своей клетки
 
         # 2. Логика по состояниям
         if self.state == 'SEEKING':
@@ -442,16 +453,16 @@ class Addict(Enemy):
         elif self.state == 'CHASING':
             if not self.target_defender or not self.target_defender.alive():
                 self.state = 'SEEKING'
-                self.path = []
+                self.next_node = None
                 return
 
-            # Пересчитываем путь только если его нет
-            if not self.path and grid_state:
-                self._recalculate_path(grid_state)
+            # Обновляем поле направлений, если сменилась клетка цели или сетка занятости
+            if occupancy_grid is not None:
+                self._update_flow_field(occupancy_grid)
 
-            # Движение по пути
-            if self.path:
-                next_node_grid_pos = self.path[0]
+            # Движение по полю направлений
+            if self.next_node is not None:
+                next_node_grid_pos = self.next_node
                 target_pixel_pos = pygame.math.Vector2(
                     GRID_START_X + next_node_grid_pos[1] * CELL_SIZE_W + CELL_SIZE_W / 2,
                     GRID_START_Y + next_node_grid_pos[0] * CELL_SIZE_H + CELL_SIZE_H / 2
@@ -459,9 +470,9 @@ class Addict(Enemy):
                 direction = target_pixel_pos - self.float_pos
 
                 if direction.length() < self.speed * 1.5:
-                    self.path.pop(0)
+                    self.next_node = self.flow_field.get_next_step(self.next_node)
 
-                # Движемся, даже если только что убрали последний узел
+                # Движемся к достигнутой клетке, даже если следующий шаг уже выбран
                 if direction.length() > 0:
                     self.float_pos += direction.normalize() * self.speed
                     self.rect.center = (int(self.float_pos.x), int(self.float_pos.y))
@@ -479,6 +490,7 @@ class Addict(Enemy):
         elif self.state == 'GRABBING':
             if self.victim:
                 self.victim.rect.midright = self.rect.midright
+                self.victim.emit_event(DEFENDER_MOVED)
             self.state = 'ESCAPING'
 
         elif self.state == 'ESCAPING':
@@ -486,6 +498,7 @@ class Addict(Enemy):
             self.rect.centerx = int(self.float_pos.x)
             if self.victim:
                 self.victim.rect.midright = self.rect.midright
+                self.victim.emit_event(DEFENDER_MOVED)
             if self.rect.left > SCREEN_WIDTH:
                 if self.victim:
                     self.victim.kill()
@@ -506,6 +519,7 @@ class Addict(Enemy):
 
                 self.victim.rect.center = (new_x, new_y)
                 self.victim._layer = self.victim.rect.bottom
+                self.victim.emit_event(DEFENDER_MOVED)
         super().kill()
 
 
@@ -520,7 +534,7 @@ class Thief(Enemy):
         self.damage = ENEMIES_DATA['alarm_clock']['damage'] # Урон в ближнем бою как у базового врага
 
     def update(self, **kwargs):
-        defenders_group = kwargs.get('defenders_group')
+        coffee_machines = kwargs.get('coffee_machines')
 
         self.animate()
         self._layer = self.rect.bottom
@@ -528,7 +542,7 @@ class Thief(Enemy):
             self.kill()
             return
 
-        if self.is_slowed and pygame.time.get_ticks() > self.slow_timer:
+        if self.is_slowed and get_ticks() > self.slow_timer:
             self.speed = self.original_speed
             self.is_slowed = False
 
@@ -538,8 +552,8 @@ class Thief(Enemy):
 
         if self.state == 'PLANNING':
             # Составляем список всех Кофемашин
-            if defenders_group:
-                self.machine_targets = [d for d in defenders_group if isinstance(d, CoffeeMachine) and d.alive()]
+            if coffee_machines:
+                self.machine_targets = coffee_machines.sprites()
 
             if self.machine_targets:
                 self.machine_targets.sort(key=lambda m: self.float_pos.distance_to(m.rect.center))
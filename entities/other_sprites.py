@@ -3,8 +3,9 @@
 import pygame
 import os
 from data.settings import *
-from data.assets import load_image
+from data.assets import get_effect_image, load_animation_frames
 from entities.base_sprite import BaseSprite
+from core.clock import get_ticks
 
 
 class CoffeeBean(BaseSprite):
@@ -27,15 +28,15 @@ class CoffeeBean(BaseSprite):
         super().__init__(groups)
         self.value = value
         path_to_image = os.path.join('resources', 'coffee_bean.png')
-        self.image = load_image(path_to_image, DEFAULT_COLORS['coffee_bean'], (40, 40))
+        self.image = get_effect_image(path_to_image, DEFAULT_COLORS['coffee_bean'], (40, 40))
         self.rect = self.image.get_rect(center=(x, y))
         self._layer = self.rect.bottom + 1  # Рисуется поверх большинства спрайтов
-        self.spawn_time = pygame.time.get_ticks()
+        self.spawn_time = get_ticks()
         self.lifetime = COFFEE_BEAN_LIFETIME
 
     def update(self, *args, **kwargs):
         """Обновляет состояние зерна. Если время жизни истекло, уничтожает спрайт."""
-        if pygame.time.get_ticks() - self.spawn_time > self.lifetime:
+        if get_ticks() - self.spawn_time > self.lifetime:
             self.kill()
 
 
@@ -63,30 +64,15 @@ class AuraEffect(BaseSprite):
         self.image = self.animations[0] if self.animations else pygame.Surface((0, 0))
         self.rect = self.image.get_rect(center=self.parent.rect.center)
         self.anim_speed = AURA_ANIMATION_SPEED
-        self.last_anim_update = pygame.time.get_ticks()
+        self.last_anim_update = get_ticks()
         self._layer = self.parent._layer - 1  # Рисуется под своим родителем
         self.add(self.groups_tuple)
 
     def load_animations(self):
-        """Загружает анимированные кадры ауры."""
+        """Берет анимированные кадры ауры из общей библиотеки."""
         pixel_radius = self.radius * CELL_SIZE_W
         size = (pixel_radius * 2, pixel_radius * 2)
-        frame_index = 0
-
-        while True:
-            filename = f"aura_{frame_index}.png"
-            img_path = os.path.join('effects', 'activist_aura', filename)
-            try:
-                img = load_image(img_path, (0, 0, 0, 0), size, raise_on_error=True)
-                self.animations.append(img)
-                frame_index += 1
-            except (FileNotFoundError, pygame.error):
-                break
-
-        if not self.animations:
-            fallback_surface = pygame.Surface(size, pygame.SRCALPHA)
-            fallback_surface.fill((0, 0, 0, 0))
-            self.animations.append(fallback_surface)
+        self.animations = load_animation_frames('effects', 'activist_aura', 'aura', size)
 
     def update(self, *args, **kwargs):
         """Обновляет состояние ауры: следует за родителем и анимируется."""
@@ -99,20 +85,15 @@ class AuraEffect(BaseSprite):
             return
 
         # Анимация
-        now = pygame.time.get_ticks()
+        now = get_ticks()
         if now - self.last_anim_update > self.anim_speed * 1000:
             self.last_anim_update = now
             self.frame_index = (self.frame_index + 1) % len(self.animations)
             self.image = self.animations[self.frame_index]
 
-        # Синхронизация позиции и слоя с родителем
+        # Синхронизация позиции и слоя с родителем (порядок отрисовки пересчитает RenderQueue)
         self.rect.center = self.parent.rect.center
-        new_layer = self.parent._layer - 1
-        if self._layer != new_layer:
-            # Передобавление в группу для обновления слоя в LayeredUpdates
-            self.remove(self.groups_tuple)
-            self._layer = new_layer
-            self.add(self.groups_tuple)
+        self._layer = self.parent._layer - 1
 
 
 class CalamityAuraEffect(BaseSprite):
@@ -135,7 +116,7 @@ class CalamityAuraEffect(BaseSprite):
         self.groups_tuple = groups
         path = os.path.join('effects', f'{calamity_type}_aura.png')
         size = (CELL_SIZE_W + 10, CELL_SIZE_H + 20)
-        self.image = load_image(path, (0, 0, 0, 0), size)
+        self.image = get_effect_image(path, (0, 0, 0, 0), size)
         self.rect = self.image.get_rect(center=self.parent.rect.center)
         self._layer = self.parent._layer - 1  # Рисуется под родителем
         self.add(self.groups_tuple)
@@ -145,13 +126,9 @@ class CalamityAuraEffect(BaseSprite):
         if not self.parent.alive():
             self.kill()
             return
-        # Синхронизация позиции и слоя
+        # Синхронизация позиции и слоя (порядок отрисовки пересчитает RenderQueue)
         self.rect.center = self.parent.rect.center
-        new_layer = self.parent._layer - 1
-        if self._layer != new_layer:
-            self.remove(self.groups_tuple)
-            self._layer = new_layer
-            self.add(self.groups_tuple)
+        self._layer = self.parent._layer - 1
 
 
 class NeuroMower(BaseSprite):
@@ -174,20 +151,20 @@ class NeuroMower(BaseSprite):
         self.sound_manager = sound_manager
         self.mower_type = mower_type
         self.data = NEURO_MOWERS_DATA[mower_type]
-        self.image = load_image(f'systems/{mower_type}.png', DEFAULT_COLORS[mower_type],
-                                (CELL_SIZE_W - 20, CELL_SIZE_H - 20))
+        self.image = get_effect_image(f'systems/{mower_type}.png', DEFAULT_COLORS[mower_type],
+                                      (CELL_SIZE_W - 20, CELL_SIZE_H - 20))
         y = GRID_START_Y + row * CELL_SIZE_H + CELL_SIZE_H / 2
         # Размещается слева от игровой сетки
         self.rect = self.image.get_rect(center=(GRID_START_X - CELL_SIZE_W / 2, y))
         self.is_active = False
         self.speed = NEURO_MOWER_CHAT_GPT_SPEED
 
-    def activate(self, enemies_group, activator):
+    def activate(self, enemy_index, activator):
         """
         Активирует нейросеть. Логика зависит от типа.
 
         Args:
-            enemies_group (pygame.sprite.Group): Группа всех врагов на поле.
+            enemy_index (EnemyIndex): Индекс всех врагов на поле (core/enemy_index.py).
             activator (Enemy): Враг, который вызвал активацию.
         """
         if self.is_active: return
@@ -197,13 +174,12 @@ class NeuroMower(BaseSprite):
         # Нейросети с мгновенным эффектом
         if self.mower_type == 'deepseek':
             # Находит 3 самых близких к базе врагов и уничтожает их
-            targets = sorted(list(enemies_group), key=lambda e: e.rect.left)[:NEURO_MOWER_DEEPSEEK_TARGET_COUNT]
+            targets = enemy_index.get_leftmost_k(NEURO_MOWER_DEEPSEEK_TARGET_COUNT)
             for enemy in targets:
                 enemy.kill()
         elif self.mower_type == 'gemini':
             # Находит 4 самых "жирных" врагов и уничтожает их
-            targets = sorted(list(enemies_group), key=lambda e: e.health, reverse=True)[
-                      :NEURO_MOWER_GEMINI_TARGET_COUNT]
+            targets = enemy_index.get_strongest_k(NEURO_MOWER_GEMINI_TARGET_COUNT)
             for enemy in targets:
                 enemy.kill()
 
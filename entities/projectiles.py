@@ -2,8 +2,9 @@
 
 import pygame
 from data.settings import *
-from data.assets import load_image
+from data.assets import get_effect_image
 from entities.base_sprite import BaseSprite
+from core.clock import get_ticks
 
 
 class Bracket(BaseSprite):
@@ -54,7 +55,7 @@ class PaintSplat(Bracket):
             damage (int): Урон.
             artist (Artist): Ссылка на спрайт Художницы, создавшей кляксу.
         """
-        splat_image = load_image('projectiles/paint_splat.png', DEFAULT_COLORS['paint_splat'], (30, 30))
+        splat_image = get_effect_image('projectiles/paint_splat.png', DEFAULT_COLORS['paint_splat'], (30, 30))
         super().__init__(x, y, groups, damage, splat_image)
         self.artist = artist
 
@@ -78,20 +79,20 @@ class SoundWave(BaseSprite):
         """
         super().__init__(groups)
         self.damage = damage
-        self.image = load_image('projectiles/sound_wave.png', DEFAULT_COLORS['sound_wave'], (40, CELL_SIZE_H - 10))
+        self.image = get_effect_image('projectiles/sound_wave.png', DEFAULT_COLORS['sound_wave'], (40, CELL_SIZE_H - 10))
         self.rect = self.image.get_rect(center=center)
         self.row_y = row_y
         self.speed = speed
         # Множество для хранения врагов, которым уже был нанесен урон,
         # чтобы избежать повторного урона за один "пролет".
         self.hit_enemies = set()
-        self.spawn_time = pygame.time.get_ticks()
+        self.spawn_time = get_ticks()
         self.lifetime = SOUNDWAVE_LIFETIME
 
     def update(self, **kwargs):
         """Двигает волну и уничтожает ее по истечении времени жизни или за экраном."""
         self.rect.x += self.speed
-        if pygame.time.get_ticks() - self.spawn_time > self.lifetime or self.rect.left > SCREEN_WIDTH:
+        if get_ticks() - self.spawn_time > self.lifetime or self.rect.left > SCREEN_WIDTH:
             self.kill()
 
 
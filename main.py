@@ -2,11 +2,46 @@
 
 import sys
 import os
+import argparse
+from contextlib import nullcontext
 
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
-from core.game_manager import Game
+
+def parse_args():
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(description="Студенты против Злоключений")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="замерить время запуска по фазам и импортам и выйти после первого кадра")
+    parser.add_argument('--startup-budget', type=float, metavar='MS',
+                        help="бюджет времени до первого кадра; при превышении код выхода 1")
+    parser.add_argument('--profile-output', metavar='PATH',
+                        help="сохранить отчет профилирования в JSON-файл")
+    return parser.parse_args()
+
 
 if __name__ == '__main__':
-    game = Game()
-    game.run()
\ No newline at end of file
+    args = parse_args()
+
+    profiler = None
+    if args.profile_startup:
+        # Профилировщик подключается до импорта игры, чтобы замерить и импорты
+        from core.startup_profiler import StartupProfiler
+        profiler = StartupProfiler(args.startup_budget, args.profile_output)
+        profiler.install_import_hook()
+
+    with profiler.phase('imports') if profiler else nullcontext():
+        from core.game_manager import Game
+
+    if profiler:
+        import pygame
+        profiler.time_calls(pygame.font, 'SysFont', 'pygame.font.SysFont')
+        profiler.time_calls(pygame.image, 'load', 'pygame.image.load')
+        profiler.time_calls(pygame.transform, 'scale', 'pygame.transform.scale')
+        profiler.time_calls(pygame.mixer, 'Sound', 'pygame.mixer.Sound')
+
+    game = Game(profiler)
+    game.run()
+
+    if profiler:
+        sys.exit(profiler.finish())
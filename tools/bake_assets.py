@@ -0,0 +1,71 @@
+# tools/bake_assets.py
+
+# Заполняет кэш подготовленных изображений (BAKED_IMAGES_DIR) и звуков (SOUND_CACHE_DIR).
+#
+# Загружает все ресурсы игры и все анимации юнитов в тех размерах, которые
+# используются в бою. Каждое масштабированное изображение сохраняется в кэш
+# под ключом (хэш исходника, размер), поэтому следующий запуск игры читает
+# готовые пиксели вместо декодирования PNG и масштабирования. Звуки сохраняются
+# декодированными в формате микшера из настроек AUDIO_*.
+#
+# Кэш не обязателен: при промахе игра сама загружает исходник и дописывает кэш.
+# Перед сборкой старые файлы удаляются, чтобы не копить устаревшие варианты.
+#
+# Запуск из корня проекта:
+#     python tools/bake_assets.py
+
+import os
+import sys
+import shutil
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+os.chdir(PROJECT_ROOT)  # resource_path ищет ассеты относительно текущей папки
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+from data.settings import *
+from data.assets import load_all_resources, load_animation_frames, get_unit_animation_keys, get_radius_variants, \
+    save_source_hash_index
+
+
+def bake_unit_animations(units_data, default_category, size):
+    """Загружает (и тем самым кэширует) все анимации из словаря данных юнитов."""
+    for unit_type, data in units_data.items():
+        for key in get_unit_animation_keys(unit_type, data, default_category, size):
+            load_animation_frames(*key)
+
+
+def main():
+    baked_dir = os.path.join(PROJECT_ROOT, BAKED_IMAGES_DIR)
+    for cache_dir in (baked_dir, os.path.join(PROJECT_ROOT, SOUND_CACHE_DIR)):
+        if os.path.isdir(cache_dir):
+            shutil.rmtree(cache_dir)
+
+    # Формат микшера входит в ключ кэша звуков, поэтому он должен совпадать с игрой
+    pygame.mixer.pre_init(AUDIO_FREQUENCY, AUDIO_SIZE, AUDIO_CHANNELS, AUDIO_BUFFER)
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+
+    load_all_resources()
+    bake_unit_animations(DEFENDERS_DATA, 'defenders', DEFENDER_SPRITE_SIZE)
+    bake_unit_animations(ENEMIES_DATA, 'enemies', ENEMY_SPRITE_SIZE)
+
+    # Аура активиста зависит от радиуса, включая улучшенный вариант
+    for radius in get_radius_variants('activist'):
+        diameter = radius * 2 * CELL_SIZE_W
+        load_animation_frames('effects', 'activist_aura', 'aura', (diameter, diameter))
+    save_source_hash_index()
+
+    files = os.listdir(baked_dir) if os.path.isdir(baked_dir) else []
+    total_bytes = sum(os.path.getsize(os.path.join(baked_dir, name)) for name in files)
+    print(f"Baked {len(files)} images ({total_bytes / 1024 / 1024:.1f} MB) into '{BAKED_IMAGES_DIR}'")
+    sound_dir = os.path.join(PROJECT_ROOT, SOUND_CACHE_DIR)
+    sound_files = os.listdir(sound_dir) if os.path.isdir(sound_dir) else []
+    print(f"Decoded {len(sound_files)} sounds into '{SOUND_CACHE_DIR}'")
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
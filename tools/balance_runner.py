@@ -0,0 +1,378 @@
+# tools/balance_runner.py
+
+# Пакетная проверка баланса уровня методом Монте-Карло.
+#
+# Проигрывает уровень много раз с разными зернами случайности в безголовой
+# симуляции (core.simulation.HeadlessBattle) на пуле процессов и сводит итог:
+# процент побед, ряды прорыва, время прохождения, использованные нейросети
+# и убийства по типам врагов. Бои независимы, поэтому время работы падает
+# почти пропорционально числу ядер.
+#
+# Запуск из корня проекта:
+#     python tools/balance_runner.py --level 1 --team programmer,coffee_machine,botanist \
+#         --upgrades programmer:damage+cooldown --mowers 2:chat_gpt --strategy economy \
+#         --runs 2000 --json balance.json --csv balance.csv
+
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import statistics
+import multiprocessing
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+os.chdir(PROJECT_ROOT)  # resource_path ищет ассеты относительно текущей папки
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from data.settings import *
+from data.levels import LEVELS
+from core.simulation import HeadlessBattle, SIMULATION_MAX_TIME_MS, init_headless_pygame
+
+ECONOMY_TYPES = ('coffee_machine',)  # Защитники, которые производят кофе, а не сражаются
+ERROR_PRINT_LIMIT = 5  # Сколько упавших боев перечислять в консоли (полный список - в JSON)
+
+
+# --- Стратегии расстановки ---
+# Стратегия - функция strategy(team) -> on_step(battle), которая возвращает
+# обработчик, вызываемый перед каждым шагом боя. Обработчик сам решает,
+# кого и куда поставить, и может хранить состояние в замыкании.
+
+def _get_enemy_row(enemy):
+    """Возвращает ряд сетки, в котором находится враг."""
+    return int((enemy.rect.centery - GRID_START_Y) // CELL_SIZE_H)
+
+
+def _split_team(team):
+    """Разделяет команду на экономических и боевых защитников."""
+    economy = [d_type for d_type in team if d_type in ECONOMY_TYPES]
+    fighters = [d_type for d_type in team if d_type not in ECONOMY_TYPES]
+    return economy, fighters
+
+
+def _place_by_plan(plan):
+    """
+    Возвращает обработчик, размещающий защитников строго по списку (тип, колонка, ряд).
+    Следующий пункт ставится, как только на него хватает кофе; занятые ячейки пропускаются.
+    """
+    position = [0]
+
+    def on_step(battle):
+        while position[0] < len(plan):
+            defender_type, col, row = plan[position[0]]
+            if battle.coffee < DEFENDERS_DATA[defender_type]['cost']:
+                return
+            battle.place(defender_type, col, row)
+            position[0] += 1
+
+    return on_step
+
+
+def economy_strategy(team):
+    """Сначала кофемашины в первой колонке, затем боевые защитники колонками слева направо."""
+    economy, fighters = _split_team(team)
+    plan = [(economy[0], 0, row) for row in range(GRID_ROWS)] if economy else []
+    fighters = fighters or economy
+    first_col = 1 if economy else 0
+    for col in range(first_col, GRID_COLS):
+        for row in range(GRID_ROWS):
+            plan.append((fighters[(col + row) % len(fighters)], col, row))
+    return _place_by_plan(plan)
+
+
+def rush_strategy(team):
+    """Сначала по одному боевому защитнику в каждый ряд, затем кофемашины и остальные колонки."""
+    economy, fighters = _split_team(team)
+    fighters = fighters or economy
+    plan = [(fighters[row % len(fighters)], 1, row) for row in range(GRID_ROWS)]
+    if economy:
+        plan += [(economy[0], 0, row) for row in range(GRID_ROWS)]
+    for col in range(2, GRID_COLS):
+        for row in range(GRID_ROWS):
+            plan.append((fighters[(col + row) % len(fighters)], col, row))
+    return _place_by_plan(plan)
+
+
+def reactive_strategy(team):
+    """
+    Ставит боевых защитников в ряды с самым продвинувшимся врагом, а в спокойное
+    время строит кофемашины. Ближе к правому краю защитник ставится только
+    после того, как заполнены колонки левее.
+    """
+    economy, fighters = _split_team(team)
+    fighters = fighters or economy
+    economy_rows = list(range(GRID_ROWS)) if economy else []
+    next_col = [0 if not economy else 1] * GRID_ROWS
+    counter = [0]
+
+    def on_step(battle):
+        threatened = sorted(battle.enemies, key=lambda enemy: enemy.rect.x)
+        for enemy in threatened:
+            row = _get_enemy_row(enemy)
+            if not (0 <= row < GRID_ROWS) or next_col[row] >= GRID_COLS:
+                continue
+            defender_type = fighters[counter[0] % len(fighters)]
+            if battle.coffee < DEFENDERS_DATA[defender_type]['cost']:
+                return
+            if battle.place(defender_type, next_col[row], row):
+                counter[0] += 1
+            next_col[row] += 1
+            return
+        if economy_rows and battle.coffee >= DEFENDERS_DATA[economy[0]]['cost']:
+            battle.place(economy[0], 0, economy_rows.pop(0))
+
+    return on_step
+
+
+STRATEGIES = {
+    'economy': economy_strategy,
+    'rush': rush_strategy,
+    'reactive': reactive_strategy,
+}
+
+
+# --- Выполнение боев в процессах пула ---
+
+def _init_worker():
+    """Инициализирует pygame и ресурсы один раз на процесс и глушит служебный вывод загрузчиков."""
+    sys.stdout = open(os.devnull, 'w')
+    init_headless_pygame()
+
+
+def run_battle(config, seed):
+    """
+    Проигрывает один бой.
+
+    Args:
+        config (dict): Параметры прогона (см. build_config).
+        seed (int): Зерно случайности боя.
+
+    Returns:
+        dict: Результат HeadlessBattle.get_result(). Если бой упал с исключением,
+              возвращается запись {'outcome': 'error', 'seed': ..., 'error': ...},
+              чтобы один сбойный бой не обрывал весь прогон.
+    """
+    try:
+        battle = HeadlessBattle(config['level_id'], config['team'], upgrades=config['upgrades'],
+                                placed_mowers=config['mowers'], seed=seed)
+        on_step = STRATEGIES[config['strategy']](config['team'])
+        return battle.run(on_step=on_step, max_time_ms=config['max_time_ms'])
+    except Exception as exc:
+        return {'outcome': 'error', 'seed': seed, 'error': repr(exc)}
+
+
+def _run_battle_task(task):
+    """Обертка для Pool.imap_unordered (принимает один аргумент)."""
+    return run_battle(*task)
+
+
+def run_batch(config, seeds, workers):
+    """
+    Проигрывает бои для всех зерен на пуле из workers процессов.
+
+    Returns:
+        list: Результаты боев, отсортированные по зерну.
+    """
+    tasks = [(config, seed) for seed in seeds]
+    if workers <= 1:
+        init_headless_pygame()
+        results = [_run_battle_task(task) for task in tasks]
+    else:
+        # Крупные порции снижают накладные расходы на передачу задач между процессами
+        chunksize = max(1, len(tasks) // (workers * 8))
+        with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+            results = list(pool.imap_unordered(_run_battle_task, tasks, chunksize=chunksize))
+    return sorted(results, key=lambda result: result['seed'])
+
+
+# --- Сводка ---
+
+def _percentile(sorted_values, fraction):
+    """Возвращает перцентиль отсортированного списка (ближайший ранг)."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(config, results):
+    """
+    Сводит результаты боев в словарь для JSON-отчета.
+
+    Упавшие бои (outcome 'error') остаются в знаменателе доли побед (как непобеды),
+    а их доля выводится рядом с ней в error_rate и перечисляется в errors. Статистика
+    самого боя (прорывы, убийства, время) считается по завершившимся боям (completed_runs).
+    """
+    outcomes = {'victory': 0, 'defeat': 0, 'timeout': 0, 'error': 0}
+    breach_rows = {}
+    mowers_used = {}
+    kills_total = {}
+    clear_times = []
+    errors = []
+    for result in results:
+        outcomes[result['outcome']] += 1
+        if result['outcome'] == 'error':
+            errors.append({'seed': result['seed'], 'error': result['error']})
+            continue
+        if result['breach_row'] is not None:
+            breach_rows[result['breach_row']] = breach_rows.get(result['breach_row'], 0) + 1
+        for row in result['mowers_used']:
+            mowers_used[row] = mowers_used.get(row, 0) + 1
+        for enemy_type, count in result['kills_by_type'].items():
+            kills_total[enemy_type] = kills_total.get(enemy_type, 0) + count
+        if result['outcome'] == 'victory':
+            clear_times.append(result['time_ms'] / 1000)
+
+    # Сколько врагов каждого типа есть на уровне - для доли убитых
+    level_enemies = {}
+    for enemy_type, _ in LEVELS[config['level_id']]['enemies']:
+        level_enemies[enemy_type] = level_enemies.get(enemy_type, 0) + 1
+
+    runs = len(results)
+    completed_runs = runs - len(errors)
+    clear_times.sort()
+    return {
+        'config': config,
+        'runs': runs,
+        'completed_runs': completed_runs,
+        'win_rate': outcomes['victory'] / runs if runs else 0.0,
+        'error_rate': len(errors) / runs if runs else 0.0,
+        'errors': errors,
+        'outcomes': outcomes,
+        'breach_rows': {str(row): count for row, count in sorted(breach_rows.items())},
+        'mowers_used': {str(row): count for row, count in sorted(mowers_used.items())},
+        'time_to_clear_s': {
+            'mean': statistics.mean(clear_times) if clear_times else None,
+            'median': statistics.median(clear_times) if clear_times else None,
+            'p10': _percentile(clear_times, 0.1),
+            'p90': _percentile(clear_times, 0.9),
+        },
+        'kills_by_type': {
+            enemy_type: {
+                'mean_per_run': kills_total.get(enemy_type, 0) / completed_runs if completed_runs else 0.0,
+                'kill_rate': kills_total.get(enemy_type, 0) / (count * completed_runs) if completed_runs else 0.0,
+            }
+            for enemy_type, count in sorted(level_enemies.items())
+        },
+    }
+
+
+def write_csv(path, results, enemy_types):
+    """Сохраняет результаты отдельных боев в CSV (по строке на бой)."""
+    fields = ['seed', 'outcome', 'time_ms', 'killed', 'total_enemies', 'breach_row', 'mowers_used',
+              'defenders_alive', 'coffee'] + [f'kills_{enemy_type}' for enemy_type in enemy_types] + ['error']
+    with open(path, 'w', newline='', encoding='utf-8') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(fields)
+        for result in results:
+            if result['outcome'] == 'error':
+                # У упавшего боя есть только зерно и текст исключения
+                writer.writerow([result['seed'], result['outcome']] + [''] * (len(fields) - 3) + [result['error']])
+                continue
+            writer.writerow([result['seed'], result['outcome'], round(result['time_ms']), result['killed'],
+                             result['total_enemies'], '' if result['breach_row'] is None else result['breach_row'],
+                             ' '.join(map(str, result['mowers_used'])), result['defenders_alive'], result['coffee']]
+                            + [result['kills_by_type'].get(enemy_type, 0) for enemy_type in enemy_types] + [''])
+
+
+# --- Командная строка ---
+
+def parse_upgrades(spec):
+    """Разбирает строку вида 'programmer:damage+cooldown,botanist:radius' в словарь улучшений."""
+    upgrades = {}
+    for item in filter(None, spec.split(',')):
+        defender_type, stats = item.split(':')
+        for stat_name in stats.split('+'):
+            if stat_name not in DEFENDERS_DATA[defender_type]['upgrades']:
+                raise ValueError(f"Unknown upgrade '{stat_name}' for '{defender_type}'")
+        upgrades[defender_type] = stats.split('+')
+    return upgrades
+
+
+def parse_mowers(spec):
+    """Разбирает строку вида '0:chat_gpt,2:deepseek' в словарь {ряд: тип_нейросети}."""
+    mowers = {}
+    for item in filter(None, spec.split(',')):
+        row, mower_type = item.split(':')
+        if mower_type not in NEURO_MOWERS_DATA:
+            raise ValueError(f"Unknown neuro mower '{mower_type}'")
+        mowers[int(row)] = mower_type
+    return mowers
+
+
+def build_config(args):
+    """Собирает параметры прогона из аргументов командной строки с проверкой."""
+    if args.level not in LEVELS:
+        raise ValueError(f"Unknown level {args.level}")
+    team = [d_type for d_type in args.team.split(',') if d_type]
+    for defender_type in team:
+        if defender_type not in DEFENDERS_DATA:
+            raise ValueError(f"Unknown defender '{defender_type}'")
+    return {
+        'level_id': args.level,
+        'team': team,
+        'upgrades': parse_upgrades(args.upgrades),
+        'mowers': parse_mowers(args.mowers),
+        'strategy': args.strategy,
+        'max_time_ms': args.max_time * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte-Carlo balance runner for a single level.")
+    parser.add_argument('--level', type=int, required=True, help="level id from data/levels.py")
+    parser.add_argument('--team', required=True, help="comma-separated defender types")
+    parser.add_argument('--upgrades', default='', help="e.g. programmer:damage+cooldown,botanist:radius")
+    parser.add_argument('--mowers', default='', help="neuro mowers by row, e.g. 0:chat_gpt,2:deepseek")
+    parser.add_argument('--strategy', choices=sorted(STRATEGIES), default='economy')
+    parser.add_argument('--runs', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0, help="first seed; battles use seed..seed+runs-1")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--max-time', type=float, default=SIMULATION_MAX_TIME_MS / 1000,
+                        help="battle time limit in seconds (then the outcome is 'timeout')")
+    parser.add_argument('--json', help="write the summary to this JSON file")
+    parser.add_argument('--csv', help="write per-battle results to this CSV file")
+    args = parser.parse_args()
+
+    try:
+        config = build_config(args)
+    except (ValueError, KeyError) as error:
+        parser.error(str(error))
+
+    start = time.perf_counter()
+    results = run_batch(config, range(args.seed, args.seed + args.runs), args.workers)
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(config, results)
+    summary['workers'] = args.workers
+    summary['elapsed_s'] = elapsed
+    summary['battles_per_s'] = len(results) / elapsed if elapsed else None
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as json_file:
+            json.dump(summary, json_file, indent=1, ensure_ascii=False)
+    if args.csv:
+        write_csv(args.csv, results, list(summary['kills_by_type']))
+
+    print(f"Level {config['level_id']}, strategy '{config['strategy']}': {summary['runs']} battles "
+          f"in {elapsed:.1f} s on {args.workers} workers ({summary['battles_per_s']:.1f} battles/s)")
+    print(f"  win rate {summary['win_rate'] * 100:.1f}%  errors {len(summary['errors'])} "
+          f"({summary['error_rate'] * 100:.1f}%)  outcomes {summary['outcomes']}")
+    for error in summary['errors'][:ERROR_PRINT_LIMIT]:
+        print(f"  seed {error['seed']} failed: {error['error']}")
+    if len(summary['errors']) > ERROR_PRINT_LIMIT:
+        print(f"  ... and {len(summary['errors']) - ERROR_PRINT_LIMIT} more failed battles (see the JSON report)")
+    print(f"  breach rows {summary['breach_rows']}  mowers used {summary['mowers_used']}")
+    clear = summary['time_to_clear_s']
+    if clear['mean'] is not None:
+        print(f"  time to clear: mean {clear['mean']:.1f} s, median {clear['median']:.1f} s, "
+              f"p10 {clear['p10']:.1f} s, p90 {clear['p90']:.1f} s")
+    for enemy_type, stats in summary['kills_by_type'].items():
+        print(f"  {enemy_type:<14} killed {stats['kill_rate'] * 100:5.1f}%  ({stats['mean_per_run']:.2f} per battle)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+# tools/build_asset_manifest.py
+
+# Генератор манифеста ассетов (ASSET_MANIFEST_FILE).
+#
+# Манифест перечисляет все файлы в `assets` с размером в байтах, хэшем SHA-1 и,
+# для изображений, размером в пикселях, а также число кадров каждой анимации
+# (`{категория}/{папка}/{тип_анимации}`). Загрузчики читают его один раз при
+# запуске вместо перебора файлов на диске, а проверка при запуске сообщает
+# о файлах, которые пропали или не внесены в манифест.
+#
+# Запуск из корня проекта (повторять после добавления или изменения ассетов):
+#     python tools/build_asset_manifest.py
+
+import os
+import re
+import sys
+import json
+import hashlib
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+os.chdir(PROJECT_ROOT)  # resource_path ищет ассеты относительно текущей папки
+
+import pygame
+from data.configs.game import ASSETS_DIR, IMAGES_DIR, ASSET_MANIFEST_FILE
+from data.assets import list_asset_files
+
+# Кадр анимации: `{тип_анимации}_{номер}.png`
+FRAME_PATTERN = re.compile(r'^(?P<anim_type>.+)_(?P<index>\d+)\.png$')
+
+
+def describe_file(path):
+    """Возвращает запись манифеста для одного файла (путь относительно ASSETS_DIR)."""
+    full_path = os.path.join(PROJECT_ROOT, ASSETS_DIR, path)
+    with open(full_path, 'rb') as asset_file:
+        content = asset_file.read()
+    entry = {'bytes': len(content), 'sha1': hashlib.sha1(content).hexdigest()}
+    if path.lower().endswith('.png'):
+        entry['image_size'] = list(pygame.image.load(full_path).get_size())
+    return entry
+
+
+def count_animation_frames(paths):
+    """
+    Считает кадры каждой анимации так же, как это делал перебор в load_animation_frames:
+    кадры нумеруются с нуля, первый пропущенный номер завершает последовательность.
+
+    Returns:
+        dict: Словарь {'категория/папка/тип_анимации': число_кадров}.
+    """
+    images_prefix = os.path.relpath(IMAGES_DIR, ASSETS_DIR).replace(os.sep, '/') + '/'
+    frame_indices = {}
+    for path in paths:
+        if not path.startswith(images_prefix):
+            continue
+        folder, filename = os.path.split(path[len(images_prefix):])
+        match = FRAME_PATTERN.match(filename)
+        if folder and match:
+            key = f"{folder}/{match.group('anim_type')}"
+            frame_indices.setdefault(key, set()).add(int(match.group('index')))
+
+    animations = {}
+    for key, indices in frame_indices.items():
+        count = 0
+        while count in indices:
+            count += 1
+        if count:
+            animations[key] = count
+    return animations
+
+
+def main():
+    pygame.init()
+    paths = list_asset_files()
+    manifest = {
+        'version': 1,
+        'files': {path: describe_file(path) for path in paths},
+        'animations': count_animation_frames(paths),
+    }
+
+    with open(os.path.join(PROJECT_ROOT, ASSET_MANIFEST_FILE), 'w', encoding='utf-8') as manifest_file:
+        json.dump(manifest, manifest_file, indent=1, sort_keys=True, ensure_ascii=False)
+        manifest_file.write('\n')
+
+    print(f"Asset manifest: {len(manifest['files'])} files, {len(manifest['animations'])} animations "
+          f"-> '{ASSET_MANIFEST_FILE}'")
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
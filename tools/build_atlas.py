@@ -0,0 +1,145 @@
+# tools/build_atlas.py
+
+# Офлайн-сборщик текстурных атласов.
+#
+# Упаковывает все PNG из каждой категории `assets/images/<категория>` в несколько
+# больших листов и записывает манифест с прямоугольниками изображений на листах.
+# Во время игры load_image берет изображения из атласа в виде подповерхностей,
+# поэтому при запуске декодируется несколько листов вместо сотен отдельных файлов.
+#
+# Запуск из корня проекта (повторять после изменения изображений):
+#     python tools/build_atlas.py
+
+import os
+import sys
+import json
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+import pygame
+from data.configs.game import IMAGES_DIR, ATLAS_DIR, ATLAS_MANIFEST_FILE, ATLAS_CATEGORIES, ATLAS_MAX_SHEET_SIZE, \
+    ATLAS_PADDING
+
+
+def collect_images(category):
+    """
+    Находит все PNG-файлы категории.
+
+    Returns:
+        list[str]: Пути к файлам относительно IMAGES_DIR (с разделителем '/').
+    """
+    category_dir = os.path.join(PROJECT_ROOT, IMAGES_DIR, category)
+    paths = []
+    for root, _, files in os.walk(category_dir):
+        for filename in files:
+            if filename.lower().endswith('.png'):
+                full_path = os.path.join(root, filename)
+                paths.append(os.path.relpath(full_path, os.path.join(PROJECT_ROOT, IMAGES_DIR)).replace(os.sep, '/'))
+    return sorted(paths)
+
+
+def pack_shelves(sizes, max_size, padding):
+    """
+    Раскладывает прямоугольники по листам алгоритмом "полок".
+
+    Изображения сортируются по убыванию высоты и ставятся слева направо;
+    когда ряд заполнен, начинается новая полка, когда заполнен лист - новый лист.
+
+    Args:
+        sizes (dict): Словарь {ключ: (ширина, высота)}.
+        max_size (int): Максимальная ширина и высота листа.
+        padding (int): Отступ между изображениями.
+
+    Returns:
+        tuple: (placements, sheet_sizes), где placements - словарь
+               {ключ: (номер_листа, x, y)}, а sheet_sizes - список (ширина, высота) листов.
+    """
+    order = sorted(sizes, key=lambda key: (-sizes[key][1], -sizes[key][0], key))
+    placements = {}
+    sheet_sizes = []
+    sheet_index = -1
+    x = y = shelf_height = used_width = max_size  # Принудительно открываем первый лист
+
+    for key in order:
+        width, height = sizes[key]
+        if width > max_size or height > max_size:
+            raise ValueError(f"Image '{key}' ({width}x{height}) does not fit into a {max_size}px atlas sheet")
+
+        if x + width > max_size:
+            # Новая полка на текущем листе
+            x, y = 0, y + shelf_height + padding
+            shelf_height = 0
+        if y + height > max_size:
+            # Новый лист
+            if sheet_index >= 0:
+                sheet_sizes[sheet_index] = (used_width, y - padding)
+            sheet_index += 1
+            sheet_sizes.append((0, 0))
+            x = y = shelf_height = used_width = 0
+
+        placements[key] = (sheet_index, x, y)
+        x += width + padding
+        used_width = max(used_width, x - padding)
+        shelf_height = max(shelf_height, height)
+
+    if sheet_index >= 0:
+        sheet_sizes[sheet_index] = (used_width, y + shelf_height)
+    return placements, sheet_sizes
+
+
+def build_category(category, output_dir, manifest):
+    """Собирает листы атласа для одной категории и дополняет манифест."""
+    paths = collect_images(category)
+    if not paths:
+        return 0
+
+    images_root = os.path.join(PROJECT_ROOT, IMAGES_DIR)
+    images = {path: pygame.image.load(os.path.join(images_root, path)) for path in paths}
+    sizes = {path: image.get_size() for path, image in images.items()}
+    placements, sheet_sizes = pack_shelves(sizes, ATLAS_MAX_SHEET_SIZE, ATLAS_PADDING)
+
+    sheets = [pygame.Surface(size, pygame.SRCALPHA) for size in sheet_sizes]
+    for sheet in sheets:
+        sheet.fill((0, 0, 0, 0))
+
+    for path, (sheet_index, x, y) in placements.items():
+        sheets[sheet_index].blit(images[path], (x, y))
+        width, height = sizes[path]
+        manifest['sprites'][path] = {
+            'sheet': f'{category}_{sheet_index}.png',
+            'rect': [x, y, width, height],
+            'mtime': os.path.getmtime(os.path.join(images_root, path)),
+        }
+
+    for sheet_index, sheet in enumerate(sheets):
+        sheet_name = f'{category}_{sheet_index}.png'
+        pygame.image.save(sheet, os.path.join(output_dir, sheet_name))
+        manifest['sheets'][sheet_name] = list(sheet.get_size())
+
+    print(f"{category}: {len(paths)} images -> {len(sheets)} sheet(s)")
+    return len(sheets)
+
+
+def main():
+    pygame.init()
+    output_dir = os.path.join(PROJECT_ROOT, ATLAS_DIR)
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Удаляем листы от предыдущей сборки, чтобы не оставлять устаревшие файлы
+    for filename in os.listdir(output_dir):
+        if filename.endswith('.png'):
+            os.remove(os.path.join(output_dir, filename))
+
+    manifest = {'version': 1, 'sheets': {}, 'sprites': {}}
+    total_sheets = sum(build_category(category, output_dir, manifest) for category in ATLAS_CATEGORIES)
+
+    with open(os.path.join(output_dir, ATLAS_MANIFEST_FILE), 'w', encoding='utf-8') as manifest_file:
+        json.dump(manifest, manifest_file, indent=1, sort_keys=True)
+
+    print(f"Atlas: {len(manifest['sprites'])} images packed into {total_sheets} sheets in '{ATLAS_DIR}'")
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
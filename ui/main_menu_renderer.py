@@ -3,7 +3,7 @@
 import pygame
 from data.settings import *
 from data.levels import LEVELS
-from data.assets import UI_IMAGES
+from data.assets import UI_IMAGES, get_loading_progress
 from ui.base_component import BaseUIComponent
 
 
@@ -59,6 +59,8 @@ class MainMenuRenderer(BaseUIComponent):
 
             self._draw_button(surface, name, rect, button_color, WHITE, self.fonts['default'])
 
+        self._draw_loading_bar(surface)
+
     def draw_main_menu(self, surface, max_level_unlocked):
         """
         Отрисовывает главное меню с панелью выбора уровней и кнопками управления.
@@ -84,9 +86,31 @@ class MainMenuRenderer(BaseUIComponent):
         # Отрисовка и получение Rect'ов для кнопок
         level_buttons = self._draw_level_buttons(surface, panel_rect, max_level_unlocked)
         control_buttons = self._draw_control_buttons(surface)
+        self._draw_loading_bar(surface)
 
         return level_buttons, control_buttons
 
+    def _draw_loading_bar(self, surface):
+        """
+        Отрисовывает полосу фоновой загрузки ресурсов внизу экрана.
+        После завершения загрузки ничего не рисует.
+        """
+        progress = get_loading_progress()
+        if progress >= 1.0:
+            return
+
+        bar_rect = pygame.Rect((0, 0), LOADING_BAR_SIZE)
+        bar_rect.center = (SCREEN_WIDTH / 2, SCREEN_HEIGHT - LOADING_BAR_BOTTOM_OFFSET)
+        progress_rect = pygame.Rect(bar_rect.x, bar_rect.y, bar_rect.width * progress, bar_rect.height)
+
+        pygame.draw.rect(surface, GREY, bar_rect, border_radius=5)
+        pygame.draw.rect(surface, PROGRESS_BLUE, progress_rect, border_radius=5)
+
+        text_surf = self.fonts['tiny'].render(f"Загрузка: {int(progress * 100)}%", True, WHITE)
+        surface.blit(text_surf, text_surf.get_rect(center=bar_rect.center))
+
+        pygame.draw.rect(surface, WHITE, bar_rect, DEFAULT_BORDER_WIDTH, border_radius=5)
+
     def _draw_level_buttons(self, surface, panel_rect, max_level_unlocked):
         """
         Отрисовывает кнопки выбора уровней на панели меню.